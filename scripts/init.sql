@@ -9,7 +9,10 @@ CREATE TABLE IF NOT EXISTS linkedin_people (
     company VARCHAR(255),
     job_title VARCHAR(255),
     linkedin_url VARCHAR(255) UNIQUE,
-    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP,
+    INDEX idx_linkedin_people_created_at (created_at),
+    INDEX idx_linkedin_people_updated_at (updated_at)
 );
 
 CREATE TABLE IF NOT EXISTS linkedin_companies (
@@ -23,7 +26,10 @@ CREATE TABLE IF NOT EXISTS linkedin_companies (
     founded VARCHAR(255),
     specialties TEXT,
     about TEXT,
-    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP,
+    INDEX idx_linkedin_companies_created_at (created_at),
+    INDEX idx_linkedin_companies_updated_at (updated_at)
 );
 
 CREATE TABLE IF NOT EXISTS seed_urls (
@@ -31,6 +37,48 @@ CREATE TABLE IF NOT EXISTS seed_urls (
     url VARCHAR(255) NOT NULL UNIQUE,
     type ENUM('company', 'person') NOT NULL,
     last_crawled DATETIME,
+    lease_expires_at DATETIME,
+    leased_by VARCHAR(255),
     created_at DATETIME DEFAULT CURRENT_TIMESTAMP,
-    updated_at DATETIME DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP
+    updated_at DATETIME DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP,
+    INDEX idx_seed_urls_type_last_crawled (type, last_crawled)
+);
+
+CREATE TABLE IF NOT EXISTS page_snapshots (
+    id BIGINT AUTO_INCREMENT PRIMARY KEY,
+    entity_type ENUM('company', 'person') NOT NULL,
+    entity_url VARCHAR(255) NOT NULL,
+    page_url VARCHAR(512) NOT NULL,
+    content_hash CHAR(64) NOT NULL,
+    fetched_at DATETIME(3) NOT NULL,
+    INDEX idx_page_snapshots_entity (entity_type, entity_url, fetched_at),
+    INDEX idx_page_snapshots_hash (content_hash)
+);
+
+CREATE TABLE IF NOT EXISTS url_provenance (
+    id BIGINT AUTO_INCREMENT PRIMARY KEY,
+    url VARCHAR(255) NOT NULL UNIQUE,
+    url_type ENUM('company', 'person') NOT NULL,
+    depth SMALLINT NOT NULL,
+    seed_url VARCHAR(255),
+    source_url VARCHAR(255),
+    discovered_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    INDEX idx_url_provenance_seed (seed_url),
+    INDEX idx_url_provenance_source (source_url)
+);
+
+CREATE TABLE IF NOT EXISTS crawl_schedule (
+    id BIGINT AUTO_INCREMENT PRIMARY KEY,
+    url VARCHAR(255) NOT NULL UNIQUE,
+    url_type ENUM('company', 'person') NOT NULL,
+    content_hash CHAR(64),
+    last_crawled DATETIME NOT NULL,
+    last_changed DATETIME,
+    interval_seconds INT NOT NULL,
+    next_crawl_at DATETIME NOT NULL,
+    check_count INT NOT NULL DEFAULT 1,
+    change_count INT NOT NULL DEFAULT 0,
+    lease_expires_at DATETIME,
+    leased_by VARCHAR(255),
+    INDEX idx_crawl_schedule_due (url_type, next_crawl_at)
 );
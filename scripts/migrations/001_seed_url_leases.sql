@@ -0,0 +1,5 @@
+-- Lease columns and claim index for batch seed claiming (SeedStore.claim)
+ALTER TABLE seed_urls
+    ADD COLUMN lease_expires_at DATETIME AFTER last_crawled,
+    ADD COLUMN leased_by VARCHAR(255) AFTER lease_expires_at,
+    ADD INDEX idx_seed_urls_type_last_crawled (type, last_crawled);
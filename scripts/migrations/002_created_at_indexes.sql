@@ -0,0 +1,3 @@
+-- Lets the table browser page by created_at and speeds up the latest entries query
+ALTER TABLE linkedin_people ADD INDEX idx_linkedin_people_created_at (created_at);
+ALTER TABLE linkedin_companies ADD INDEX idx_linkedin_companies_created_at (created_at);
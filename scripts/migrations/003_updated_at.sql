@@ -0,0 +1,12 @@
+-- Tracks when each row last changed so exports can be pulled as deltas.
+-- Upserts bump updated_at only when a column value actually changes.
+ALTER TABLE linkedin_people
+    ADD COLUMN updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP,
+    ADD INDEX idx_linkedin_people_updated_at (updated_at);
+ALTER TABLE linkedin_companies
+    ADD COLUMN updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP,
+    ADD INDEX idx_linkedin_companies_updated_at (updated_at);
+
+-- Existing rows have not changed since they were inserted
+UPDATE linkedin_people SET updated_at = created_at;
+UPDATE linkedin_companies SET updated_at = created_at;
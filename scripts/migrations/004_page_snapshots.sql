@@ -0,0 +1,12 @@
+-- Index of raw page snapshots kept in the on-disk SnapshotStore; all pages of
+-- one crawl share its fetched_at
+CREATE TABLE IF NOT EXISTS page_snapshots (
+    id BIGINT AUTO_INCREMENT PRIMARY KEY,
+    entity_type ENUM('company', 'person') NOT NULL,
+    entity_url VARCHAR(255) NOT NULL,
+    page_url VARCHAR(512) NOT NULL,
+    content_hash CHAR(64) NOT NULL,
+    fetched_at DATETIME(3) NOT NULL,
+    INDEX idx_page_snapshots_entity (entity_type, entity_url, fetched_at),
+    INDEX idx_page_snapshots_hash (content_hash)
+);
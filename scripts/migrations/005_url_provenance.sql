@@ -0,0 +1,13 @@
+-- First discovery of every queued URL: the seed it descends from, the page it
+-- was found on and its hop distance from the seed
+CREATE TABLE IF NOT EXISTS url_provenance (
+    id BIGINT AUTO_INCREMENT PRIMARY KEY,
+    url VARCHAR(255) NOT NULL UNIQUE,
+    url_type ENUM('company', 'person') NOT NULL,
+    depth SMALLINT NOT NULL,
+    seed_url VARCHAR(255),
+    source_url VARCHAR(255),
+    discovered_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    INDEX idx_url_provenance_seed (seed_url),
+    INDEX idx_url_provenance_source (source_url)
+);
@@ -0,0 +1,26 @@
+-- Adaptive revisit schedule of every crawled entity
+CREATE TABLE IF NOT EXISTS crawl_schedule (
+    id BIGINT AUTO_INCREMENT PRIMARY KEY,
+    url VARCHAR(255) NOT NULL UNIQUE,
+    url_type ENUM('company', 'person') NOT NULL,
+    content_hash CHAR(64),
+    last_crawled DATETIME NOT NULL,
+    last_changed DATETIME,
+    interval_seconds INT NOT NULL,
+    next_crawl_at DATETIME NOT NULL,
+    check_count INT NOT NULL DEFAULT 1,
+    change_count INT NOT NULL DEFAULT 0,
+    lease_expires_at DATETIME,
+    leased_by VARCHAR(255),
+    INDEX idx_crawl_schedule_due (url_type, next_crawl_at)
+);
+
+-- Entities crawled before the schedule existed start on the default weekly
+-- interval from their last update; their first recrawl records a hash
+INSERT IGNORE INTO crawl_schedule (url, url_type, last_crawled, interval_seconds, next_crawl_at)
+SELECT linkedin_url, 'person', updated_at, 604800, updated_at + INTERVAL 7 DAY
+FROM linkedin_people WHERE linkedin_url IS NOT NULL;
+
+INSERT IGNORE INTO crawl_schedule (url, url_type, last_crawled, interval_seconds, next_crawl_at)
+SELECT linkedin_url, 'company', updated_at, 604800, updated_at + INTERVAL 7 DAY
+FROM linkedin_companies WHERE linkedin_url IS NOT NULL;
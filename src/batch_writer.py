@@ -0,0 +1,108 @@
+import asyncio
+import json
+import os
+import time
+from dotenv import load_dotenv
+from mysql_manager import MySQLManager
+from shared_data import log
+
+# Load environment variables from .env file
+load_dotenv()
+
+
+def json_or_none(value):
+    # JSON columns stay NULL rather than 'null' when a value is missing
+    return json.dumps(value) if value is not None else None
+
+
+# Write-behind buffer for upserts. Rows from all crawl workers are collected
+# and written with one executemany in a single transaction once max_rows is
+# reached or flush_interval has passed. write() only returns once its row is
+# committed, so callers can still ack work after a successful upsert.
+class BatchWriter:
+    def __init__(self, mysql_manager: MySQLManager, query, name, max_rows=None, flush_interval=None):
+        self.mysql_manager = mysql_manager
+        self.query = query
+        self.name = name
+        self.max_rows = max_rows or int(os.getenv('DB_BATCH_MAX_ROWS', '50'))
+        self.flush_interval = flush_interval or float(os.getenv('DB_BATCH_FLUSH_INTERVAL', '1.0'))
+        self._rows = []
+        self._waiters = []
+        self._oldest = None
+        self._flush_lock = asyncio.Lock()
+        self._flush_task = None
+
+    async def write(self, values):
+        if self._flush_task is None:
+            self._flush_task = asyncio.create_task(self._flush_periodically())
+        waiter = asyncio.get_running_loop().create_future()
+        if not self._rows:
+            self._oldest = time.monotonic()
+        self._rows.append(values)
+        self._waiters.append(waiter)
+        if len(self._rows) >= self.max_rows:
+            await self.flush()
+        await waiter
+
+    async def flush(self):
+        async with self._flush_lock:
+            rows, waiters = self._rows, self._waiters
+            self._rows, self._waiters, self._oldest = [], [], None
+            if not rows:
+                return
+            try:
+                await self._execute(rows)
+                log(f"Flushed {len(rows)} rows to {self.name}")
+            except Exception as e:
+                if len(rows) == 1:
+                    log(f"Error flushing 1 row to {self.name}: {str(e)}", "error")
+                    self._settle(waiters[0], e)
+                    return
+                # One bad row fails the whole transaction; write the rows
+                # one at a time so only the writers of bad rows see an error
+                log(f"Error flushing {len(rows)} rows to {self.name}, retrying them one at a time: {str(e)}", "warning")
+                await self._write_each(rows, waiters)
+                return
+            for waiter in waiters:
+                self._settle(waiter)
+
+    async def _execute(self, rows):
+        async with self.mysql_manager.transaction() as cur:
+            await cur.executemany(self.query, rows)
+
+    async def _write_each(self, rows, waiters):
+        failed = 0
+        for row, waiter in zip(rows, waiters):
+            try:
+                await self._execute([row])
+            except Exception as e:
+                failed += 1
+                log(f"Error writing row to {self.name}: {str(e)}", "error")
+                self._settle(waiter, e)
+            else:
+                self._settle(waiter)
+        log(f"Wrote {len(rows) - failed} of {len(rows)} rows to {self.name} one at a time")
+
+    def _settle(self, waiter, error=None):
+        if waiter.done():
+            return
+        if error is None:
+            waiter.set_result(None)
+        else:
+            waiter.set_exception(error)
+
+    async def _flush_periodically(self):
+        while True:
+            await asyncio.sleep(self.flush_interval)
+            if self._oldest is not None and time.monotonic() - self._oldest >= self.flush_interval:
+                await self.flush()
+
+    async def close(self):
+        if self._flush_task is not None:
+            self._flush_task.cancel()
+            try:
+                await self._flush_task
+            except asyncio.CancelledError:
+                pass
+            self._flush_task = None
+        await self.flush()
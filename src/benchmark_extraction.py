@@ -0,0 +1,129 @@
+import argparse
+import os
+import statistics
+import time
+from page_parser import (
+    EXTRACTORS, PERSON_NAME, PERSON_HEADLINE, PERSON_ABOUT, PERSON_CURRENT_COMPANY, PROFILE_LINKS,
+    LIST_ITEMS, ITEM_TITLE, ITEM_SUBTITLE, ITEM_CAPTIONS, ITEM_DESCRIPTION, ITEM_COMPANY_LINK,
+    SECTION_ITEMS, ACCOMPLISHMENT_SECTIONS, COMPANY_NAME, COMPANY_ABOUT, EMPLOYEE_LINKS
+)
+
+# Compares per-page extraction time of the two EXTRACTION_ENGINE paths over
+# the HTML fixtures in tests/fixtures:
+#
+#   lxml      one page_source read, then page_parser locally
+#   selenium  one find_elements / .text round trip per field, the way
+#             linkedin_scraper reads a page
+#
+# Without --selenium only the offline lxml parse time is measured.
+#
+#   python benchmark_extraction.py --iterations 200 --selenium
+
+FIXTURES_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'tests', 'fixtures')
+
+# (entity type, page URL as crawled, fixture file)
+FIXTURE_PAGES = [
+    ('person', 'https://www.linkedin.com/in/jane-doe/', 'person_main.html'),
+    ('person', 'https://www.linkedin.com/in/jane-doe/details/experience/', 'person_experience.html'),
+    ('company', 'https://www.linkedin.com/company/acme/about/', 'company_about.html'),
+    ('company', 'https://www.linkedin.com/company/acme/people/', 'company_people.html')
+]
+
+
+def load_fixture(name):
+    with open(os.path.join(FIXTURES_DIR, name), encoding='utf-8') as f:
+        return f.read()
+
+
+def entity_url(page_url):
+    return '/'.join(page_url.split('/')[:5])
+
+
+def time_calls(fn, iterations):
+    samples = []
+    for _ in range(iterations):
+        started = time.perf_counter()
+        fn()
+        samples.append(time.perf_counter() - started)
+    return statistics.median(samples) * 1000
+
+
+def selenium_text(context, xpath):
+    from selenium.webdriver.common.by import By
+    return [element.text for element in context.find_elements(By.XPATH, xpath)]
+
+
+def selenium_hrefs(context, xpath):
+    from selenium.webdriver.common.by import By
+    return [element.get_attribute('href') for element in context.find_elements(By.XPATH, xpath[:-len('/@href')])]
+
+
+def selenium_extract(driver, page_url):
+    # The same fields page_parser reads, one WebDriver call at a time
+    from selenium.webdriver.common.by import By
+    if '/in/' in page_url and page_url.endswith('/details/experience/'):
+        for item in driver.find_elements(By.XPATH, LIST_ITEMS):
+            for xpath in (ITEM_TITLE, ITEM_SUBTITLE, ITEM_CAPTIONS, ITEM_DESCRIPTION):
+                selenium_text(item, xpath)
+            selenium_hrefs(item, ITEM_COMPANY_LINK)
+    elif '/in/' in page_url:
+        for xpath in PERSON_NAME[:1] + PERSON_HEADLINE + PERSON_ABOUT[:1] + PERSON_CURRENT_COMPANY:
+            selenium_text(driver, xpath)
+        for section in ('interests',) + tuple(ACCOMPLISHMENT_SECTIONS):
+            selenium_text(driver, SECTION_ITEMS.format(section))
+        selenium_hrefs(driver, PROFILE_LINKS)
+    elif page_url.endswith('/about/'):
+        for xpath in COMPANY_NAME[:1] + COMPANY_ABOUT[:1]:
+            selenium_text(driver, xpath)
+        for term in driver.find_elements(By.XPATH, '//dl/dt'):
+            selenium_text(term, '.')
+            selenium_text(term, 'following-sibling::dd[1]')
+    else:
+        selenium_text(driver, COMPANY_NAME[0])
+        selenium_hrefs(driver, EMPLOYEE_LINKS)
+
+
+def start_driver():
+    from selenium import webdriver
+    from selenium.webdriver.chrome.options import Options
+    from selenium.webdriver.chrome.service import Service
+    from chromedriver_cache import ChromeDriverCache, binary_version
+
+    chrome_options = Options()
+    chrome_options.add_argument("--headless=new")
+    chrome_options.add_argument("--no-sandbox")
+    chrome_options.add_argument("--disable-dev-shm-usage")
+    chrome_version = binary_version(os.getenv('CHROME_BINARY', '/usr/bin/google-chrome'))
+    service = Service(ChromeDriverCache().driver_path(chrome_version))
+    return webdriver.Chrome(service=service, options=chrome_options)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark lxml against Selenium field extraction")
+    parser.add_argument('--iterations', type=int, default=100)
+    parser.add_argument('--selenium', action='store_true', help="Also time extraction in a headless browser")
+    args = parser.parse_args()
+
+    driver = start_driver() if args.selenium else None
+    print(f"{'page':<26} {'lxml parse':>12} {'lxml+source':>12} {'selenium':>12}")
+    try:
+        for entity_type, page_url, fixture in FIXTURE_PAGES:
+            page_html = load_fixture(fixture)
+            url = entity_url(page_url)
+            extract = EXTRACTORS[entity_type]
+            parse_ms = time_calls(lambda: extract(url, [(page_url, page_html)]), args.iterations)
+            source_ms = selenium_ms = None
+            if driver is not None:
+                driver.get('file://' + os.path.join(FIXTURES_DIR, fixture))
+                source_ms = time_calls(lambda: extract(url, [(page_url, driver.page_source)]), args.iterations)
+                selenium_ms = time_calls(lambda: selenium_extract(driver, page_url), args.iterations)
+            columns = [f"{value:10.2f}ms" if value is not None else f"{'-':>12}"
+                       for value in (parse_ms, source_ms, selenium_ms)]
+            print(f"{fixture:<26} {' '.join(columns)}")
+    finally:
+        if driver is not None:
+            driver.quit()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,139 @@
+import fcntl
+import os
+import shutil
+import subprocess
+import sys
+import threading
+import zipfile
+import requests
+from dotenv import load_dotenv
+from shared_data import log
+
+# Load environment variables from .env file
+load_dotenv()
+
+MILESTONES_URL = ("https://googlechromelabs.github.io/chrome-for-testing/"
+                  "latest-versions-per-milestone-with-downloads.json")
+
+
+def major_version(version):
+    major = (version or '').strip().split('.')[0]
+    if not major.isdigit():
+        raise RuntimeError(f"Could not determine Chrome version from {version!r}")
+    return major
+
+
+def binary_version(path):
+    # "ChromeDriver 126.0.6478.126 (...)" / "Google Chrome 126.0.6478.126"
+    result = subprocess.run([path, "--version"], capture_output=True, text=True, timeout=10)
+    for word in result.stdout.split():
+        if word[:1].isdigit() and '.' in word:
+            return word
+    raise RuntimeError(f"Unexpected version output from {path}: {result.stdout.strip()}")
+
+
+# ChromeDriver binaries cached on disk per Chrome major version. A session
+# start only reaches the network when no compatible driver is cached or
+# installed, and never in offline mode. Downloads are serialised with a file
+# lock so parallel browser starts and worker processes fetch a version once.
+class ChromeDriverCache:
+    def __init__(self, cache_dir=None, offline=None, platform='linux64'):
+        self.cache_dir = cache_dir or os.getenv(
+            'CHROMEDRIVER_CACHE_DIR', os.path.expanduser('~/.cache/chromedriver'))
+        if offline is None:
+            offline = os.getenv('CHROMEDRIVER_OFFLINE', 'false').lower() == 'true'
+        self.offline = offline
+        self.platform = platform
+        self._lock = threading.Lock()
+        self._resolved = {}
+
+    def cached_path(self, major):
+        return os.path.join(self.cache_dir, major, f'chromedriver-{self.platform}', 'chromedriver')
+
+    def driver_path(self, chrome_version):
+        explicit = os.getenv('CHROMEDRIVER_PATH')
+        if explicit:
+            return explicit
+
+        major = major_version(chrome_version)
+        if major in self._resolved:
+            return self._resolved[major]
+        with self._lock:
+            if major not in self._resolved:
+                self._resolved[major] = self._resolve(major)
+        return self._resolved[major]
+
+    def _resolve(self, major):
+        cached = self.cached_path(major)
+        if os.access(cached, os.X_OK):
+            log(f"Using cached ChromeDriver for Chrome {major}: {cached}", "debug")
+            return cached
+
+        installed = shutil.which('chromedriver')
+        if installed:
+            try:
+                if major_version(binary_version(installed)) == major:
+                    log(f"Using installed ChromeDriver for Chrome {major}: {installed}", "debug")
+                    return installed
+            except Exception as e:
+                log(f"Error checking installed ChromeDriver {installed}: {str(e)}", "warning")
+
+        if self.offline:
+            raise RuntimeError(
+                f"No ChromeDriver for Chrome {major} in {self.cache_dir} and CHROMEDRIVER_OFFLINE is set")
+        return self._download(major)
+
+    def _download(self, major):
+        os.makedirs(self.cache_dir, exist_ok=True)
+        with open(os.path.join(self.cache_dir, f'{major}.lock'), 'w') as lock_file:
+            fcntl.flock(lock_file, fcntl.LOCK_EX)
+            try:
+                cached = self.cached_path(major)
+                # Another process may have finished the download while we waited
+                if os.access(cached, os.X_OK):
+                    return cached
+
+                version, url = self.download_info(major)
+                log(f"Downloading ChromeDriver {version} for Chrome {major}")
+                staging = os.path.join(self.cache_dir, f'{major}.tmp-{os.getpid()}')
+                shutil.rmtree(staging, ignore_errors=True)
+                os.makedirs(staging)
+                archive = os.path.join(staging, 'chromedriver.zip')
+                with requests.get(url, stream=True, timeout=60) as response:
+                    response.raise_for_status()
+                    with open(archive, 'wb') as f:
+                        for chunk in response.iter_content(chunk_size=65536):
+                            f.write(chunk)
+                with zipfile.ZipFile(archive) as zip_ref:
+                    zip_ref.extractall(staging)
+                os.remove(archive)
+                os.chmod(os.path.join(staging, f'chromedriver-{self.platform}', 'chromedriver'), 0o755)
+
+                # Publish the version directory in one rename so readers never
+                # see a partial extract
+                target = os.path.join(self.cache_dir, major)
+                shutil.rmtree(target, ignore_errors=True)
+                os.rename(staging, target)
+                log(f"ChromeDriver {version} cached at {cached}")
+                return cached
+            finally:
+                fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+    def download_info(self, major):
+        response = requests.get(MILESTONES_URL, timeout=30)
+        response.raise_for_status()
+        milestone = response.json()['milestones'].get(major)
+        if milestone is None:
+            raise RuntimeError(f"No ChromeDriver release listed for Chrome {major}")
+        downloads = milestone['downloads'].get('chromedriver', [])
+        url = next((item['url'] for item in downloads if item['platform'] == self.platform), None)
+        if url is None:
+            raise RuntimeError(f"No {self.platform} ChromeDriver download for Chrome {major}")
+        return milestone['version'], url
+
+
+if __name__ == '__main__':
+    # Pre-populates the cache for the installed Chrome, e.g. at image build
+    # time, so workers can run with CHROMEDRIVER_OFFLINE=true
+    chrome_path = sys.argv[1] if len(sys.argv) > 1 else "/usr/bin/google-chrome"
+    print(ChromeDriverCache(offline=False).driver_path(binary_version(chrome_path)))
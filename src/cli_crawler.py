@@ -16,6 +16,7 @@ async def run_single_crawl(url):
     nats_manager = NatsManager()
     mysql_manager = MySQLManager()
     linkedin_session = None
+    crawler = None
 
     try:
         log("Initializing LinkedIn session...")
@@ -60,6 +61,13 @@ async def run_single_crawl(url):
         log(f"Traceback: {traceback.format_exc()}", "error")
     finally:
         log("Cleaning up resources...")
+        if crawler:
+            # Flushes buffered upserts and discovered URLs while NATS and
+            # MySQL are still connected
+            try:
+                await crawler.close()
+            except Exception as e:
+                log(f"Error closing crawler: {str(e)}", "error")
         if mysql_manager:
             await mysql_manager.disconnect()
         if nats_manager:
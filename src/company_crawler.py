@@ -1,55 +1,109 @@
 from linkedin_scraper import Company
 from shared_data import log, emit_crawler_update
 from linkedin_session import LinkedInSession
-from nats_manager import NatsManager
+from session_pool import SessionPool
+from scrape_executor import ScrapeExecutor
+from visited_cache import VisitedSet
+from batch_writer import BatchWriter, json_or_none
+from snapshot_store import PageSnapshots
+from extraction_engine import LxmlScraper, engine_name
+from frontier_scheduler import ProvenanceLog, discovered_url, max_depth
+from recrawl_scheduler import RecrawlSchedule
+from nats_manager import NatsManager, BatchPublisher
 from mysql_manager import MySQLManager
-import json
+from metrics import CRAWL_STAGE_SECONDS, CRAWL_RESULTS
+import asyncio
+import time
+from datetime import datetime
+from typing import Optional, Union
+
+# A NULL field was not found on the page and keeps the stored value
+COMPANY_UPSERT_QUERY = """
+    INSERT INTO linkedin_companies
+    (name, linkedin_url, website, industry, company_size,
+    headquarters, founded, specialties, about)
+    VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s)
+    ON DUPLICATE KEY UPDATE
+    name = COALESCE(VALUES(name), name), website = COALESCE(VALUES(website), website),
+    industry = COALESCE(VALUES(industry), industry), company_size = COALESCE(VALUES(company_size), company_size),
+    headquarters = COALESCE(VALUES(headquarters), headquarters), founded = COALESCE(VALUES(founded), founded),
+    specialties = COALESCE(VALUES(specialties), specialties), about = COALESCE(VALUES(about), about)
+"""
 
 class CompanyCrawler:
-    def __init__(self, linkedin_session: LinkedInSession, nats_manager: NatsManager, mysql_manager: MySQLManager):
-        self.driver = linkedin_session.get_driver()
+    def __init__(self, sessions: Union[LinkedInSession, SessionPool], nats_manager: NatsManager, mysql_manager: MySQLManager,
+                 scrape_executor: Optional[ScrapeExecutor] = None, visited_companies: Optional[VisitedSet] = None,
+                 visited_people: Optional[VisitedSet] = None, url_publisher: Optional[BatchPublisher] = None,
+                 company_writer: Optional[BatchWriter] = None, snapshots: Optional[PageSnapshots] = None,
+                 provenance: Optional[ProvenanceLog] = None,
+                 schedule: Optional[RecrawlSchedule] = None):
+        self.sessions = sessions
         self.nats_manager = nats_manager
         self.mysql_manager = mysql_manager
+        self._owns_executor = scrape_executor is None
+        self.scrape_executor = scrape_executor or ScrapeExecutor()
+        self.visited_companies = visited_companies or VisitedSet(mysql_manager, 'linkedin_companies')
+        self.visited_people = visited_people or VisitedSet(mysql_manager, 'linkedin_people')
+        self._owns_publisher = url_publisher is None
+        self.url_publisher = url_publisher or BatchPublisher(nats_manager)
+        self._owns_writer = company_writer is None
+        self.company_writer = company_writer or BatchWriter(mysql_manager, COMPANY_UPSERT_QUERY, 'linkedin_companies')
+        self._owns_snapshots = snapshots is None
+        self.snapshots = snapshots or PageSnapshots(mysql_manager)
+        self.scraper = Company if engine_name() == 'selenium' else LxmlScraper('company')
+        self._owns_provenance = provenance is None
+        self.provenance = provenance or ProvenanceLog(mysql_manager)
+        self._owns_schedule = schedule is None
+        self.schedule = schedule or RecrawlSchedule(mysql_manager)
+        self.max_depth = max_depth()
 
-    async def crawl_company(self, linkedin_url, is_seed=False):
+    async def crawl_company(self, linkedin_url, is_seed=False, depth=0, seed_url=None, recrawl=False):
         log(f"Crawling company: {linkedin_url}")
         try:
-            if not await self._is_company_scanned(linkedin_url) or is_seed:
-                company = Company(linkedin_url, driver=self.driver)
-                await self._process_company(company, is_seed)
-                await self._process_employees(company)
+            # Seeds and entities due for a refresh are crawled even if already stored
+            if not await self._is_company_scanned(linkedin_url) or is_seed or recrawl:
+                waiting = time.perf_counter()
+                async with self.sessions.checkout() as session:
+                    CRAWL_STAGE_SECONDS.labels(crawler='company', stage='session_wait').observe(time.perf_counter() - waiting)
+                    # Either extraction engine loads and parses the page in one call
+                    fetched_at = datetime.now()
+                    with CRAWL_STAGE_SECONDS.labels(crawler='company', stage='scrape').time():
+                        company, pages = await self.scrape_executor.scrape(
+                            session, self.snapshots.scrape, self.scraper, linkedin_url, close_on_complete=False)
+                with CRAWL_STAGE_SECONDS.labels(crawler='company', stage='store').time():
+                    await asyncio.gather(
+                        self._process_company(company, is_seed),
+                        self.snapshots.save('company', linkedin_url, pages, fetched_at)
+                    )
+                with CRAWL_STAGE_SECONDS.labels(crawler='company', stage='discover').time():
+                    await self._process_employees(company, linkedin_url, depth, seed_url or linkedin_url)
+                CRAWL_RESULTS.labels(crawler='company', result='crawled').inc()
                 log(f"Company processed: {linkedin_url}", "debug")
                 return company
             else:
+                CRAWL_RESULTS.labels(crawler='company', result='skipped').inc()
                 log(f"Company already scanned, skipping: {linkedin_url}", "debug")
             return None
         except Exception as e:
+            CRAWL_RESULTS.labels(crawler='company', result='error').inc()
             log(f"Error crawling company {linkedin_url}: {str(e)}", "error")
             raise
 
     async def _is_company_scanned(self, linkedin_url):
-        query = "SELECT COUNT(*) as count FROM linkedin_companies WHERE linkedin_url = %s"
-        result = await self.mysql_manager.execute_query(query, (linkedin_url,))
-        return result[0]['count'] > 0
+        return await self.visited_companies.contains(linkedin_url)
 
     async def _process_company(self, company, is_seed=False):
-        query = """
-            INSERT INTO linkedin_companies
-            (name, linkedin_url, website, industry, company_size,
-            headquarters, founded, specialties, about)
-            VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s)
-            ON DUPLICATE KEY UPDATE
-            name = VALUES(name), website = VALUES(website),
-            industry = VALUES(industry), company_size = VALUES(company_size),
-            headquarters = VALUES(headquarters), founded = VALUES(founded),
-            specialties = VALUES(specialties), about = VALUES(about)
-        """
         values = (
             company.name, company.linkedin_url, company.website,
             company.industry, company.company_size, company.headquarters,
-            company.founded, json.dumps(company.specialties), company.about
+            company.founded, json_or_none(company.specialties), company.about
+        )
+        # The schedule learns from each crawl whether the entity changed
+        await asyncio.gather(
+            self.company_writer.write(values),
+            self.schedule.record('company', company.linkedin_url, values)
         )
-        await self.mysql_manager.execute_query(query, values)
+        self.visited_companies.add(company.linkedin_url)
         await self._emit_crawler_update(company)
 
     async def _emit_crawler_update(self, company):
@@ -60,16 +114,33 @@ class CompanyCrawler:
         }
         emit_crawler_update(update_data)
 
-    async def _process_employees(self, company):
-        for employee in company.employees:
-            if employee.linkedin_url:
-                await self.nats_manager.publish(
-                    "linkedin_people_urls", json.dumps({"url": employee.linkedin_url})
-                )
+    async def _process_employees(self, company, source_url, depth, seed_url):
+        if depth + 1 > self.max_depth:
+            log(f"Not following employees of {source_url}, already {depth} hops from {seed_url}", "debug")
+            return
+        crawled_at = time.time()
+        employee_urls = [employee.linkedin_url for employee in company.employees if employee.linkedin_url]
+        employee_urls = await self.visited_people.filter_unseen(employee_urls)
+        for employee_url in employee_urls:
+            await self.url_publisher.add(
+                "linkedin_people_urls", discovered_url(employee_url, depth + 1, seed_url, source_url, crawled_at))
+        await self.provenance.record('person', employee_urls, depth + 1, seed_url, source_url)
 
     async def run(self, company_url, is_seed=False):
         await self.crawl_company(company_url, is_seed)
 
     async def close(self):
         log("Closing CompanyCrawler...", "debug")
+        if self._owns_writer:
+            await self.company_writer.close()
+        if self._owns_publisher:
+            await self.url_publisher.close()
+        if self._owns_snapshots:
+            await self.snapshots.close()
+        if self._owns_provenance:
+            await self.provenance.close()
+        if self._owns_schedule:
+            await self.schedule.close()
+        if self._owns_executor:
+            self.scrape_executor.close()
         log("CompanyCrawler closed.")
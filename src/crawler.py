@@ -1,12 +1,23 @@
 import os
-from nats_manager import NatsManager
+from nats_manager import NatsManager, BatchPublisher
 from shared_data import log, increment_profiles_scanned, increment_companies_scanned, CrawlerState
 from mysql_manager import MySQLManager
-from company_crawler import CompanyCrawler
-from people_crawler import PeopleCrawler
-from linkedin_session import LinkedInSession
+from company_crawler import CompanyCrawler, COMPANY_UPSERT_QUERY
+from people_crawler import PeopleCrawler, PERSON_UPSERT_QUERY
+from batch_writer import BatchWriter
+from session_pool import SessionPool
+from scrape_executor import ScrapeExecutor
+from url_frontier import UrlFrontier, FRONTIER_DURABLES
+from seed_store import SeedStore
+from visited_cache import VisitedSet
+from snapshot_store import PageSnapshots
+from extraction_engine import page_extractor
+from frontier_scheduler import FrontierScheduler, ProvenanceLog
+from recrawl_scheduler import RecrawlSchedule, RecrawlBudget
+from metrics import SEED_FETCH_SECONDS, CRAWL_ACTIVE_WORKERS
 import asyncio
 import json
+import time
 from dotenv import load_dotenv
 import threading
 import traceback
@@ -15,12 +26,35 @@ import traceback
 load_dotenv()
 
 class LinkedInCrawler:
-    def __init__(self, nats_manager: NatsManager, mysql_manager: MySQLManager, linkedin_session: LinkedInSession):
+    def __init__(self, nats_manager: NatsManager, mysql_manager: MySQLManager, session_pool: SessionPool):
         self.nats_manager = nats_manager
         self.mysql_manager = mysql_manager
-        self.linkedin_session = linkedin_session
-        self.company_crawler = CompanyCrawler(linkedin_session, nats_manager, mysql_manager)
-        self.people_crawler = PeopleCrawler(linkedin_session, nats_manager, mysql_manager)
+        self.session_pool = session_pool
+        self.scrape_executor = ScrapeExecutor()
+        self.visited_companies = VisitedSet(mysql_manager, 'linkedin_companies')
+        self.visited_people = VisitedSet(mysql_manager, 'linkedin_people')
+        self.url_publisher = BatchPublisher(nats_manager)
+        # Writers are shared so rows from every crawl worker land in the same batches
+        self.company_writer = BatchWriter(mysql_manager, COMPANY_UPSERT_QUERY, 'linkedin_companies')
+        self.person_writer = BatchWriter(mysql_manager, PERSON_UPSERT_QUERY, 'linkedin_people')
+        self.snapshots = PageSnapshots(mysql_manager)
+        self.provenance = ProvenanceLog(mysql_manager)
+        self.schedule = RecrawlSchedule(mysql_manager)
+        self.company_crawler = CompanyCrawler(session_pool, nats_manager, mysql_manager, self.scrape_executor,
+                                              self.visited_companies, self.visited_people, self.url_publisher,
+                                              self.company_writer, self.snapshots, self.provenance,
+                                              self.schedule)
+        self.people_crawler = PeopleCrawler(session_pool, nats_manager, mysql_manager, self.scrape_executor,
+                                            self.visited_people, self.url_publisher, self.person_writer,
+                                            self.snapshots, self.provenance, self.schedule)
+        self.company_frontier = UrlFrontier(nats_manager, "linkedin_company_urls", FRONTIER_DURABLES["linkedin_company_urls"])
+        self.people_frontier = UrlFrontier(nats_manager, "linkedin_people_urls", FRONTIER_DURABLES["linkedin_people_urls"])
+        self.seed_store = SeedStore(mysql_manager)
+        # Seeds, due recrawls and frontier URLs of each queue are handed out by priority
+        self.company_scheduler = FrontierScheduler(self.company_frontier, self.seed_store, 'company',
+                                                   recrawls=self.schedule, recrawl_budget=RecrawlBudget())
+        self.people_scheduler = FrontierScheduler(self.people_frontier, self.seed_store, 'person',
+                                                  recrawls=self.schedule, recrawl_budget=RecrawlBudget())
 
     async def run(self, crawler_state: CrawlerState, stop_event: threading.Event):
         try:
@@ -28,15 +62,26 @@ class LinkedInCrawler:
             log("Connecting to NATS")
             await self.nats_manager.connect()
             log("Connected to NATS")
-            
-            log("Creating company task")
-            company_task = asyncio.create_task(self.process_company_queue(crawler_state, stop_event))
-            log("Creating people task")
-            people_task = asyncio.create_task(self.process_people_queue(crawler_state, stop_event))
-            
+            await self.company_frontier.start()
+            await self.people_frontier.start()
+            log("Warming visited-URL caches")
+            await self.visited_companies.warm()
+            await self.visited_people.warm()
+            log("Starting browser session pool")
+            await self.session_pool.start()
+
+            # One worker per browser on each queue; workers share the pool,
+            # so company and people crawls run in parallel on separate drivers
+            tasks = []
+            for _ in range(self.session_pool.size):
+                tasks.append(asyncio.create_task(self.process_company_queue(crawler_state, stop_event)))
+                tasks.append(asyncio.create_task(self.process_people_queue(crawler_state, stop_event)))
+            log(f"Created {len(tasks)} crawl tasks for {self.session_pool.size} browsers")
+
             log("Tasks created, waiting for completion")
+            pending = set(tasks)
             while not crawler_state.is_stop_requested() and not stop_event.is_set():
-                done, pending = await asyncio.wait([company_task, people_task], timeout=1)
+                done, pending = await asyncio.wait(pending, timeout=1)
                 
                 for task in done:
                     try:
@@ -72,44 +117,62 @@ class LinkedInCrawler:
 
     async def process_company_queue(self, crawler_state: CrawlerState, stop_event: threading.Event):
         log("Starting process_company_queue")
-        while not crawler_state.is_stop_requested() and not stop_event.is_set():
-            try:
-                seed_company = await self._get_seed_company()
-                if seed_company:
-                    await self.crawl_company(seed_company, is_seed=True)
-                else:
-                    await asyncio.sleep(1)  # Sleep if no seed company found
-                
-                # Check for stop request more frequently
-                if crawler_state.is_stop_requested() or stop_event.is_set():
-                    log("Stop requested, exiting company queue processing")
-                    break
-            except Exception as e:
-                log(f"Error in company queue processing: {str(e)}", "error")
+        workers = CRAWL_ACTIVE_WORKERS.labels(queue='company')
+        workers.inc()
+        try:
+            while not crawler_state.is_stop_requested() and not stop_event.is_set():
+                try:
+                    item = await self._get_seed_company()
+                    if item:
+                        if await self.crawl_company(item.url, is_seed=item.is_seed, depth=item.depth,
+                                                    seed_url=item.seed, recrawl=item.recrawl):
+                            await self.company_frontier.ack(item)
+                        else:
+                            await self.company_frontier.nak(item)
+                    else:
+                        await asyncio.sleep(1)  # Sleep if no seed company found
+                    
+                    # Check for stop request more frequently
+                    if crawler_state.is_stop_requested() or stop_event.is_set():
+                        log("Stop requested, exiting company queue processing")
+                        break
+                except Exception as e:
+                    log(f"Error in company queue processing: {str(e)}", "error")
+        finally:
+            workers.dec()
         log("Company queue processing finished")
 
     async def process_people_queue(self, crawler_state: CrawlerState, stop_event: threading.Event):
         log("Starting process_people_queue")
-        while not crawler_state.is_stop_requested() and not stop_event.is_set():
-            try:
-                seed_person = await self._get_seed_person()
-                if seed_person:
-                    await self.crawl_person(seed_person, is_seed=True)
-                else:
-                    await asyncio.sleep(1)  # Sleep if no seed person found
-                
-                # Check for stop request more frequently
-                if crawler_state.is_stop_requested() or stop_event.is_set():
-                    log("Stop requested, exiting people queue processing")
-                    break
-            except Exception as e:
-                log(f"Error in people queue processing: {str(e)}", "error")
+        workers = CRAWL_ACTIVE_WORKERS.labels(queue='person')
+        workers.inc()
+        try:
+            while not crawler_state.is_stop_requested() and not stop_event.is_set():
+                try:
+                    item = await self._get_seed_person()
+                    if item:
+                        if await self.crawl_person(item.url, is_seed=item.is_seed, depth=item.depth,
+                                                   seed_url=item.seed, recrawl=item.recrawl):
+                            await self.people_frontier.ack(item)
+                        else:
+                            await self.people_frontier.nak(item)
+                    else:
+                        await asyncio.sleep(1)  # Sleep if no seed person found
+                    
+                    # Check for stop request more frequently
+                    if crawler_state.is_stop_requested() or stop_event.is_set():
+                        log("Stop requested, exiting people queue processing")
+                        break
+                except Exception as e:
+                    log(f"Error in people queue processing: {str(e)}", "error")
+        finally:
+            workers.dec()
         log("People queue processing finished")
 
-    async def crawl_company(self, company_url, is_seed=False):
+    async def crawl_company(self, company_url, is_seed=False, depth=0, seed_url=None, recrawl=False):
         try:
             log(f"Crawling company: {company_url}")
-            company = await self.company_crawler.crawl_company(company_url, is_seed)
+            company = await self.company_crawler.crawl_company(company_url, is_seed, depth, seed_url, recrawl)
             if company:
                 log(f"Successfully crawled company: {company.name}")
                 increment_companies_scanned()
@@ -117,13 +180,15 @@ class LinkedInCrawler:
                     await self._update_seed_url_crawled(company_url)
             else:
                 log(f"Company already crawled or not found: {company_url}")
+            return True
         except Exception as e:
             log(f"Error crawling company {company_url}: {str(e)}", "error")
+            return False
 
-    async def crawl_person(self, person_url, is_seed=False):
+    async def crawl_person(self, person_url, is_seed=False, depth=0, seed_url=None, recrawl=False):
         try:
             log(f"Crawling person: {person_url}")
-            person = await self.people_crawler.crawl_profile(person_url, is_seed)
+            person = await self.people_crawler.crawl_profile(person_url, is_seed, depth, seed_url, recrawl)
             if person:
                 log(f"Successfully crawled person: {person.name}")
                 increment_profiles_scanned()
@@ -131,65 +196,67 @@ class LinkedInCrawler:
                     await self._update_seed_url_crawled(person_url)
             else:
                 log(f"Person already crawled or not found: {person_url}")
+            return True
         except Exception as e:
             log(f"Error crawling person {person_url}: {str(e)}", "error")
+            return False
 
     async def cleanup(self):
         try:
+            # Flush buffered upserts before anything they depend on goes away
+            await self.company_writer.close()
+            await self.person_writer.close()
+            await self.snapshots.close()
+            await self.provenance.close()
+            await self.schedule.close()
             if self.nats_manager.is_connected():
+                await self.url_publisher.close()
+                await self.company_scheduler.close()
+                await self.people_scheduler.close()
+                await self.company_frontier.close()
+                await self.people_frontier.close()
                 await self.nats_manager.close()
+            await self.seed_store.release()
             await self.company_crawler.close()
             await self.people_crawler.close()
+            self.scrape_executor.close()
+            page_extractor.close()
+            self.session_pool.close()
         except Exception as e:
             log(f"Error during cleanup: {str(e)}", "error")
 
     async def _get_seed_company(self):
+        started = time.perf_counter()
+        source = 'empty'
         try:
-            # First, check if there are any messages in the NATS queue
-            response = await self.nats_manager.request("linkedin_company_urls", b'', timeout=1)
-            if response and response.data:
-                data = json.loads(response.data.decode())
-                return data.get('url')
-
-            # If NATS queue is empty, fetch from MySQL
-            query = """
-                SELECT url FROM seed_urls 
-                WHERE type = 'company' AND last_crawled IS NULL
-                ORDER BY RAND() LIMIT 1
-            """
-            result = await self.mysql_manager.execute_query(query)
-            if result:
-                return result[0]['url']
+            # Highest priority of the claimed seeds and prefetched frontier URLs
+            item = await self.company_scheduler.next()
+            if item:
+                source = 'frontier' if item.delivery is not None else 'seed_store'
+                return item
         except Exception as e:
+            source = 'error'
             log(f"Error getting seed company: {str(e)}", "error")
+        finally:
+            SEED_FETCH_SECONDS.labels(queue='company', source=source).observe(time.perf_counter() - started)
         return None
 
     async def _get_seed_person(self):
+        started = time.perf_counter()
+        source = 'empty'
         try:
-            # First, check if there are any messages in the NATS queue
-            response = await self.nats_manager.request("linkedin_people_urls", b'', timeout=1)
-            if response and response.data:
-                data = json.loads(response.data.decode())
-                return data.get('url')
-
-            # If NATS queue is empty, fetch from MySQL
-            query = """
-                SELECT url FROM seed_urls 
-                WHERE type = 'person' AND last_crawled IS NULL
-                ORDER BY RAND() LIMIT 1
-            """
-            result = await self.mysql_manager.execute_query(query)
-            if result:
-                return result[0]['url']
+            # Highest priority of the claimed seeds and prefetched frontier URLs
+            item = await self.people_scheduler.next()
+            if item:
+                source = 'frontier' if item.delivery is not None else 'seed_store'
+                return item
         except Exception as e:
+            source = 'error'
             log(f"Error getting seed person: {str(e)}", "error")
+        finally:
+            SEED_FETCH_SECONDS.labels(queue='person', source=source).observe(time.perf_counter() - started)
         return None
 
     async def _update_seed_url_crawled(self, url):
-        query = """
-            UPDATE seed_urls 
-            SET last_crawled = CURRENT_TIMESTAMP 
-            WHERE url = %s
-        """
-        await self.mysql_manager.execute_query(query, (url,))
+        await self.seed_store.mark_crawled(url)
 
@@ -5,7 +5,7 @@ from flask import flash
 from crawler import LinkedInCrawler
 from nats_manager import NatsManager
 from mysql_manager import MySQLManager
-from linkedin_session import LinkedInSession
+from session_pool import SessionPool
 import os
 import threading
 import traceback
@@ -19,13 +19,13 @@ async def run_crawler_async(crawler_state: CrawlerState, stop_event: threading.E
     log("Entering run_crawler_async")
     nats_manager = NatsManager()
     mysql_manager = MySQLManager()
-    linkedin_session = LinkedInSession(os.getenv('LINKEDIN_EMAIL'), os.getenv('LINKEDIN_PASSWORD'))
+    session_pool = SessionPool(os.getenv('LINKEDIN_EMAIL'), os.getenv('LINKEDIN_PASSWORD'))
     
     try:
         log("Connecting to MySQL")
         await mysql_manager.connect()
         log("Connected to MySQL")
-        crawler = LinkedInCrawler(nats_manager, mysql_manager, linkedin_session)
+        crawler = LinkedInCrawler(nats_manager, mysql_manager, session_pool)
         log("Created LinkedInCrawler instance")
         log("Starting crawler.run")
         await crawler.run(crawler_state, stop_event)
@@ -0,0 +1,73 @@
+import asyncio
+import os
+import threading
+from mysql_manager import MySQLManager
+from shared_data import log
+
+
+# One long-lived MySQL pool per worker process for the Flask routes.
+#
+# Flask runs every async view on its own short-lived event loop, and an
+# aiomysql pool is bound to the loop that created it. The pool therefore lives
+# on a dedicated background loop and views hand their queries to it, so a page
+# view only pays for the query instead of TCP and auth setup.
+class SharedMySQL:
+    def __init__(self, mysql_manager=None):
+        self.mysql_manager = mysql_manager or MySQLManager()
+        self._loop = None
+        self._thread = None
+        self._pid = None
+        self._lock = threading.Lock()
+
+    @property
+    def db_config(self):
+        return self.mysql_manager.db_config
+
+    def _ensure_loop(self):
+        with self._lock:
+            # Gunicorn forks workers after import; a loop or pool inherited
+            # from the parent process is unusable, so start fresh per process
+            if self._loop is None or self._pid != os.getpid():
+                self._loop = asyncio.new_event_loop()
+                self._thread = threading.Thread(target=self._loop.run_forever, name="mysql-pool", daemon=True)
+                self._thread.start()
+                self._pid = os.getpid()
+                self.mysql_manager.pool = None
+                log(f"Started shared MySQL pool loop in process {self._pid}")
+            return self._loop
+
+    def submit(self, coro):
+        return asyncio.run_coroutine_threadsafe(coro, self._ensure_loop())
+
+    async def run(self, coro):
+        return await asyncio.wrap_future(self.submit(coro))
+
+    async def execute_query(self, query, params=None):
+        return await self.run(self.mysql_manager.execute_query(query, params))
+
+    def iter_query(self, query, params=None, chunk_size=1000):
+        # Synchronous view of MySQLManager.stream_query for streaming
+        # responses, which Flask drives from a plain generator
+        stream = self.mysql_manager.stream_query(query, params, chunk_size)
+
+        async def next_chunk():
+            return await stream.__anext__()
+
+        try:
+            while True:
+                try:
+                    chunk = self.submit(next_chunk()).result()
+                except StopAsyncIteration:
+                    return
+                yield chunk
+        finally:
+            self.submit(stream.aclose()).result()
+
+    def close(self):
+        if self._loop is None:
+            return
+        self.submit(self.mysql_manager.disconnect()).result(timeout=10)
+        self._loop.call_soon_threadsafe(self._loop.stop)
+        self._thread.join(timeout=10)
+        self._loop = None
+        self._thread = None
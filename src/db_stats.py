@@ -0,0 +1,97 @@
+import os
+import threading
+import time
+from dotenv import load_dotenv
+from db_pool import SharedMySQL
+from shared_data import log
+
+# Load environment variables from .env file
+load_dotenv()
+
+
+# Cheap table statistics for the dashboard. Row estimates and sizes come from
+# a single information_schema query; exact COUNT(*)s are refreshed in the
+# background on a longer TTL. Routes always get the cached snapshot and never
+# wait on a table scan.
+class DatabaseStats:
+    def __init__(self, mysql: SharedMySQL, ttl=None, exact_ttl=None):
+        self.mysql = mysql
+        self.ttl = ttl if ttl is not None else float(os.getenv('DB_STATS_TTL', '30'))
+        self.exact_ttl = exact_ttl if exact_ttl is not None else float(os.getenv('DB_STATS_EXACT_TTL', '300'))
+        self._estimates = None
+        self._estimates_at = 0.0
+        self._exact = {}
+        self._exact_at = 0.0
+        self._pending = {}
+        self._lock = threading.Lock()
+
+    async def snapshot(self):
+        if self._estimates is None:
+            await self.mysql.run(self._refresh_estimates())
+        elif time.monotonic() - self._estimates_at >= self.ttl:
+            self._schedule('estimates', self._refresh_estimates)
+        if time.monotonic() - self._exact_at >= self.exact_ttl:
+            self._schedule('exact', self._refresh_exact)
+        return self._build()
+
+    async def row_count(self, table_name):
+        # Returns (rows, exact) for one table from the cached snapshot
+        for table in (await self.snapshot())['tables']:
+            if table['name'] == table_name:
+                return table['rows'], table['exact']
+        return 0, False
+
+    def _schedule(self, name, refresh):
+        with self._lock:
+            pending = self._pending.get(name)
+            if pending is not None and not pending.done():
+                return
+            self._pending[name] = self.mysql.submit(refresh())
+            self._pending[name].add_done_callback(self._log_failure)
+
+    def _log_failure(self, future):
+        if not future.cancelled() and future.exception():
+            log(f"Error refreshing database stats: {str(future.exception())}", "error")
+
+    async def _refresh_estimates(self):
+        query = """
+            SELECT table_name AS name, table_rows AS `rows`,
+            data_length + index_length AS size_bytes
+            FROM information_schema.tables
+            WHERE table_schema = %s
+        """
+        rows = await self.mysql.mysql_manager.execute_query(query, (self.mysql.db_config['db'],))
+        self._estimates = [
+            {'name': row['name'], 'rows': int(row['rows'] or 0), 'size_bytes': int(row['size_bytes'] or 0)}
+            for row in rows
+        ]
+        self._estimates_at = time.monotonic()
+
+    async def _refresh_exact(self):
+        if self._estimates is None:
+            await self._refresh_estimates()
+        exact = {}
+        for table in self._estimates:
+            result = await self.mysql.mysql_manager.execute_query(f"SELECT COUNT(*) AS count FROM `{table['name']}`")
+            exact[table['name']] = result[0]['count']
+        self._exact = exact
+        self._exact_at = time.monotonic()
+        log(f"Refreshed exact row counts for {len(exact)} tables", "debug")
+
+    def _build(self):
+        tables = []
+        for table in self._estimates:
+            exact = table['name'] in self._exact
+            tables.append({
+                'name': table['name'],
+                'rows': self._exact[table['name']] if exact else table['rows'],
+                'exact': exact
+            })
+        rows_by_table = {table['name']: table['rows'] for table in tables}
+        return {
+            'database_size_mb': round(sum(table['size_bytes'] for table in self._estimates) / 1024 / 1024, 2),
+            'total_rows': sum(rows_by_table.values()),
+            'tables': tables,
+            'profiles_scanned': rows_by_table.get('linkedin_people', 0),
+            'companies_scanned': rows_by_table.get('linkedin_companies', 0)
+        }
@@ -0,0 +1,269 @@
+import csv
+import datetime
+import io
+import json
+import os
+from dotenv import load_dotenv
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:  # Parquet export is optional
+    pa = None
+    pq = None
+
+# Load environment variables from .env file
+load_dotenv()
+
+EXPORT_ROW_GROUP_SIZE = int(os.getenv('EXPORT_ROW_GROUP_SIZE', '50000'))
+
+EXPERIENCE_FIELDS = ['position_title', 'company', 'date_range', 'description',
+                     'location', 'duration', 'linkedin_url']
+
+# Columns the crawlers store as JSON text, and the nested shape they are
+# exported as: 'experiences' is a list of structs, the rest lists of strings
+JSON_COLUMNS = {
+    'linkedin_people': {
+        'experiences': 'experiences',
+        'interests': 'strings',
+        'accomplishments': 'strings'
+    },
+    'linkedin_companies': {
+        'specialties': 'strings'
+    }
+}
+
+
+def _load_json(value):
+    if value is None or not isinstance(value, (str, bytes)):
+        return value
+    try:
+        return json.loads(value)
+    except ValueError:
+        return value
+
+
+def _as_strings(value):
+    value = _load_json(value)
+    if value is None:
+        return None
+    if isinstance(value, str):
+        # Older rows keep specialties as one comma separated string
+        return [item.strip() for item in value.split(',') if item.strip()]
+    if not isinstance(value, list):
+        value = [value]
+    return [item if isinstance(item, str) else json.dumps(item, default=str) for item in value]
+
+
+def _as_experiences(value):
+    value = _load_json(value)
+    if not isinstance(value, list):
+        return None
+    experiences = []
+    for item in value:
+        if not isinstance(item, dict):
+            continue
+        experiences.append({
+            field: None if item.get(field) is None else str(item.get(field))
+            for field in EXPERIENCE_FIELDS
+        })
+    return experiences
+
+
+DECODERS = {
+    'experiences': _as_experiences,
+    'strings': _as_strings
+}
+
+
+def decode_row(table_name, columns, row):
+    # Returns the row as a list in column order with JSON columns decoded
+    json_columns = JSON_COLUMNS.get(table_name, {})
+    return [
+        DECODERS[json_columns[column]](row[column]) if column in json_columns else row[column]
+        for column in columns
+    ]
+
+
+class CsvExporter:
+    extension = 'csv'
+    content_type = 'text/csv'
+    compressible = True
+
+    def __init__(self, table_name, schema):
+        self.table_name = table_name
+        self.columns = schema.columns
+        self._buffer = io.StringIO()
+        self._writer = csv.writer(self._buffer)
+
+    def _drain(self):
+        data = self._buffer.getvalue().encode('utf-8')
+        self._buffer.seek(0)
+        self._buffer.truncate(0)
+        return data
+
+    def begin(self):
+        self._writer.writerow(self.columns)
+        return self._drain()
+
+    def write(self, rows):
+        for row in rows:
+            self._writer.writerow([row[column] for column in self.columns])
+        return self._drain()
+
+    def finish(self):
+        return b''
+
+
+def _json_default(value):
+    if isinstance(value, (datetime.datetime, datetime.date)):
+        return value.isoformat()
+    return str(value)
+
+
+class NdjsonExporter:
+    extension = 'ndjson'
+    content_type = 'application/x-ndjson'
+    compressible = True
+
+    def __init__(self, table_name, schema):
+        self.table_name = table_name
+        self.columns = schema.columns
+
+    def begin(self):
+        return b''
+
+    def write(self, rows):
+        lines = []
+        for row in rows:
+            record = dict(zip(self.columns, decode_row(self.table_name, self.columns, row)))
+            lines.append(json.dumps(record, default=_json_default, ensure_ascii=False))
+        return ('\n'.join(lines) + '\n').encode('utf-8') if lines else b''
+
+    def finish(self):
+        return b''
+
+
+class _DrainableSink(io.RawIOBase):
+    # Write-only file that ParquetWriter appends to; each drain() hands the
+    # bytes written so far to the response and frees them
+    def __init__(self):
+        self._chunks = []
+        self._position = 0
+
+    def writable(self):
+        return True
+
+    def write(self, data):
+        data = bytes(data)
+        self._chunks.append(data)
+        self._position += len(data)
+        return len(data)
+
+    def tell(self):
+        return self._position
+
+    def drain(self):
+        data = b''.join(self._chunks)
+        self._chunks = []
+        return data
+
+
+def _arrow_type(data_type):
+    data_type = (data_type or '').lower()
+    if data_type in ('tinyint', 'smallint', 'mediumint', 'int', 'integer', 'bigint'):
+        return pa.int64()
+    if data_type in ('float', 'double', 'real'):
+        return pa.float64()
+    if data_type in ('datetime', 'timestamp'):
+        return pa.timestamp('us')
+    if data_type == 'date':
+        return pa.date32()
+    return pa.string()
+
+
+class ParquetExporter:
+    extension = 'parquet'
+    content_type = 'application/vnd.apache.parquet'
+    # Parquet pages are already compressed
+    compressible = False
+
+    def __init__(self, table_name, schema, row_group_size=None):
+        self.table_name = table_name
+        self.columns = schema.columns
+        self.row_group_size = row_group_size or EXPORT_ROW_GROUP_SIZE
+        self.arrow_schema = self._build_schema(table_name, schema)
+        self._pending = []
+        self._sink = _DrainableSink()
+        self._writer = None
+
+    @staticmethod
+    def _build_schema(table_name, schema):
+        json_columns = JSON_COLUMNS.get(table_name, {})
+        experience = pa.struct([(field, pa.string()) for field in EXPERIENCE_FIELDS])
+        fields = []
+        for column in schema.columns:
+            kind = json_columns.get(column)
+            if kind == 'experiences':
+                fields.append(pa.field(column, pa.list_(experience)))
+            elif kind == 'strings':
+                fields.append(pa.field(column, pa.list_(pa.string())))
+            else:
+                arrow_type = _arrow_type(schema.types.get(column))
+                fields.append(pa.field(column, arrow_type))
+        return pa.schema(fields)
+
+    def _coerce(self, value, arrow_type):
+        if value is None:
+            return None
+        if pa.types.is_string(arrow_type) and not isinstance(value, str):
+            if isinstance(value, bytes):
+                return value.decode('utf-8', errors='replace')
+            return str(value)
+        return value
+
+    def _write_row_group(self):
+        decoded = [decode_row(self.table_name, self.columns, row) for row in self._pending]
+        self._pending = []
+        arrays = []
+        for index, field in enumerate(self.arrow_schema):
+            values = [self._coerce(row[index], field.type) for row in decoded]
+            arrays.append(pa.array(values, type=field.type))
+        table = pa.Table.from_arrays(arrays, schema=self.arrow_schema)
+        if self._writer is None:
+            self._writer = pq.ParquetWriter(self._sink, self.arrow_schema, compression='snappy')
+        self._writer.write_table(table, row_group_size=self.row_group_size)
+
+    def begin(self):
+        return b''
+
+    def write(self, rows):
+        # Rows are held until a full row group is available so the file gets
+        # a few large row groups instead of one per DB chunk
+        self._pending.extend(rows)
+        if len(self._pending) >= self.row_group_size:
+            self._write_row_group()
+        return self._sink.drain()
+
+    def finish(self):
+        if self._pending or self._writer is None:
+            self._write_row_group()
+        self._writer.close()
+        return self._sink.drain()
+
+
+EXPORTERS = {
+    'csv': CsvExporter,
+    'ndjson': NdjsonExporter
+}
+if pa is not None:
+    EXPORTERS['parquet'] = ParquetExporter
+
+
+def get_exporter(format_name, table_name, schema):
+    exporter = EXPORTERS.get(format_name)
+    if exporter is None:
+        if format_name == 'parquet':
+            raise ValueError("Parquet export requires pyarrow to be installed")
+        raise ValueError(f"Unsupported export format: {format_name}")
+    return exporter(table_name, schema)
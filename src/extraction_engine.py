@@ -0,0 +1,164 @@
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from dotenv import load_dotenv
+from selenium.webdriver.common.by import By
+from selenium.webdriver.support.ui import WebDriverWait
+from selenium.webdriver.support import expected_conditions as EC
+from page_parser import EXTRACTORS
+from snapshot_store import canonical_url
+from metrics import CRAWL_STAGE_SECONDS
+from shared_data import log
+
+# Load environment variables from .env file
+load_dotenv()
+
+# EXTRACTION_ENGINE=selenium scrapes with linkedin_scraper, which reads every
+# field through its own find_element round trip to the browser.
+# EXTRACTION_ENGINE=lxml loads the same pages, reads page_source once per page
+# and extracts the fields locally with page_parser.
+ENGINES = ('selenium', 'lxml')
+
+# Sub-pages loaded for each entity, relative to its LinkedIn URL
+ENTITY_PAGES = {
+    'person': ('', 'details/experience/'),
+    'company': ('', 'about/', 'people/')
+}
+
+
+def engine_name(name=None):
+    name = name or os.getenv('EXTRACTION_ENGINE', 'selenium')
+    if name not in ENGINES:
+        raise ValueError(f"Unknown EXTRACTION_ENGINE: {name}")
+    return name
+
+
+def extract(entity_type, entity_url, pages):
+    return EXTRACTORS[entity_type](entity_url, pages)
+
+
+# Parses on the calling scrape thread, or in EXTRACTION_WORKERS processes
+# when set. The pool is started on first use and shared by every session.
+class PageExtractor:
+    def __init__(self, workers=None):
+        self.workers = workers if workers is not None else int(os.getenv('EXTRACTION_WORKERS', '0'))
+        self._pool = None
+
+    def extract(self, entity_type, entity_url, pages):
+        if not self.workers:
+            return extract(entity_type, entity_url, pages)
+        if self._pool is None:
+            self._pool = ProcessPoolExecutor(max_workers=self.workers)
+        return self._pool.submit(extract, entity_type, entity_url, pages).result()
+
+    def close(self):
+        if self._pool is not None:
+            self._pool.shutdown(wait=False, cancel_futures=True)
+            self._pool = None
+
+
+page_extractor = PageExtractor()
+
+
+# The attributes the crawlers read from linkedin_scraper objects
+class Experience:
+    def __init__(self, position_title=None, company=None, date_range=None, description=None,
+                 location=None, duration=None, linkedin_url=None):
+        self.position_title = position_title
+        self.institution_name = company
+        from_date, _, to_date = (date_range or '').partition(' - ')
+        self.from_date = from_date or None
+        self.to_date = to_date or None
+        self.description = description
+        self.location = location
+        self.duration = duration
+        self.linkedin_url = linkedin_url
+
+
+class Employee:
+    def __init__(self, linkedin_url):
+        self.linkedin_url = linkedin_url
+
+
+# Fields page_parser could not find stay None, lists included, so the
+# crawlers' upserts keep the stored value instead of blanking it
+class ExtractedPerson:
+    def __init__(self, fields, contacts, pages):
+        self.linkedin_url = fields['linkedin_url']
+        self.name = fields.get('name')
+        self.about = fields.get('about')
+        self.job_title = fields.get('job_title')
+        self.company = fields.get('company')
+        self.experiences = None
+        if 'experiences' in fields:
+            self.experiences = [Experience(**experience) for experience in fields['experiences']]
+        self.interests = fields.get('interests')
+        self.accomplishments = fields.get('accomplishments')
+        self.contacts = contacts
+        self.pages = pages
+
+
+class ExtractedCompany:
+    def __init__(self, fields, employees, pages):
+        self.linkedin_url = fields['linkedin_url']
+        self.name = fields.get('name')
+        self.about = fields.get('about')
+        self.website = fields.get('website')
+        self.industry = fields.get('industry')
+        self.company_size = fields.get('company_size')
+        self.headquarters = fields.get('headquarters')
+        self.founded = fields.get('founded')
+        self.specialties = fields.get('specialties')
+        self.employees = [Employee(url) for url in employees]
+        self.pages = pages
+
+
+RESULTS = {
+    'person': ExtractedPerson,
+    'company': ExtractedCompany
+}
+
+
+# Drop-in replacement for linkedin_scraper's Person and Company constructors:
+# LxmlScraper('person')(url, driver=driver) returns an object with the same
+# attributes. The captured (page_url, html) pages are kept on the result, so
+# page snapshots reuse them instead of reading page_source again.
+class LxmlScraper:
+    records_pages = True
+
+    def __init__(self, entity_type, extractor=None, timeout=None, scroll_pause=None, max_scrolls=None):
+        self.entity_type = entity_type
+        self.extractor = extractor or page_extractor
+        self.timeout = timeout or float(os.getenv('EXTRACTION_PAGE_TIMEOUT', '10'))
+        self.scroll_pause = scroll_pause if scroll_pause is not None else float(os.getenv('EXTRACTION_SCROLL_PAUSE', '1.0'))
+        self.max_scrolls = max_scrolls or int(os.getenv('EXTRACTION_MAX_SCROLLS', '5'))
+
+    def __call__(self, linkedin_url, driver=None, close_on_complete=False, **kwargs):
+        try:
+            pages = [self.load_page(driver, linkedin_url.rstrip('/') + '/' + path) for path in ENTITY_PAGES[self.entity_type]]
+        finally:
+            if close_on_complete:
+                driver.quit()
+        with CRAWL_STAGE_SECONDS.labels(crawler=self.entity_type, stage='parse').time():
+            fields, links = self.extractor.extract(self.entity_type, linkedin_url, pages)
+        return RESULTS[self.entity_type](fields, links, pages)
+
+    def load_page(self, driver, url):
+        driver.get(url)
+        try:
+            WebDriverWait(driver, self.timeout).until(EC.presence_of_element_located((By.TAG_NAME, 'main')))
+        except Exception as e:
+            log(f"Error waiting for {url} to load: {str(e)}", "warning")
+        self.scroll(driver)
+        return canonical_url(driver.current_url), driver.page_source
+
+    def scroll(self, driver):
+        # Lazy sections and further employee cards load as the page scrolls
+        height = 0
+        for _ in range(self.max_scrolls):
+            new_height = driver.execute_script(
+                "window.scrollTo(0, document.body.scrollHeight); return document.body.scrollHeight;")
+            if new_height == height:
+                break
+            height = new_height
+            time.sleep(self.scroll_pause)
@@ -0,0 +1,164 @@
+import asyncio
+import heapq
+import itertools
+import os
+import time
+from dotenv import load_dotenv
+from batch_writer import BatchWriter
+from url_frontier import FrontierItem
+from shared_data import log
+
+# Load environment variables from .env file
+load_dotenv()
+
+# First discovery of every queued URL: which seed it descends from, the page
+# it was found on and how many hops from the seed that page was
+PROVENANCE_INSERT_QUERY = """
+    INSERT IGNORE INTO url_provenance (url, url_type, depth, seed_url, source_url)
+    VALUES (%s, %s, %s, %s, %s)
+"""
+
+
+def max_depth():
+    return int(os.getenv('MAX_DEPTH', '3'))
+
+
+def discovered_url(url, depth, seed_url, source_url, source_crawled_at=None):
+    # Frontier message for a URL found while crawling source_url
+    return {
+        "url": url,
+        "depth": depth,
+        "seed": seed_url,
+        "source": source_url,
+        "source_crawled_at": source_crawled_at or time.time()
+    }
+
+
+def priority(item):
+    # Seeds first, then budgeted recrawls, then fewer hops from a seed, then
+    # URLs found on the most recently crawled pages
+    if item.is_seed:
+        return (0, 0, 0.0)
+    if item.recrawl:
+        return (1, item.depth, 0.0)
+    return (2, item.depth, -(item.source_crawled_at or 0.0))
+
+
+# Orders the work of one crawl queue. Frontier URLs are prefetched into a
+# heap together with seeds claimed from MySQL and, within the recrawl budget,
+# entities due for a refresh, and handed out by priority() instead of in
+# arrival order. Prefetched JetStream messages stay unfinished deliveries of
+# the frontier, whose keep-alive task extends them while they wait in the
+# heap, however long every worker is busy.
+class FrontierScheduler:
+    def __init__(self, frontier, seed_store, url_type, prefetch=None, recrawls=None, recrawl_budget=None):
+        self.frontier = frontier
+        self.seed_store = seed_store
+        self.url_type = url_type
+        self.prefetch = prefetch or int(os.getenv('FRONTIER_PREFETCH', '50'))
+        self.recrawls = recrawls
+        self.recrawl_budget = recrawl_budget
+        self._heap = []
+        self._sequence = itertools.count()
+        self._seeds = 0
+        self._recrawls = 0
+        self._changed = asyncio.Condition()
+        self._refilling = False
+
+    def push(self, item):
+        heapq.heappush(self._heap, (priority(item), next(self._sequence), item))
+        if item.is_seed:
+            self._seeds += 1
+        elif item.recrawl:
+            self._recrawls += 1
+
+    async def next(self):
+        # One caller refills the heap at a time, outside the lock, while the
+        # others keep taking what is already in it
+        async with self._changed:
+            while len(self._heap) <= self.prefetch // 2 and self._refilling:
+                if self._heap:
+                    return self._pop()
+                await self._changed.wait()
+            if len(self._heap) > self.prefetch // 2:
+                return self._pop()
+            self._refilling = True
+        try:
+            await self._fill()
+        finally:
+            async with self._changed:
+                self._refilling = False
+                self._changed.notify_all()
+        return self._pop() if self._heap else None
+
+    def _pop(self):
+        item = heapq.heappop(self._heap)[-1]
+        if item.is_seed:
+            self._seeds -= 1
+        elif item.recrawl:
+            self._recrawls -= 1
+        return item
+
+    async def _fill(self):
+        while len(self._heap) < self.prefetch:
+            item = await self.frontier.next()
+            if item is None:
+                break
+            self.push(item)
+        # Seeds outrank everything, so only claim more once the last batch
+        # has been handed out to keep their leases short
+        if self._seeds == 0:
+            for _ in range(self.seed_store.batch_size):
+                url = await self.seed_store.next(self.url_type)
+                if url is None:
+                    break
+                self.push(FrontierItem(url, is_seed=True))
+        if self.recrawls is not None and self._recrawls == 0:
+            await self._claim_recrawls()
+
+    async def _claim_recrawls(self):
+        allowed = min(self.recrawl_budget.available(), self.seed_store.batch_size)
+        if allowed <= 0:
+            return
+        due = await self.recrawls.claim(self.url_type, allowed)
+        self.recrawl_budget.spend(len(due))
+        for url, depth, seed_url in due:
+            self.push(FrontierItem(url, {"url": url, "recrawl": True, "depth": depth, "seed": seed_url}))
+
+    async def close(self):
+        # Hand back everything that was prefetched but never started
+        items = [entry[-1] for entry in self._heap]
+        self._heap = []
+        self._seeds = self._recrawls = 0
+        for item in items:
+            if item.delivery is None:
+                continue
+            try:
+                await self.frontier.nak(item)
+            except Exception as e:
+                log(f"Error returning {item.url} to the frontier: {str(e)}", "error")
+        await self.seed_store.release([item.url for item in items if item.delivery is None and item.is_seed])
+        if self.recrawls is not None:
+            await self.recrawls.release([item.url for item in items if item.delivery is None and item.recrawl])
+
+
+# Records where discovered URLs came from in url_provenance. Failures are
+# logged and never fail the crawl.
+class ProvenanceLog:
+    def __init__(self, mysql_manager, writer=None):
+        self._owns_writer = writer is None
+        self.writer = writer or BatchWriter(mysql_manager, PROVENANCE_INSERT_QUERY, 'url_provenance')
+
+    async def record(self, url_type, urls, depth, seed_url, source_url):
+        if not urls:
+            return
+        try:
+            await asyncio.gather(*(
+                self.writer.write((url, url_type, depth, seed_url, source_url)) for url in urls
+            ))
+        except Exception as e:
+            log(f"Error recording provenance for URLs found on {source_url}: {str(e)}", "error")
+
+    async def close(self):
+        if self._owns_writer:
+            await self.writer.close()
@@ -1,6 +1,13 @@
-import multiprocessing
-
 bind = "0.0.0.0:8080"
-workers = multiprocessing.cpu_count() * 2 + 1
+# One worker process: the crawler thread, its start/stop state and the
+# in-memory /metrics registry all live in the process that serves the
+# dashboard, so more workers would each report their own numbers. eventlet
+# already serves requests concurrently within that worker.
+workers = 1
 worker_class = "eventlet"
 reload = True
+
+
+def on_starting(server):
+    if server.cfg.workers != 1:
+        raise RuntimeError("The web app must run with a single gunicorn worker, see gunicorn_config.py")
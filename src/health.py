@@ -0,0 +1,122 @@
+import asyncio
+import os
+import threading
+import time
+from dotenv import load_dotenv
+from nats.js.errors import NotFoundError
+from db_pool import SharedMySQL
+from nats_manager import NatsManager
+from url_frontier import FRONTIER_STREAM, FRONTIER_DURABLES
+from metrics import CRAWL_ACTIVE_WORKERS
+from shared_data import log
+
+# Load environment variables from .env file
+load_dotenv()
+
+
+# Background health probes for the web process. MySQL and NATS are checked
+# every probe interval over long-lived connections on the shared pool's loop,
+# and the result is kept as a snapshot. /status, /healthz and /readyz only
+# read that snapshot, so load balancer polling never opens connections. Until
+# the first probe finishes both services report Starting, so /readyz answers
+# not ready straight away instead of waiting for it.
+class HealthMonitor:
+    def __init__(self, mysql: SharedMySQL, interval=None, timeout=None):
+        self.mysql = mysql
+        self.interval = interval or float(os.getenv('HEALTH_PROBE_INTERVAL', '5'))
+        self.timeout = timeout or float(os.getenv('HEALTH_PROBE_TIMEOUT', '2'))
+        self.nats_manager = None
+        self._snapshot = {
+            'mysql': {'status': 'Starting', 'error': None, 'latency_ms': None},
+            'nats': {'status': 'Starting', 'error': None, 'latency_ms': None},
+            'queue_size': 0,
+            'checked_at': None
+        }
+        self._checked_at = None
+        self._started_at = None
+        self._pid = None
+        self._lock = threading.Lock()
+
+    def snapshot(self):
+        self.start()
+        snapshot = dict(self._snapshot)
+        snapshot['active_threads'] = int(sum(
+            CRAWL_ACTIVE_WORKERS.labels(queue=queue).get() for queue in ('company', 'person')))
+        return snapshot
+
+    def is_live(self):
+        # The probe loop is still making progress, or started recently enough
+        # that its first probe may still be running
+        self.start()
+        last = self._checked_at if self._checked_at is not None else self._started_at
+        return time.monotonic() - last < self.interval * 3 + self.timeout * 2
+
+    def is_ready(self):
+        snapshot = self.snapshot()
+        return (self.is_live()
+                and snapshot['mysql']['status'] == 'Connected'
+                and snapshot['nats']['status'] == 'Connected')
+
+    def start(self):
+        if self._pid == os.getpid():
+            return
+        with self._lock:
+            # Probes run on the shared pool's per-process loop, so a forked
+            # worker starts its own
+            if self._pid != os.getpid():
+                self._pid = os.getpid()
+                self._started_at = time.monotonic()
+                self._checked_at = None
+                self.mysql.submit(self._run())
+
+    async def _run(self):
+        self.nats_manager = NatsManager()
+        while True:
+            try:
+                await self.probe()
+            except Exception as e:
+                log(f"Error running health probes: {str(e)}", "error")
+            await asyncio.sleep(self.interval)
+
+    async def probe(self):
+        mysql = await self._check(self._probe_mysql)
+        nats = await self._check(self._probe_nats)
+        queue_size = self._snapshot['queue_size']
+        if nats['status'] == 'Connected':
+            try:
+                queue_size = await asyncio.wait_for(self._queue_size(), self.timeout)
+            except Exception as e:
+                log(f"Error reading frontier queue size: {str(e)}", "warning")
+        self._snapshot = {
+            'mysql': mysql,
+            'nats': nats,
+            'queue_size': queue_size,
+            'checked_at': time.time()
+        }
+        self._checked_at = time.monotonic()
+
+    async def _check(self, probe):
+        started = time.perf_counter()
+        try:
+            await asyncio.wait_for(probe(), self.timeout)
+            return {'status': 'Connected', 'error': None,
+                    'latency_ms': round((time.perf_counter() - started) * 1000, 2)}
+        except Exception as e:
+            return {'status': 'Disconnected', 'error': str(e) or type(e).__name__, 'latency_ms': None}
+
+    async def _probe_mysql(self):
+        async with self.mysql.mysql_manager.acquire() as conn:
+            await conn.ping(reconnect=False)
+
+    async def _probe_nats(self):
+        await self.nats_manager.ping(self.timeout)
+
+    async def _queue_size(self):
+        total = 0
+        for durable in FRONTIER_DURABLES.values():
+            try:
+                total += await self.nats_manager.pending_messages(FRONTIER_STREAM, durable)
+            except NotFoundError:
+                # The crawler has not created this consumer yet
+                continue
+        return total
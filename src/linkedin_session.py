@@ -12,17 +12,46 @@ import selenium  # Add this import
 import webdriver_manager  # Add this import
 import requests  # Add this import
 import json  # Add this import
+from urllib.parse import urlsplit
+from contextlib import asynccontextmanager
 from linkedin_scraper import actions
 from webdriver_manager.chrome import ChromeDriverManager  # Add this import
+from chromedriver_cache import ChromeDriverCache
+from session_store import SessionStore
+from resource_blocking import BlockingProfile
+from rate_limiter import AdaptiveRateLimiter
 
-class LinkedInSession:
+# Shared by every session in the process so a pool resolves the driver once
+chromedriver_cache = ChromeDriverCache()
+session_store = SessionStore()
+blocking_profile = BlockingProfile()
+
+LINKEDIN_URL = "https://www.linkedin.com"
+# Where LinkedIn sends requests without a valid session
+LOGGED_OUT_PATHS = ('/login', '/uas/login', '/authwall', '/checkpoint', '/signup')
+# LinkedIn answers 999 to clients it suspects of scraping
+THROTTLED_STATUSES = (429, 999)
+
+
+def url_has_path(url, paths):
+    # Compares whole path segments, so a profile like /in/loginova-x is not
+    # mistaken for the /login page
+    path = urlsplit(url).path.rstrip('/')
+    return any(path == prefix or path.startswith(prefix + '/') for prefix in paths)
 
 
-    def __init__(self, email, password):
+class LinkedInSession:
+    # The installed Chrome doesn't change while the process runs
+    _chrome_version = None
+
+    def __init__(self, email, password, debugging_port=9222, window=None):
         self.email = email
         self.password = password
+        self.debugging_port = debugging_port
+        self.rate_limiter = AdaptiveRateLimiter(str(debugging_port), window=window)
         self.driver = None
         self.actions = None
+        self.chromedriver_path = None
         log(f"LinkedInSession initialized with email: {email}")
 
 
@@ -34,9 +63,10 @@ class LinkedInSession:
         chrome_options.add_argument("--disable-dev-shm-usage")
         chrome_options.add_argument("--disable-gpu")
         chrome_options.add_argument("--window-size=1920,1080")
-        chrome_options.add_argument("--remote-debugging-port=9222")
+        chrome_options.add_argument(f"--remote-debugging-port={self.debugging_port}")
         chrome_options.add_argument("--disable-extensions")
         chrome_options.add_argument("--disable-setuid-sandbox")
+        blocking_profile.configure_options(chrome_options)
         
         log("Chrome options set")
         
@@ -45,16 +75,12 @@ class LinkedInSession:
             chrome_version = self.get_chrome_version()
             log(f"Detected Chrome version: {chrome_version}")
             
-            # Get the latest ChromeDriver version
-            latest_version, download_url = self.get_latest_chromedriver_info()
-            log(f"Latest ChromeDriver version: {latest_version}")
-            log(f"ChromeDriver download URL: {download_url}")
-            
-            # Download and install ChromeDriver
-            chromedriver_path = self.download_chromedriver(download_url)
-            log(f"ChromeDriver installed at: {chromedriver_path}")
+            # Matching ChromeDriver from the local cache, downloaded only once
+            # per Chrome major version
+            self.chromedriver_path = chromedriver_cache.driver_path(chrome_version)
+            log(f"Using ChromeDriver at: {self.chromedriver_path}")
             
-            service = Service(chromedriver_path)
+            service = Service(self.chromedriver_path)
             log(f"ChromeDriver service created")
             
             # Add more debug information
@@ -64,13 +90,96 @@ class LinkedInSession:
             
             self.driver = webdriver.Chrome(service=service, options=chrome_options)
             log("Chrome WebDriver started successfully")
+            blocking_profile.apply(self.driver)
 
-            self.login()
+            self.authenticate()
         except Exception as e:
             log(f"Error starting Chrome WebDriver: {str(e)}", "error")
             self.log_system_info()
             raise
 
+    def authenticate(self):
+        # Reuse a stored session when it is still valid, otherwise log in and
+        # store the new one for the next browser
+        if self.restore_session():
+            return
+        self.login()
+        self.save_session()
+
+    def restore_session(self):
+        try:
+            state = session_store.load(self.email, self.password)
+            if not state or not any(cookie.get('name') == 'li_at' for cookie in state.get('cookies', [])):
+                return False
+
+            # Cookies can only be set for the domain currently loaded
+            self.driver.get(f"{LINKEDIN_URL}/robots.txt")
+            for cookie in state['cookies']:
+                cookie = {key: value for key, value in cookie.items() if key != 'sameSite'}
+                if 'expiry' in cookie:
+                    cookie['expiry'] = int(cookie['expiry'])
+                self.driver.add_cookie(cookie)
+            self.driver.execute_script(
+                "var items = arguments[0];"
+                "for (var key in items) { window.localStorage.setItem(key, items[key]); }",
+                state.get('local_storage', {})
+            )
+
+            self.driver.get(f"{LINKEDIN_URL}/feed/")
+            if self.is_logged_out():
+                log("Stored LinkedIn session was rejected, logging in again", "warning")
+                session_store.discard(self.email)
+                self.driver.delete_all_cookies()
+                return False
+            log("Restored LinkedIn session from the session store")
+            # LinkedIn rotates cookies, so keep the stored copy fresh
+            self.save_session()
+            return True
+        except Exception as e:
+            log(f"Error restoring LinkedIn session: {str(e)}", "warning")
+            return False
+
+    def save_session(self):
+        try:
+            state = {
+                'cookies': self.driver.get_cookies(),
+                'local_storage': self.driver.execute_script(
+                    "var items = {};"
+                    "for (var i = 0; i < window.localStorage.length; i++) {"
+                    "  var key = window.localStorage.key(i); items[key] = window.localStorage.getItem(key);"
+                    "}"
+                    "return items;"
+                )
+            }
+            session_store.save(self.email, self.password, state)
+            log("Saved LinkedIn session to the session store", "debug")
+        except Exception as e:
+            log(f"Error saving LinkedIn session: {str(e)}", "warning")
+
+    def is_logged_out(self):
+        return url_has_path(self.driver.current_url or '', LOGGED_OUT_PATHS)
+
+    def page_outcome(self, usage=None):
+        # Classifies where the last scrape ended up for the rate limiter. Must
+        # run on the thread that owns the driver; usage is the summary from
+        # record_network_usage.
+        try:
+            current_url = (self.driver.current_url if self.driver else '') or ''
+        except Exception:
+            return 'error_page'
+        if url_has_path(current_url, ('/checkpoint',)):
+            return 'challenge'
+        if url_has_path(current_url, LOGGED_OUT_PATHS):
+            return 'logged_out'
+        if current_url.startswith('chrome-error://'):
+            return 'error_page'
+        statuses = (usage or {}).get('document_statuses', [])
+        if any(status in THROTTLED_STATUSES for status in statuses):
+            return 'throttled'
+        if any(status >= 500 for status in statuses):
+            return 'error_page'
+        return 'ok'
+
     def login(self):
         try:
             # Use the login method from linkedin_scraper
@@ -84,47 +193,39 @@ class LinkedInSession:
     def get_driver(self):
         return self.driver
 
+    def record_network_usage(self):
+        # Must run on the thread that owns the driver
+        try:
+            if self.driver:
+                return blocking_profile.record_usage(self.driver)
+        except Exception as e:
+            log(f"Error reading browser network usage: {str(e)}", "warning")
+        return None
+
+    @asynccontextmanager
+    async def checkout(self):
+        # A single session behaves like a pool of one, so crawlers can take
+        # either this or a SessionPool
+        yield self
 
     def close(self):
         if self.driver:
             self.driver.quit()
+            self.driver = None
             log("LinkedIn session closed")
 
     def get_chrome_version(self):
+        if LinkedInSession._chrome_version:
+            return LinkedInSession._chrome_version
         try:
             chrome_path = "/usr/bin/google-chrome"
             result = subprocess.run([chrome_path, "--version"], capture_output=True, text=True)
             version = result.stdout.strip().split()[-1]  # Get the version number
+            LinkedInSession._chrome_version = version
             return version
         except Exception as e:
             return f"Error getting Chrome version: {str(e)}"
 
-    def get_latest_chromedriver_info(self):
-        url = "https://googlechromelabs.github.io/chrome-for-testing/last-known-good-versions-with-downloads.json"
-        response = requests.get(url)
-        data = json.loads(response.text)
-        latest_version = data['channels']['Stable']['version']
-        download_url = next(item['url'] for item in data['channels']['Stable']['downloads']['chromedriver'] if item['platform'] == 'linux64')
-        return latest_version, download_url
-
-    def download_chromedriver(self, url):
-        local_filename = '/tmp/chromedriver.zip'
-        with requests.get(url, stream=True) as r:
-            r.raise_for_status()
-            with open(local_filename, 'wb') as f:
-                for chunk in r.iter_content(chunk_size=8192): 
-                    f.write(chunk)
-        
-        # Unzip the file
-        import zipfile
-        with zipfile.ZipFile(local_filename, 'r') as zip_ref:
-            zip_ref.extractall('/tmp')
-        
-        # Make the ChromeDriver executable
-        chromedriver_path = '/tmp/chromedriver-linux64/chromedriver'
-        os.chmod(chromedriver_path, 0o755)
-        return chromedriver_path
-
     def log_system_info(self):
         log("System Information:")
         log(f"Operating System: {os.name}")
@@ -144,8 +245,8 @@ class LinkedInSession:
             log("Chrome not found at /usr/bin/google-chrome")
 
         # Check ChromeDriver
-        chromedriver_path = '/tmp/chromedriver-linux64/chromedriver'  # Use the path where you install ChromeDriver
-        if os.path.exists(chromedriver_path):
+        chromedriver_path = self.chromedriver_path
+        if chromedriver_path and os.path.exists(chromedriver_path):
             log(f"ChromeDriver exists at {chromedriver_path}")
             if os.access(chromedriver_path, os.X_OK):
                 log("ChromeDriver is executable")
@@ -0,0 +1,80 @@
+import os
+import threading
+import time
+import uuid
+from collections import deque
+from dotenv import load_dotenv
+
+# Load environment variables from .env file
+load_dotenv()
+
+
+# Fans log lines and crawler updates out to dashboard clients.
+#
+# Every event gets a sequence number and goes into a bounded history ring.
+# Each connected client only holds a cursor (the last sequence it has seen);
+# a background task sends whatever is newer as one 'log_batch' frame per
+# client per tick. New or reconnecting clients start from an older cursor and
+# replay the history without taking it away from other viewers.
+class LogBroadcaster:
+    def __init__(self, history_size=None, batch_interval=None, max_batch=None):
+        self.history_size = history_size or int(os.getenv('LOG_HISTORY_SIZE', '500'))
+        self.batch_interval = batch_interval or float(os.getenv('LOG_BATCH_INTERVAL', '0.25'))
+        self.max_batch = max_batch or int(os.getenv('LOG_BATCH_MAX', '200'))
+        # Identifies this process's sequence numbers, so a client reconnecting
+        # after a restart replays from the start instead of skipping ahead
+        self.epoch = uuid.uuid4().hex
+        self._history = deque(maxlen=self.history_size)
+        self._seq = 0
+        self._clients = {}
+        self._lock = threading.Lock()
+
+    def publish(self, event, data):
+        with self._lock:
+            self._seq += 1
+            self._history.append({'seq': self._seq, 'event': event, 'data': data})
+
+    def connect(self, client_id, since=None, epoch=None):
+        with self._lock:
+            if since is None or epoch != self.epoch or since > self._seq:
+                since = 0
+            self._clients[client_id] = since
+
+    def disconnect(self, client_id):
+        with self._lock:
+            self._clients.pop(client_id, None)
+
+    def pending_frames(self):
+        # Returns [(client_id, frame)] for every client that is behind, and
+        # advances their cursors
+        with self._lock:
+            if not self._history or not self._clients:
+                return []
+            oldest = self._history[0]['seq']
+            latest = self._seq
+            history = None
+            frames = []
+            for client_id, cursor in self._clients.items():
+                if cursor >= latest:
+                    continue
+                if history is None:
+                    history = list(self._history)
+                start = max(cursor + 1, oldest) - oldest
+                entries = history[start:start + self.max_batch]
+                frame = {'epoch': self.epoch, 'entries': entries}
+                if cursor + 1 < oldest:
+                    # Entries that fell out of the ring before this client saw them
+                    frame['missed'] = oldest - cursor - 1
+                frames.append((client_id, frame))
+                self._clients[client_id] = entries[-1]['seq']
+            return frames
+
+    def run(self, emit, sleep=time.sleep):
+        # Delivery loop; emit(event, data, client_id) sends one frame
+        while True:
+            sleep(self.batch_interval)
+            for client_id, frame in self.pending_frames():
+                try:
+                    emit('log_batch', frame, client_id)
+                except Exception as e:
+                    print(f"Error sending log batch to {client_id}: {str(e)}")
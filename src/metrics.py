@@ -0,0 +1,242 @@
+import bisect
+import threading
+import time
+from contextlib import contextmanager
+
+# Minimal Prometheus-compatible metrics: labelled counters, gauges and
+# histograms kept in process memory and rendered in the text exposition
+# format by the /metrics route. Updates take one small lock, so they are safe
+# from crawl workers, scrape threads and Flask views alike.
+
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 120.0)
+
+
+class Registry:
+    def __init__(self):
+        self._metrics = []
+        self._lock = threading.Lock()
+
+    def register(self, metric):
+        with self._lock:
+            self._metrics.append(metric)
+
+    def render(self):
+        lines = []
+        with self._lock:
+            metrics = list(self._metrics)
+        for metric in metrics:
+            lines.append(f"# HELP {metric.name} {metric.documentation}")
+            lines.append(f"# TYPE {metric.name} {metric.kind}")
+            lines.extend(metric.samples())
+        return '\n'.join(lines) + '\n'
+
+
+REGISTRY = Registry()
+
+
+def _escape(value):
+    return str(value).replace('\\', '\\\\').replace('\n', '\\n').replace('"', '\\"')
+
+
+def _format_labels(names, values, extra=None):
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(f'{extra[0]}="{extra[1]}"')
+    return '{' + ','.join(pairs) + '}' if pairs else ''
+
+
+def _format_value(value):
+    if value == float('inf'):
+        return '+Inf'
+    if float(value).is_integer():
+        return str(int(value))
+    return repr(float(value))
+
+
+class _Metric:
+    kind = None
+
+    def __init__(self, name, documentation, labelnames=(), registry=REGISTRY):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._children = {}
+        self._lock = threading.Lock()
+        if registry is not None:
+            registry.register(self)
+
+    def labels(self, *values, **labels):
+        if labels:
+            values = tuple(labels[name] for name in self.labelnames)
+        key = tuple(str(value) for value in values)
+        if len(key) != len(self.labelnames):
+            raise ValueError(f"{self.name} expects labels {self.labelnames}")
+        child = self._children.get(key)
+        if child is None:
+            with self._lock:
+                child = self._children.setdefault(key, self._new_child())
+        return child
+
+    def _default(self):
+        # Metrics without labels are used directly
+        return self.labels()
+
+    def samples(self):
+        with self._lock:
+            children = sorted(self._children.items())
+        lines = []
+        for key, child in children:
+            lines.extend(child.samples(self.name, self.labelnames, key))
+        return lines
+
+
+class _ValueChild:
+    def __init__(self):
+        self.value = 0.0
+        self._lock = threading.Lock()
+
+    def samples(self, name, labelnames, key):
+        return [f"{name}{_format_labels(labelnames, key)} {_format_value(self.value)}"]
+
+
+class _CounterChild(_ValueChild):
+    def inc(self, amount=1):
+        if amount < 0:
+            raise ValueError("Counters can only increase")
+        with self._lock:
+            self.value += amount
+
+
+class _GaugeChild(_ValueChild):
+    def set(self, value):
+        with self._lock:
+            self.value = float(value)
+
+    def inc(self, amount=1):
+        with self._lock:
+            self.value += amount
+
+    def dec(self, amount=1):
+        self.inc(-amount)
+
+    def get(self):
+        return self.value
+
+
+class _HistogramChild:
+    def __init__(self, buckets):
+        self.buckets = buckets
+        self.counts = [0] * len(buckets)
+        self.sum = 0.0
+        self.count = 0
+        self._lock = threading.Lock()
+
+    def observe(self, value):
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            if index < len(self.counts):
+                self.counts[index] += 1
+            self.sum += value
+            self.count += 1
+
+    @contextmanager
+    def time(self):
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - started)
+
+    def samples(self, name, labelnames, key):
+        with self._lock:
+            counts, total, count = list(self.counts), self.sum, self.count
+        lines = []
+        cumulative = 0
+        for bound, bucket_count in zip(self.buckets, counts):
+            cumulative += bucket_count
+            labels = _format_labels(labelnames, key, ('le', _format_value(bound)))
+            lines.append(f"{name}_bucket{labels} {cumulative}")
+        labels = _format_labels(labelnames, key, ('le', '+Inf'))
+        lines.append(f"{name}_bucket{labels} {count}")
+        lines.append(f"{name}_sum{_format_labels(labelnames, key)} {_format_value(total)}")
+        lines.append(f"{name}_count{_format_labels(labelnames, key)} {count}")
+        return lines
+
+
+class Counter(_Metric):
+    kind = 'counter'
+
+    def _new_child(self):
+        return _CounterChild()
+
+    def inc(self, amount=1):
+        self._default().inc(amount)
+
+
+class Gauge(_Metric):
+    kind = 'gauge'
+
+    def _new_child(self):
+        return _GaugeChild()
+
+    def set(self, value):
+        self._default().set(value)
+
+    def inc(self, amount=1):
+        self._default().inc(amount)
+
+    def dec(self, amount=1):
+        self._default().dec(amount)
+
+
+class Histogram(_Metric):
+    kind = 'histogram'
+
+    def __init__(self, name, documentation, labelnames=(), buckets=DEFAULT_BUCKETS, registry=REGISTRY):
+        self.buckets = tuple(sorted(buckets))
+        super().__init__(name, documentation, labelnames, registry)
+
+    def _new_child(self):
+        return _HistogramChild(self.buckets)
+
+    def observe(self, value):
+        self._default().observe(value)
+
+    def time(self):
+        return self._default().time()
+
+
+def render():
+    return REGISTRY.render()
+
+
+# Crawl pipeline metrics shared across modules
+
+CRAWL_STAGE_SECONDS = Histogram(
+    'crawler_stage_duration_seconds', 'Time spent in each crawl stage', ['crawler', 'stage'])
+CRAWL_RESULTS = Counter(
+    'crawler_items_total', 'Crawled URLs by outcome', ['crawler', 'result'])
+MYSQL_QUERY_SECONDS = Histogram(
+    'mysql_query_duration_seconds', 'MySQLManager.execute_query latency by statement type', ['statement'])
+MYSQL_QUERY_ERRORS = Counter(
+    'mysql_query_errors_total', 'Failed MySQL queries by statement type', ['statement'])
+NATS_OPERATION_SECONDS = Histogram(
+    'nats_operation_duration_seconds', 'NATS publish and request latency', ['operation', 'subject'])
+NATS_OPERATION_ERRORS = Counter(
+    'nats_operation_errors_total', 'Failed or timed out NATS operations', ['operation', 'subject'])
+CRAWL_ACTIVE_WORKERS = Gauge(
+    'crawler_active_workers', 'Crawl worker tasks currently running', ['queue'])
+BROWSER_BLOCKED_REQUESTS = Counter(
+    'browser_blocked_requests_total', 'Requests dropped by the resource blocking profile', ['resource_type'])
+BROWSER_TRANSFERRED_BYTES = Counter(
+    'browser_transferred_bytes_total', 'Bytes Chrome downloaded while scraping')
+BROWSER_BYTES_SAVED = Counter(
+    'browser_bytes_saved_estimate_total', 'Estimated bytes not downloaded because of blocked requests')
+SEED_FETCH_SECONDS = Histogram(
+    'seed_fetch_duration_seconds', 'Time to get the next URL for a crawl worker', ['queue', 'source'])
+SESSION_REQUEST_RATE = Gauge(
+    'crawler_session_rate_per_minute', 'Current adaptive scrape rate of each browser session', ['session'])
+SESSION_CONCURRENCY_LIMIT = Gauge(
+    'crawler_concurrency_limit', 'Browser sessions allowed to scrape at the same time')
+PAGE_OUTCOMES = Counter(
+    'crawler_page_outcomes_total', 'Scrapes by page outcome as seen by the rate limiter', ['outcome'])
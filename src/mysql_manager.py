@@ -1,12 +1,26 @@
 import aiomysql
 from mysql.connector import Error
 import os
+import time
+from contextlib import asynccontextmanager
 from dotenv import load_dotenv
 from shared_data import log
+from metrics import MYSQL_QUERY_SECONDS, MYSQL_QUERY_ERRORS
 
 # Load environment variables from .env file
 load_dotenv()
 
+STATEMENT_TYPES = ('SELECT', 'SHOW', 'INSERT', 'UPDATE', 'DELETE', 'REPLACE')
+
+
+def statement_type(query):
+    # First keyword of the statement, ignoring a leading parenthesis as in
+    # (SELECT ...) UNION (SELECT ...)
+    words = query.lstrip(' \t\r\n(').split(None, 1)
+    keyword = words[0].upper() if words else ''
+    return keyword.lower() if keyword in STATEMENT_TYPES else 'other'
+
+
 class MySQLManager:
     def __init__(self):
         self.pool = None
@@ -14,8 +28,13 @@ class MySQLManager:
             'host': os.getenv('MYSQL_HOST', 'mysql'),
             'db': os.getenv('MYSQL_DATABASE', 'linkedin_db'),
             'user': os.getenv('MYSQL_USER', 'root'),
-            'password': os.getenv('MYSQL_PASSWORD', 'rootpassword')
+            'password': os.getenv('MYSQL_PASSWORD', 'rootpassword'),
+            'minsize': int(os.getenv('MYSQL_POOL_MINSIZE', '1')),
+            'maxsize': int(os.getenv('MYSQL_POOL_MAXSIZE', '10')),
+            # Recycle connections before MySQL's wait_timeout closes them
+            'pool_recycle': int(os.getenv('MYSQL_POOL_RECYCLE', '3600'))
         }
+        self.pre_ping = os.getenv('MYSQL_POOL_PRE_PING', 'true').lower() == 'true'
 
     async def connect(self):
         if self.pool is None or self.pool.closed:
@@ -33,26 +52,63 @@ class MySQLManager:
             self.pool = None
             log("MySQL connection closed")
 
-    async def execute_query(self, query, params=None):
+    @asynccontextmanager
+    async def acquire(self):
         if self.pool is None or self.pool.closed:
             await self.connect()
-        
+
         async with self.pool.acquire() as conn:
+            if self.pre_ping:
+                # Transparently replace connections the server has dropped
+                await conn.ping(reconnect=True)
+            yield conn
+
+    async def execute_query(self, query, params=None):
+        statement = statement_type(query)
+        started = time.perf_counter()
+        async with self.acquire() as conn:
             async with conn.cursor(aiomysql.DictCursor) as cur:
                 try:
                     await cur.execute(query, params)
-                    if query.strip().upper().startswith("SELECT") or query.strip().upper().startswith("SHOW"):
+                    if statement in ('select', 'show'):
                         result = await cur.fetchall()
                     else:
                         await conn.commit()
                         result = [{"affected_rows": cur.rowcount}]
                     
+                    MYSQL_QUERY_SECONDS.labels(statement=statement).observe(time.perf_counter() - started)
                     log(f"Query executed successfully: {query[:50]}...")
                     return result
                 except Exception as e:
+                    MYSQL_QUERY_ERRORS.labels(statement=statement).inc()
                     log(f"Error executing query: {e}", "error")
                     raise
 
+    async def stream_query(self, query, params=None, chunk_size=1000):
+        # Unbuffered server-side cursor: rows are read off the socket in
+        # chunks instead of materialising the whole result set in memory
+        async with self.acquire() as conn:
+            async with conn.cursor(aiomysql.SSDictCursor) as cur:
+                await cur.execute(query, params)
+                while True:
+                    rows = await cur.fetchmany(chunk_size)
+                    if not rows:
+                        break
+                    yield rows
+
+    @asynccontextmanager
+    async def transaction(self):
+        async with self.acquire() as conn:
+            async with conn.cursor(aiomysql.DictCursor) as cur:
+                await conn.begin()
+                try:
+                    yield cur
+                    await conn.commit()
+                except Exception as e:
+                    await conn.rollback()
+                    log(f"Transaction rolled back: {e}", "error")
+                    raise
+
     async def __aenter__(self):
         await self.connect()
         return self
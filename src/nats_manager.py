@@ -1,22 +1,38 @@
 import nats
 from nats.errors import ConnectionClosedError, TimeoutError
+from nats.js.api import ConsumerConfig, RetentionPolicy
+from nats.js.errors import BadRequestError
 from shared_data import log
+from metrics import NATS_OPERATION_SECONDS, NATS_OPERATION_ERRORS
 import os
+import json
+import time
 from dotenv import load_dotenv
 import asyncio
 
 # Load environment variables
 load_dotenv()
 
+NDJSON_HEADERS = {'Content-Type': 'application/x-ndjson'}
+
+
+def decode_records(data):
+    # Accepts both single JSON messages and newline-delimited batches
+    return [json.loads(line) for line in data.decode().splitlines() if line.strip()]
+
 class NatsManager:
     def __init__(self):
         self._nc = None
+        self._js = None
         self._nats_url = os.getenv('NATS_URL', 'nats://nats:4222')
+        # Subjects bound to a JetStream stream are published with a PubAck
+        self._stream_subjects = set()
 
     async def connect(self):
         if not self.is_connected():
             try:
                 self._nc = await nats.connect(self._nats_url)
+                self._js = self._nc.jetstream()
                 log(f"Connected to NATS server at {self._nats_url}")
             except Exception as e:
                 log(f"Failed to connect to NATS server: {str(e)}", "error")
@@ -29,16 +45,65 @@ class NatsManager:
 
     async def publish(self, subject, message):
         await self.ensure_connection()
+        started = time.perf_counter()
         try:
-            await self._nc.publish(subject, message.encode())
+            await self._publish(subject, message.encode())
             log(f"Published message to {subject}")
         except ConnectionClosedError:
             log("NATS connection closed. Attempting to reconnect...", "warning")
             await self.connect()
-            await self._nc.publish(subject, message.encode())
+            await self._publish(subject, message.encode())
         except Exception as e:
+            NATS_OPERATION_ERRORS.labels(operation='publish', subject=subject).inc()
             log(f"Error publishing message to NATS: {str(e)}", "error")
             raise
+        NATS_OPERATION_SECONDS.labels(operation='publish', subject=subject).observe(time.perf_counter() - started)
+
+    async def publish_batch(self, subject, records):
+        # Newline-delimited JSON: one record per line, one NATS message per batch
+        payload = b''.join(json.dumps(record, separators=(',', ':')).encode() + b'\n' for record in records)
+        await self.ensure_connection()
+        started = time.perf_counter()
+        try:
+            await self._publish(subject, payload, headers=NDJSON_HEADERS)
+        except ConnectionClosedError:
+            log("NATS connection closed. Attempting to reconnect...", "warning")
+            await self.connect()
+            await self._publish(subject, payload, headers=NDJSON_HEADERS)
+        except Exception as e:
+            NATS_OPERATION_ERRORS.labels(operation='publish_batch', subject=subject).inc()
+            log(f"Error publishing batch to NATS: {str(e)}", "error")
+            raise
+        NATS_OPERATION_SECONDS.labels(operation='publish_batch', subject=subject).observe(time.perf_counter() - started)
+        log(f"Published batch of {len(records)} messages ({len(payload)} bytes) to {subject}")
+
+    async def _publish(self, subject, payload, headers=None):
+        if subject in self._stream_subjects:
+            await self._js.publish(subject, payload, headers=headers)
+        else:
+            await self._nc.publish(subject, payload, headers=headers)
+
+    async def ensure_stream(self, name, subjects):
+        await self.ensure_connection()
+        try:
+            await self._js.add_stream(name=name, subjects=subjects, retention=RetentionPolicy.WORK_QUEUE)
+            log(f"JetStream stream {name} ready for {', '.join(subjects)}")
+        except BadRequestError:
+            # The stream already exists with a different config
+            await self._js.update_stream(name=name, subjects=subjects, retention=RetentionPolicy.WORK_QUEUE)
+            log(f"JetStream stream {name} updated for {', '.join(subjects)}")
+        self._stream_subjects.update(subjects)
+
+    async def pull_subscribe(self, subject, durable, stream=None, ack_wait=None, max_deliver=None):
+        await self.ensure_connection()
+        try:
+            config = ConsumerConfig(ack_wait=ack_wait, max_deliver=max_deliver)
+            subscription = await self._js.pull_subscribe(subject, durable=durable, stream=stream, config=config)
+            log(f"Pull consumer {durable} subscribed to {subject}")
+            return subscription
+        except Exception as e:
+            log(f"Error creating pull consumer for {subject}: {str(e)}", "error")
+            raise
 
     async def subscribe(self, subject, callback):
         await self.ensure_connection()
@@ -54,25 +119,104 @@ class NatsManager:
             try:
                 await self._nc.close()
                 self._nc = None
+                self._js = None
                 log("Disconnected from NATS server")
             except Exception as e:
                 log(f"Error closing NATS connection: {str(e)}", "error")
 
+    async def ping(self, timeout=2):
+        # Round trip to the server over the existing connection
+        await self.ensure_connection()
+        await self._nc.flush(timeout=timeout)
+
+    async def pending_messages(self, stream, durable):
+        # Messages a durable consumer has not been delivered yet
+        await self.ensure_connection()
+        info = await self._js.consumer_info(stream, durable)
+        return info.num_pending or 0
+
     def is_connected(self):
         return self._nc is not None and self._nc.is_connected
 
     async def request(self, subject, payload, timeout=1):
         await self.ensure_connection()
+        started = time.perf_counter()
         try:
             if isinstance(payload, str):
                 payload = payload.encode()
             elif not isinstance(payload, bytes):
                 payload = str(payload).encode()
             response = await self._nc.request(subject, payload, timeout=timeout)
+            NATS_OPERATION_SECONDS.labels(operation='request', subject=subject).observe(time.perf_counter() - started)
             return response
         except TimeoutError:
+            NATS_OPERATION_ERRORS.labels(operation='request', subject=subject).inc()
             log(f"Request to {subject} timed out", "warning")
             return None
         except Exception as e:
+            NATS_OPERATION_ERRORS.labels(operation='request', subject=subject).inc()
             log(f"Error making request to NATS: {str(e)}", "error")
             raise
+
+
+# Buffers records per subject and publishes them with publish_batch once a
+# subject reaches max_messages or max_bytes, or flush_interval has passed.
+class BatchPublisher:
+    def __init__(self, nats_manager: NatsManager, max_messages=None, max_bytes=None, flush_interval=None):
+        self.nats_manager = nats_manager
+        self.max_messages = max_messages or int(os.getenv('NATS_BATCH_MAX_MESSAGES', '100'))
+        self.max_bytes = max_bytes or int(os.getenv('NATS_BATCH_MAX_BYTES', '65536'))
+        self.flush_interval = flush_interval or float(os.getenv('NATS_BATCH_FLUSH_INTERVAL', '0.5'))
+        self._buffers = {}
+        self._sizes = {}
+        self._oldest = {}
+        self._flush_task = None
+
+    async def add(self, subject, record):
+        if self._flush_task is None:
+            self._flush_task = asyncio.create_task(self._flush_periodically())
+        buffer = self._buffers.setdefault(subject, [])
+        if not buffer:
+            self._oldest[subject] = time.monotonic()
+        buffer.append(record)
+        self._sizes[subject] = self._sizes.get(subject, 0) + len(json.dumps(record)) + 1
+        if len(buffer) >= self.max_messages or self._sizes[subject] >= self.max_bytes:
+            await self.flush(subject)
+
+    async def flush(self, subject=None):
+        subjects = [subject] if subject is not None else list(self._buffers)
+        for name in subjects:
+            records = self._buffers.pop(name, [])
+            self._sizes.pop(name, None)
+            self._oldest.pop(name, None)
+            if not records:
+                continue
+            try:
+                await self.nats_manager.publish_batch(name, records)
+            except Exception:
+                # Keep the records so the next flush retries them
+                self._buffers[name] = records + self._buffers.get(name, [])
+                self._sizes[name] = sum(len(json.dumps(record)) + 1 for record in self._buffers[name])
+                self._oldest[name] = time.monotonic()
+                raise
+
+    async def _flush_periodically(self):
+        while True:
+            await asyncio.sleep(self.flush_interval)
+            now = time.monotonic()
+            for subject, oldest in list(self._oldest.items()):
+                if now - oldest >= self.flush_interval:
+                    try:
+                        await self.flush(subject)
+                    except Exception as e:
+                        log(f"Error flushing batch for {subject}: {str(e)}", "error")
+
+    async def close(self):
+        if self._flush_task is not None:
+            self._flush_task.cancel()
+            try:
+                await self._flush_task
+            except asyncio.CancelledError:
+                pass
+            self._flush_task = None
+        await self.flush()
@@ -0,0 +1,240 @@
+import re
+from lxml import html as lxml_html
+
+# Extracts profile and company fields from saved page HTML with lxml. Fields
+# that cannot be found are left out of the result rather than set to None, so
+# an upsert built from it never blanks data the parser does not understand.
+# Values match what the crawlers persist, e.g. experiences in the serialized
+# form stored in linkedin_people.experiences.
+
+PERSON_NAME = ('//main//h1', '//h1')
+PERSON_HEADLINE = ("//main//div[contains(@class, 'text-body-medium')]",)
+PERSON_ABOUT = (
+    "//div[@id='about']/ancestor::section[1]//div[contains(@class, 'inline-show-more-text')]"
+    "//span[@aria-hidden='true']",
+    "//section[contains(@class, 'summary')]//p"
+)
+PERSON_CURRENT_COMPANY = ("//button[contains(@aria-label, 'Current company')]",)
+PROFILE_LINKS = "//aside//a[contains(@href, '/in/')]/@href"
+
+LIST_ITEMS = "//main//section//li[contains(@class, 'pvs-list__paged-list-item')]"
+ITEM_TITLE = ".//div[contains(@class, 't-bold')]//span[@aria-hidden='true']"
+ITEM_SUBTITLE = (".//span[contains(@class, 't-14 t-normal') and not(contains(@class, 't-black--light'))]"
+                 "/span[@aria-hidden='true']")
+ITEM_CAPTIONS = ".//span[contains(@class, 't-black--light')]/span[@aria-hidden='true']"
+ITEM_DESCRIPTION = ".//div[contains(@class, 'inline-show-more-text')]//span[@aria-hidden='true']"
+ITEM_COMPANY_LINK = ".//a[contains(@href, '/company/')]/@href"
+
+SECTION_ITEMS = "//div[@id='{}']/ancestor::section[1]//li//div[contains(@class, 't-bold')]//span[@aria-hidden='true']"
+ACCOMPLISHMENT_SECTIONS = {
+    'honors_and_awards': 'honor',
+    'certifications': 'certification',
+    'publications': 'publication',
+    'projects': 'project',
+    'courses': 'course',
+    'languages': 'language',
+    'patents': 'patent',
+    'test_scores': 'test_score',
+    'organizations': 'organization'
+}
+
+COMPANY_NAME = ('//main//h1', '//h1')
+COMPANY_ABOUT = (
+    "//h2[contains(normalize-space(.), 'Overview')]/following-sibling::p[1]",
+    "//section[contains(@class, 'about')]//p"
+)
+COMPANY_DETAILS = {
+    'website': 'website',
+    'industry': 'industry',
+    'company size': 'company_size',
+    'headquarters': 'headquarters',
+    'founded': 'founded',
+    'specialties': 'specialties'
+}
+EMPLOYEE_LINKS = "//main//li//a[contains(@href, '/in/')]/@href"
+
+
+def clean_text(value):
+    return re.sub(r'\s+', ' ', value or '').strip()
+
+
+def node_text(node):
+    return clean_text(node.text_content() if hasattr(node, 'text_content') else str(node))
+
+
+def first_text(tree, *xpaths):
+    for xpath in xpaths:
+        for node in tree.xpath(xpath):
+            text = node_text(node)
+            if text:
+                return text
+    return None
+
+
+def all_text(tree, xpath):
+    return [text for text in (node_text(node) for node in tree.xpath(xpath)) if text]
+
+
+def page_kind(page_url):
+    # Last path segment that identifies a profile or company sub-page
+    path = page_url.split('://', 1)[-1].split('/', 1)[-1].strip('/')
+    parts = path.split('/')
+    if len(parts) <= 2:
+        return 'main'
+    return '/'.join(parts[2:])
+
+
+def split_specialties(value):
+    return [item.strip() for item in re.split(r',|\band\b', value) if item.strip()]
+
+
+def profile_urls(hrefs, exclude=None):
+    # Profile links carry tracking parameters and come relative or absolute
+    urls = []
+    for href in hrefs:
+        match = re.search(r'/in/([^/?#]+)', href)
+        if not match:
+            continue
+        url = f"https://www.linkedin.com/in/{match.group(1)}/"
+        if url not in urls and url != exclude:
+            urls.append(url)
+    return urls
+
+
+def split_caption(caption):
+    # "Jan 2020 - Present · 4 yrs 2 mos" -> ("Jan 2020", "Present", "4 yrs 2 mos")
+    dates, _, duration = (caption or '').partition(' · ')
+    parts = re.split(r'\s+[-–]\s+', dates, maxsplit=1)
+    to_date = parts[1] if len(parts) == 2 else None
+    return parts[0] or None, to_date, duration or None
+
+
+def parse_experience(item):
+    captions = all_text(item, ITEM_CAPTIONS)
+    from_date, to_date, duration = split_caption(captions[0] if captions else None)
+    subtitle = first_text(item, ITEM_SUBTITLE)
+    links = item.xpath(ITEM_COMPANY_LINK)
+    return {
+        'position_title': first_text(item, ITEM_TITLE),
+        'company': subtitle.split(' · ')[0] if subtitle else None,
+        'date_range': f"{from_date} - {to_date}",
+        'description': first_text(item, ITEM_DESCRIPTION),
+        'location': captions[1] if len(captions) > 1 else None,
+        'duration': duration,
+        'linkedin_url': links[0].split('?')[0] if links else None
+    }
+
+
+def parse_trees(pages):
+    trees = []
+    for page_url, page_html in pages:
+        if page_html and page_html.strip():
+            trees.append((page_kind(page_url), lxml_html.fromstring(page_html)))
+    return trees
+
+
+def parse_profile(tree):
+    fields = {}
+    for column, xpaths in (('name', PERSON_NAME), ('job_title', PERSON_HEADLINE), ('about', PERSON_ABOUT)):
+        value = first_text(tree, *xpaths)
+        if value:
+            fields[column] = value
+    current_company = first_text(tree, *PERSON_CURRENT_COMPANY)
+    if current_company:
+        fields['company'] = current_company
+    return fields
+
+
+def parse_profile_sections(tree):
+    fields = {}
+    interests = all_text(tree, SECTION_ITEMS.format('interests'))
+    if interests:
+        fields['interests'] = interests
+    accomplishments = [
+        {'category': category, 'title': title}
+        for section, category in ACCOMPLISHMENT_SECTIONS.items()
+        for title in all_text(tree, SECTION_ITEMS.format(section))
+    ]
+    if accomplishments:
+        fields['accomplishments'] = accomplishments
+    return fields
+
+
+def parse_contacts(tree, entity_url):
+    own_url = profile_urls([entity_url])
+    return profile_urls(tree.xpath(PROFILE_LINKS), exclude=own_url[0] if own_url else None)
+
+
+def extract_person(entity_url, pages):
+    # Returns (fields, contact profile URLs)
+    fields = {'linkedin_url': entity_url}
+    contacts = []
+    for kind, tree in parse_trees(pages):
+        if kind == 'main':
+            fields.update(parse_profile(tree))
+            fields.update(parse_profile_sections(tree))
+            contacts = parse_contacts(tree, entity_url)
+        elif kind == 'details/experience':
+            experiences = [parse_experience(item) for item in tree.xpath(LIST_ITEMS)]
+            experiences = [experience for experience in experiences if experience['position_title']]
+            if experiences:
+                fields['experiences'] = experiences
+    if 'company' not in fields and fields.get('experiences'):
+        company = fields['experiences'][0]['company']
+        if company:
+            fields['company'] = company
+    return fields, contacts
+
+
+def parse_company_details(tree):
+    # The <dl> of the about page: website, industry, size and so on
+    fields = {}
+    for term in tree.xpath('//dl/dt'):
+        column = COMPANY_DETAILS.get(clean_text(term.text_content()).lower())
+        values = term.xpath('following-sibling::dd[1]')
+        if column is None or not values:
+            continue
+        value = clean_text(values[0].text_content())
+        if column == 'specialties':
+            fields[column] = split_specialties(value)
+        elif value:
+            fields[column] = value
+    return fields
+
+
+def extract_company(entity_url, pages):
+    # Returns (fields, employee profile URLs)
+    fields = {'linkedin_url': entity_url}
+    employees = []
+    for kind, tree in parse_trees(pages):
+        name = first_text(tree, *COMPANY_NAME)
+        if name and 'name' not in fields:
+            fields['name'] = name
+        if kind == 'people':
+            employees = profile_urls(tree.xpath(EMPLOYEE_LINKS))
+        if kind != 'about':
+            continue
+        about = first_text(tree, *COMPANY_ABOUT)
+        if about:
+            fields['about'] = about
+        fields.update(parse_company_details(tree))
+    return fields, employees
+
+
+def parse_person(entity_url, pages):
+    return extract_person(entity_url, pages)[0]
+
+
+def parse_company(entity_url, pages):
+    return extract_company(entity_url, pages)[0]
+
+
+EXTRACTORS = {
+    'person': extract_person,
+    'company': extract_company
+}
+
+PARSERS = {
+    'person': parse_person,
+    'company': parse_company
+}
@@ -0,0 +1,88 @@
+import base64
+import json
+
+
+# Keyset ("seek") pagination over ORDER BY sort_col, id. Pages are addressed by
+# the (sort value, id) of a boundary row instead of an OFFSET, so every page
+# costs one index range scan no matter how deep it is.
+
+def encode_cursor(row, sort_by):
+    payload = json.dumps([row[sort_by], row['id']], default=str)
+    return base64.urlsafe_b64encode(payload.encode()).decode().rstrip('=')
+
+
+def decode_cursor(cursor):
+    padded = cursor + '=' * (-len(cursor) % 4)
+    value, row_id = json.loads(base64.urlsafe_b64decode(padded.encode()).decode())
+    return value, int(row_id)
+
+
+def _after_condition(sort_by, direction, value):
+    # Rows strictly after (value, id) in ORDER BY sort_by <direction>, id <direction>.
+    # MySQL sorts NULLs first ascending and last descending.
+    if direction == 'asc':
+        if value is None:
+            return f"(({sort_by} IS NULL AND id > %s) OR {sort_by} IS NOT NULL)", []
+        return f"({sort_by} > %s OR ({sort_by} = %s AND id > %s))", [value, value]
+    if value is None:
+        return f"({sort_by} IS NULL AND id < %s)", []
+    return f"({sort_by} < %s OR ({sort_by} = %s AND id < %s) OR {sort_by} IS NULL)", [value, value]
+
+
+def build_page_query(table_name, sort_by, sort_order, per_page, after=None, before=None):
+    # Returns (query, params, reverse). Callers must reverse the fetched rows
+    # when reverse is set; one extra row is fetched to detect another page.
+    direction = sort_order
+    cursor = after
+    reverse = False
+    if before is not None:
+        # Walk backwards from the first row of the current page
+        direction = 'desc' if sort_order == 'asc' else 'asc'
+        cursor = before
+        reverse = True
+
+    where = ""
+    params = []
+    if cursor is not None:
+        value, row_id = cursor
+        condition, params = _after_condition(sort_by, direction, value)
+        where = f"WHERE {condition}"
+        params = params + [row_id]
+
+    if sort_by == 'id':
+        order = f"id {direction}"
+        if cursor is not None:
+            where = "WHERE id > %s" if direction == 'asc' else "WHERE id < %s"
+            params = [cursor[1]]
+    else:
+        order = f"{sort_by} {direction}, id {direction}"
+
+    query = f"SELECT * FROM {table_name} {where} ORDER BY {order} LIMIT %s"
+    return query, params + [per_page + 1], reverse
+
+
+# Change cursors for delta exports. A cursor is the exclusive upper bound of
+# the previous export's updated_at window; the next export resumes from it, so
+# consecutive windows [since, until) cover every change exactly once.
+
+def encode_change_cursor(until):
+    payload = json.dumps({'until': str(until)})
+    return base64.urlsafe_b64encode(payload.encode()).decode().rstrip('=')
+
+
+def decode_change_cursor(cursor):
+    padded = cursor + '=' * (-len(cursor) % 4)
+    return json.loads(base64.urlsafe_b64decode(padded.encode()).decode())['until']
+
+
+def build_delta_query(table_name, columns, since, until):
+    # Returns (query, params) for rows changed in [since, until), walking the
+    # updated_at index in order. since may be None for the first sync.
+    select = ', '.join(f'`{column}`' for column in columns)
+    conditions = ["updated_at < %s"]
+    params = [until]
+    if since is not None:
+        conditions.insert(0, "updated_at >= %s")
+        params.insert(0, since)
+    query = f"SELECT {select} FROM `{table_name}` WHERE {' AND '.join(conditions)} ORDER BY updated_at, id"
+    return query, params
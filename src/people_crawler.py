@@ -1,68 +1,122 @@
 from linkedin_scraper import Person
 from shared_data import log, emit_crawler_update
 from linkedin_session import LinkedInSession
-from nats_manager import NatsManager
+from session_pool import SessionPool
+from scrape_executor import ScrapeExecutor
+from visited_cache import VisitedSet
+from batch_writer import BatchWriter, json_or_none
+from snapshot_store import PageSnapshots
+from extraction_engine import LxmlScraper, engine_name
+from frontier_scheduler import ProvenanceLog, discovered_url, max_depth
+from recrawl_scheduler import RecrawlSchedule
+from nats_manager import NatsManager, BatchPublisher
 from mysql_manager import MySQLManager
-import json
+from metrics import CRAWL_STAGE_SECONDS, CRAWL_RESULTS
+import asyncio
+import time
+from datetime import datetime
+from typing import Optional, Union
 
+# Uses VALUES() rather than a row alias so executemany can send the whole
+# batch as a single multi-row INSERT. A NULL field was not found on the page
+# and keeps the stored value.
+PERSON_UPSERT_QUERY = """
+    INSERT INTO linkedin_people
+    (name, about, experiences, interests, accomplishments,
+    company, job_title, linkedin_url)
+    VALUES (%s, %s, %s, %s, %s, %s, %s, %s)
+    ON DUPLICATE KEY UPDATE
+    name = COALESCE(VALUES(name), name),
+    about = COALESCE(VALUES(about), about),
+    experiences = COALESCE(VALUES(experiences), experiences),
+    interests = COALESCE(VALUES(interests), interests),
+    accomplishments = COALESCE(VALUES(accomplishments), accomplishments),
+    company = COALESCE(VALUES(company), company),
+    job_title = COALESCE(VALUES(job_title), job_title)
+"""
 
 class PeopleCrawler:
-    def __init__(self, linkedin_session: LinkedInSession, nats_manager: NatsManager, mysql_manager: MySQLManager):
-        self.driver = linkedin_session.get_driver()
+    def __init__(self, sessions: Union[LinkedInSession, SessionPool], nats_manager: NatsManager, mysql_manager: MySQLManager,
+                 scrape_executor: Optional[ScrapeExecutor] = None, visited_people: Optional[VisitedSet] = None,
+                 url_publisher: Optional[BatchPublisher] = None, person_writer: Optional[BatchWriter] = None,
+                 snapshots: Optional[PageSnapshots] = None, provenance: Optional[ProvenanceLog] = None,
+                 schedule: Optional[RecrawlSchedule] = None):
+        self.sessions = sessions
         self.nats_manager = nats_manager
         self.mysql_manager = mysql_manager
+        self._owns_executor = scrape_executor is None
+        self.scrape_executor = scrape_executor or ScrapeExecutor()
+        self.visited_people = visited_people or VisitedSet(mysql_manager, 'linkedin_people')
+        self._owns_publisher = url_publisher is None
+        self.url_publisher = url_publisher or BatchPublisher(nats_manager)
+        self._owns_writer = person_writer is None
+        self.person_writer = person_writer or BatchWriter(mysql_manager, PERSON_UPSERT_QUERY, 'linkedin_people')
+        self._owns_snapshots = snapshots is None
+        self.snapshots = snapshots or PageSnapshots(mysql_manager)
+        self.scraper = Person if engine_name() == 'selenium' else LxmlScraper('person')
+        self._owns_provenance = provenance is None
+        self.provenance = provenance or ProvenanceLog(mysql_manager)
+        self._owns_schedule = schedule is None
+        self.schedule = schedule or RecrawlSchedule(mysql_manager)
+        self.max_depth = max_depth()
 
-    async def crawl_profile(self, linkedin_url, is_seed=False):
+    async def crawl_profile(self, linkedin_url, is_seed=False, depth=0, seed_url=None, recrawl=False):
         log(f"Crawling profile: {linkedin_url}")
         try:
-            if not await self._is_profile_scanned(linkedin_url) or is_seed:
-                person = Person(linkedin_url, driver=self.driver)
-                await self._process_person(person, is_seed)
-                await self._process_contacts(person)
+            # Seeds and entities due for a refresh are crawled even if already stored
+            if not await self._is_profile_scanned(linkedin_url) or is_seed or recrawl:
+                waiting = time.perf_counter()
+                async with self.sessions.checkout() as session:
+                    CRAWL_STAGE_SECONDS.labels(crawler='person', stage='session_wait').observe(time.perf_counter() - waiting)
+                    # Either extraction engine loads and parses the profile in one call
+                    fetched_at = datetime.now()
+                    with CRAWL_STAGE_SECONDS.labels(crawler='person', stage='scrape').time():
+                        person, pages = await self.scrape_executor.scrape(
+                            session, self.snapshots.scrape, self.scraper, linkedin_url, close_on_complete=False)
+                with CRAWL_STAGE_SECONDS.labels(crawler='person', stage='store').time():
+                    await asyncio.gather(
+                        self._process_person(person, is_seed),
+                        self.snapshots.save('person', linkedin_url, pages, fetched_at)
+                    )
+                with CRAWL_STAGE_SECONDS.labels(crawler='person', stage='discover').time():
+                    await self._process_contacts(person, linkedin_url, depth, seed_url or linkedin_url)
+                CRAWL_RESULTS.labels(crawler='person', result='crawled').inc()
                 log(f"Profile processed: {linkedin_url}", "debug")
                 return person
             else:
+                CRAWL_RESULTS.labels(crawler='person', result='skipped').inc()
                 log(f"Profile already scanned, skipping: {linkedin_url}", "debug")
             return None
         except Exception as e:
+            CRAWL_RESULTS.labels(crawler='person', result='error').inc()
             log(f"Error crawling profile {linkedin_url}: {str(e)}", "error")
             raise
 
     async def _is_profile_scanned(self, linkedin_url):
-        query = "SELECT COUNT(*) as count FROM linkedin_people WHERE linkedin_url = %s"
-        result = await self.mysql_manager.execute_query(query, (linkedin_url,))
-        return result[0]['count'] > 0
+        return await self.visited_people.contains(linkedin_url)
 
     async def _process_person(self, person, is_seed=False):
-        query = """
-            INSERT INTO linkedin_people 
-            (name, about, experiences, interests, accomplishments,
-            company, job_title, linkedin_url) 
-            VALUES (%s, %s, %s, %s, %s, %s, %s, %s)
-            AS new_values
-            ON DUPLICATE KEY UPDATE
-            name = new_values.name, 
-            about = new_values.about, 
-            experiences = new_values.experiences, 
-            interests = new_values.interests,
-            accomplishments = new_values.accomplishments, 
-            company = new_values.company,
-            job_title = new_values.job_title
-        """
         values = (
             person.name,
             person.about,
-            json.dumps(self._serialize_experiences(person.experiences)),
-            json.dumps(person.interests),
-            json.dumps(person.accomplishments),
+            json_or_none(self._serialize_experiences(person.experiences)),
+            json_or_none(person.interests),
+            json_or_none(person.accomplishments),
             person.company,
             person.job_title,
             person.linkedin_url
         )
-        await self.mysql_manager.execute_query(query, values)
+        # The schedule learns from each crawl whether the entity changed
+        await asyncio.gather(
+            self.person_writer.write(values),
+            self.schedule.record('person', person.linkedin_url, values)
+        )
+        self.visited_people.add(person.linkedin_url)
         await self._emit_crawler_update(person)
 
     def _serialize_experiences(self, experiences):
+        if experiences is None:
+            return None
         serialized = []
         for exp in experiences:
             serialized.append({
@@ -84,16 +138,32 @@ class PeopleCrawler:
         }
         emit_crawler_update(update_data)
 
-    async def _process_contacts(self, person):
-        for contact in person.contacts:
-            if not await self._is_profile_scanned(contact):
-                await self.nats_manager.publish(
-                    "linkedin_people_urls", json.dumps({"url": contact})
-                )
+    async def _process_contacts(self, person, source_url, depth, seed_url):
+        if depth + 1 > self.max_depth:
+            log(f"Not following contacts of {source_url}, already {depth} hops from {seed_url}", "debug")
+            return
+        crawled_at = time.time()
+        contacts = await self.visited_people.filter_unseen(person.contacts)
+        for contact in contacts:
+            await self.url_publisher.add(
+                "linkedin_people_urls", discovered_url(contact, depth + 1, seed_url, source_url, crawled_at))
+        await self.provenance.record('person', contacts, depth + 1, seed_url, source_url)
 
     async def run(self, initial_url):
         await self.crawl_profile(initial_url)
 
     async def close(self):
         log("Closing PeopleCrawler...", "debug")
+        if self._owns_writer:
+            await self.person_writer.close()
+        if self._owns_publisher:
+            await self.url_publisher.close()
+        if self._owns_snapshots:
+            await self.snapshots.close()
+        if self._owns_provenance:
+            await self.provenance.close()
+        if self._owns_schedule:
+            await self.schedule.close()
+        if self._owns_executor:
+            self.scrape_executor.close()
         log("PeopleCrawler closed.")
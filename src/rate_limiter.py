@@ -0,0 +1,190 @@
+import asyncio
+import os
+import time
+from dotenv import load_dotenv
+from metrics import SESSION_REQUEST_RATE, SESSION_CONCURRENCY_LIMIT, PAGE_OUTCOMES
+from shared_data import log
+
+# Load environment variables from .env file
+load_dotenv()
+
+# Scrape outcomes, as classified by LinkedInSession.page_outcome
+SUCCESS_OUTCOMES = ('ok',)
+# LinkedIn pushing back: slow down and keep the session idle for a while
+BLOCKING_OUTCOMES = ('throttled', 'challenge', 'logged_out')
+# Signs of overload that only halve the rate
+CONGESTION_OUTCOMES = ('slow', 'timeout', 'error_page')
+
+
+# Token bucket pacing the scrapes of one LinkedInSession. The rate (scrapes
+# per minute) adapts with additive increase / multiplicative decrease: every
+# clean scrape adds RATE_LIMIT_INCREASE, congestion multiplies the rate by
+# RATE_LIMIT_DECREASE, and throttling, challenges or login redirects also
+# pause the session for RATE_LIMIT_COOLDOWN seconds. Other errors (a missing
+# element, a parse failure) leave the rate alone.
+class AdaptiveRateLimiter:
+    def __init__(self, name, rate=None, min_rate=None, max_rate=None, burst=None, increase=None,
+                 decrease=None, latency_target=None, cooldown=None, window=None, clock=time.monotonic):
+        self.name = name
+        self.rate = rate or float(os.getenv('RATE_LIMIT_INITIAL', '4'))
+        self.min_rate = min_rate or float(os.getenv('RATE_LIMIT_MIN', '0.5'))
+        self.max_rate = max_rate or float(os.getenv('RATE_LIMIT_MAX', '20'))
+        self.burst = burst or float(os.getenv('RATE_LIMIT_BURST', '2'))
+        self.increase = increase or float(os.getenv('RATE_LIMIT_INCREASE', '0.25'))
+        self.decrease = decrease or float(os.getenv('RATE_LIMIT_DECREASE', '0.5'))
+        self.latency_target = latency_target or float(os.getenv('RATE_LIMIT_LATENCY_TARGET', '30'))
+        self.cooldown = cooldown if cooldown is not None else float(os.getenv('RATE_LIMIT_COOLDOWN', '600'))
+        self.window = window
+        self.clock = clock
+        self.tokens = self.burst
+        self.updated = clock()
+        self.blocked_until = 0.0
+        SESSION_REQUEST_RATE.labels(session=name).set(self.rate)
+
+    def _refill(self, now):
+        # No tokens accrue during a pause, so a session resumes at its
+        # lowered rate rather than with a full burst
+        start = max(self.updated, self.blocked_until)
+        if now > start:
+            self.tokens = min(self.burst, self.tokens + (now - start) * self.rate / 60)
+        self.updated = now
+
+    def wait_time(self):
+        # Seconds until the next scrape may start
+        now = self.clock()
+        self._refill(now)
+        if now < self.blocked_until:
+            return self.blocked_until - now
+        if self.tokens >= 1:
+            return 0.0
+        return (1 - self.tokens) * 60 / self.rate
+
+    def delay(self):
+        # Same as wait_time(), but takes a token when it is 0
+        wait = self.wait_time()
+        if wait <= 0:
+            self.tokens -= 1
+        return wait
+
+    async def acquire(self):
+        while True:
+            wait = self.delay()
+            if wait <= 0:
+                return
+            await asyncio.sleep(wait)
+
+    def record(self, outcome, latency=None):
+        if outcome in SUCCESS_OUTCOMES and latency is not None and latency > self.latency_target:
+            outcome = 'slow'
+        PAGE_OUTCOMES.labels(outcome=outcome).inc()
+        previous = self.rate
+        if outcome in SUCCESS_OUTCOMES:
+            self.rate = min(self.max_rate, self.rate + self.increase)
+        elif outcome in CONGESTION_OUTCOMES or outcome in BLOCKING_OUTCOMES:
+            self.rate = max(self.min_rate, self.rate * self.decrease)
+        if outcome in BLOCKING_OUTCOMES:
+            self.tokens = 0.0
+            self.blocked_until = self.clock() + self.cooldown
+            log(f"Session {self.name} hit {outcome}, pausing {self.cooldown:.0f}s at {self.rate:.2f} scrapes/min", "warning")
+        elif self.rate < previous:
+            log(f"Session {self.name} {outcome}, rate lowered to {self.rate:.2f} scrapes/min", "debug")
+        SESSION_REQUEST_RATE.labels(session=self.name).set(self.rate)
+        if self.window is not None:
+            self.window.record(outcome)
+        return outcome
+
+
+# How many pool sessions may scrape at once, shared by every session of an
+# account. Additive increase of one slot per window's worth of clean scrapes,
+# halved on congestion or blocking.
+class ConcurrencyWindow:
+    def __init__(self, maximum, minimum=1):
+        self.maximum = maximum
+        self.minimum = minimum
+        self.limit = float(maximum)
+        self.active = 0
+        self._waiters = []
+        SESSION_CONCURRENCY_LIMIT.set(self.limit)
+
+    def resize(self, maximum):
+        # Browsers that failed to start can't take part in the window
+        self.maximum = maximum
+        self.limit = min(self.limit, float(maximum))
+        SESSION_CONCURRENCY_LIMIT.set(self.limit)
+
+    async def acquire(self):
+        while self.active >= int(self.limit):
+            waiter = asyncio.get_running_loop().create_future()
+            self._waiters.append(waiter)
+            try:
+                await waiter
+            finally:
+                if waiter in self._waiters:
+                    self._waiters.remove(waiter)
+        self.active += 1
+
+    def release(self):
+        self.active -= 1
+        self._wake()
+
+    async def __aenter__(self):
+        await self.acquire()
+        return self
+
+    async def __aexit__(self, exc_type, exc_val, exc_tb):
+        self.release()
+
+    def _wake(self):
+        # Waiters re-check the limit, so waking all of them is safe
+        waiters, self._waiters = self._waiters, []
+        for waiter in waiters:
+            if not waiter.done():
+                waiter.set_result(None)
+
+    def record(self, outcome):
+        previous = int(self.limit)
+        if outcome in SUCCESS_OUTCOMES:
+            self.limit = min(float(self.maximum), self.limit + 1 / self.limit)
+        elif outcome in CONGESTION_OUTCOMES or outcome in BLOCKING_OUTCOMES:
+            self.limit = max(float(self.minimum), self.limit / 2)
+        SESSION_CONCURRENCY_LIMIT.set(self.limit)
+        if int(self.limit) > previous:
+            self._wake()
+
+
+# Idle sessions of a pool. get() hands out a session whose rate limiter lets
+# it scrape right away, so a session paused after throttling does not keep a
+# worker and its concurrency slot waiting out the cooldown while other
+# browsers sit idle. With none ready it waits for the soonest one, or for a
+# session to be put back.
+class ReadySessions:
+    def __init__(self):
+        self._idle = []
+        self._waiters = []
+
+    def __len__(self):
+        return len(self._idle)
+
+    def put(self, session):
+        self._idle.append(session)
+        waiters, self._waiters = self._waiters, []
+        for waiter in waiters:
+            if not waiter.done():
+                waiter.set_result(None)
+
+    async def get(self):
+        while True:
+            wait = None
+            if self._idle:
+                waits = [session.rate_limiter.wait_time() for session in self._idle]
+                soonest = waits.index(min(waits))
+                if waits[soonest] <= 0:
+                    return self._idle.pop(soonest)
+                wait = waits[soonest]
+            waiter = asyncio.get_running_loop().create_future()
+            self._waiters.append(waiter)
+            try:
+                await asyncio.wait([waiter], timeout=wait)
+            finally:
+                if waiter in self._waiters:
+                    self._waiters.remove(waiter)
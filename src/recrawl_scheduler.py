@@ -0,0 +1,146 @@
+import hashlib
+import json
+import os
+import socket
+import time
+from datetime import datetime, timedelta
+from dotenv import load_dotenv
+from batch_writer import BatchWriter
+from frontier_scheduler import max_depth
+from mysql_manager import MySQLManager
+from shared_data import log
+
+# Load environment variables from .env file
+load_dotenv()
+
+
+def schedule_upsert_query(min_interval, max_interval, backoff, speedup):
+    # Records a crawl and adapts the entity's revisit interval: shortened when
+    # its content hash changed, lengthened when it did not. MySQL applies the
+    # assignments in order, so everything comparing against the old
+    # content_hash comes before it is replaced and next_crawl_at uses the new
+    # interval. Only VALUES holds placeholders, and the bounds are literals,
+    # so executemany can still send a batch as one multi-row INSERT.
+    return f"""
+        INSERT INTO crawl_schedule
+        (url, url_type, content_hash, last_crawled, last_changed, interval_seconds, next_crawl_at)
+        VALUES (%s, %s, %s, %s, %s, %s, %s)
+        ON DUPLICATE KEY UPDATE
+        change_count = change_count + IF(content_hash <> VALUES(content_hash), 1, 0),
+        last_changed = IF(content_hash <> VALUES(content_hash), VALUES(last_crawled), last_changed),
+        interval_seconds = CASE
+            WHEN content_hash IS NULL THEN interval_seconds
+            WHEN content_hash <> VALUES(content_hash) THEN GREATEST({int(min_interval)}, ROUND(interval_seconds * {float(speedup)}))
+            ELSE LEAST({int(max_interval)}, ROUND(interval_seconds * {float(backoff)}))
+        END,
+        content_hash = VALUES(content_hash),
+        check_count = check_count + 1,
+        last_crawled = VALUES(last_crawled),
+        next_crawl_at = VALUES(last_crawled) + INTERVAL interval_seconds SECOND,
+        lease_expires_at = NULL,
+        leased_by = NULL
+    """
+
+
+def content_hash(values):
+    # Hash of the extracted fields, not the raw page, which differs on every
+    # fetch because of tracking parameters and tokens
+    return hashlib.sha256(json.dumps(values, default=str).encode()).hexdigest()
+
+
+# Crawls allowed per hour for recrawls, so refreshing known entities never
+# takes more than a fixed share of browser time from new URLs
+class RecrawlBudget:
+    def __init__(self, per_hour=None, clock=time.monotonic):
+        self.per_hour = per_hour if per_hour is not None else float(os.getenv('RECRAWL_BUDGET_PER_HOUR', '30'))
+        self.clock = clock
+        self.tokens = min(self.per_hour, 1.0)
+        self.updated = clock()
+
+    def available(self):
+        now = self.clock()
+        self.tokens = min(self.per_hour, self.tokens + (now - self.updated) * self.per_hour / 3600)
+        self.updated = now
+        return int(self.tokens)
+
+    def spend(self, count):
+        self.tokens -= count
+
+
+# Per-entity revisit schedule in crawl_schedule. Every stored crawl updates
+# the entity's interval from its change history (RECRAWL_INITIAL_INTERVAL for
+# new entities, halved on change, doubled when unchanged, within
+# RECRAWL_MIN_INTERVAL..RECRAWL_MAX_INTERVAL). Due entities are claimed with
+# a lease, most overdue relative to their interval first.
+class RecrawlSchedule:
+    def __init__(self, mysql_manager: MySQLManager, writer=None, worker_id=None, lease_seconds=None):
+        self.mysql_manager = mysql_manager
+        self.initial_interval = int(os.getenv('RECRAWL_INITIAL_INTERVAL', str(7 * 24 * 3600)))
+        self.min_interval = int(os.getenv('RECRAWL_MIN_INTERVAL', str(24 * 3600)))
+        self.max_interval = int(os.getenv('RECRAWL_MAX_INTERVAL', str(180 * 24 * 3600)))
+        self.worker_id = worker_id or f"{socket.gethostname()}-{os.getpid()}"
+        self.lease_seconds = lease_seconds or int(os.getenv('SEED_LEASE_SECONDS', '900'))
+        self._owns_writer = writer is None
+        self.writer = writer or BatchWriter(mysql_manager, schedule_upsert_query(
+            self.min_interval, self.max_interval,
+            float(os.getenv('RECRAWL_BACKOFF', '2.0')), float(os.getenv('RECRAWL_SPEEDUP', '0.5'))
+        ), 'crawl_schedule')
+
+    async def record(self, url_type, url, values):
+        try:
+            now = datetime.now()
+            await self.writer.write((
+                url, url_type, content_hash(values), now, now,
+                self.initial_interval, now + timedelta(seconds=self.initial_interval)
+            ))
+        except Exception as e:
+            log(f"Error updating recrawl schedule for {url}: {str(e)}", "error")
+
+    async def claim(self, url_type, limit):
+        # Returns [(url, depth, seed_url)] of entities due for a recrawl.
+        # Seeds are depth 0; entities with no recorded provenance are given
+        # max_depth so a refresh does not expand the graph from them.
+        select_query = """
+            SELECT s.id, s.url, COALESCE(p.depth, IF(su.id IS NULL, %s, 0)) AS depth, p.seed_url
+            FROM crawl_schedule s
+            LEFT JOIN url_provenance p ON p.url = s.url
+            LEFT JOIN seed_urls su ON su.url = s.url
+            WHERE s.url_type = %s AND s.next_crawl_at <= NOW()
+            AND (s.lease_expires_at IS NULL OR s.lease_expires_at < NOW())
+            ORDER BY TIMESTAMPDIFF(SECOND, s.last_crawled, NOW()) / s.interval_seconds DESC
+            LIMIT %s
+            FOR UPDATE OF s SKIP LOCKED
+        """
+        async with self.mysql_manager.transaction() as cur:
+            await cur.execute(select_query, (max_depth(), url_type, limit))
+            rows = await cur.fetchall()
+            if not rows:
+                return []
+
+            ids = [row['id'] for row in rows]
+            placeholders = ', '.join(['%s'] * len(ids))
+            lease_query = f"""
+                UPDATE crawl_schedule
+                SET lease_expires_at = NOW() + INTERVAL %s SECOND, leased_by = %s
+                WHERE id IN ({placeholders})
+            """
+            await cur.execute(lease_query, (self.lease_seconds, self.worker_id, *ids))
+
+        log(f"Claimed {len(rows)} {url_type} entities due for a recrawl")
+        return [(row['url'], row['depth'], row['seed_url'] or row['url']) for row in rows]
+
+    async def release(self, urls):
+        if not urls:
+            return
+        placeholders = ', '.join(['%s'] * len(urls))
+        query = f"""
+            UPDATE crawl_schedule
+            SET lease_expires_at = NULL, leased_by = NULL
+            WHERE url IN ({placeholders}) AND leased_by = %s
+        """
+        await self.mysql_manager.execute_query(query, (*urls, self.worker_id))
+        log(f"Released {len(urls)} unstarted recrawls")
+
+    async def close(self):
+        if self._owns_writer:
+            await self.writer.close()
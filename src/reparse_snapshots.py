@@ -0,0 +1,173 @@
+import argparse
+import asyncio
+import json
+import os
+from concurrent.futures import ProcessPoolExecutor
+from dotenv import load_dotenv
+from mysql_manager import MySQLManager
+from snapshot_store import SnapshotStore
+from page_parser import PARSERS
+from shared_data import log, flush_logs
+
+# Load environment variables from .env file
+load_dotenv()
+
+# Rebuilds linkedin_people / linkedin_companies rows from stored page
+# snapshots, without a browser. Parsing runs across a process pool; each
+# entity uses the pages from its most recent crawl.
+#
+#   python reparse_snapshots.py --type person --workers 8
+
+TABLES = {
+    'person': 'linkedin_people',
+    'company': 'linkedin_companies'
+}
+JSON_FIELDS = {'experiences', 'interests', 'accomplishments', 'specialties'}
+
+LATEST_SNAPSHOTS_QUERY = """
+    SELECT s.entity_url AS entity_url, s.page_url AS page_url, s.content_hash AS content_hash
+    FROM page_snapshots s
+    JOIN (
+        SELECT entity_url, MAX(fetched_at) AS fetched_at
+        FROM page_snapshots
+        WHERE entity_type = %s AND fetched_at >= %s
+        GROUP BY entity_url
+    ) latest ON latest.entity_url = s.entity_url AND latest.fetched_at = s.fetched_at
+    WHERE s.entity_type = %s
+    ORDER BY s.entity_url
+"""
+
+_store = None
+
+
+def _init_worker(directory):
+    global _store
+    _store = SnapshotStore(directory=directory, enabled=True)
+
+
+def parse_entity(entity_type, entity_url, pages):
+    # Runs in a worker process: decompress and parse one entity's pages
+    html_pages = [(page_url, _store.get(digest)) for page_url, digest in pages]
+    return PARSERS[entity_type](entity_url, html_pages)
+
+
+def build_upsert(table_name, columns):
+    # Only the parsed columns are written, so fields the parser does not
+    # extract keep their crawled values
+    assignments = ', '.join(f"{column} = VALUES({column})" for column in columns if column != 'linkedin_url')
+    query = f"""
+        INSERT INTO {table_name} ({', '.join(columns)})
+        VALUES ({', '.join(['%s'] * len(columns))})
+        ON DUPLICATE KEY UPDATE {assignments}
+    """
+    return query
+
+
+def row_values(fields, columns):
+    return tuple(
+        json.dumps(fields[column]) if column in JSON_FIELDS else fields[column]
+        for column in columns
+    )
+
+
+async def iter_entities(mysql_manager, entity_type, since):
+    # Groups the ordered snapshot rows into (entity_url, [(page_url, hash)])
+    current, pages = None, []
+    async for rows in mysql_manager.stream_query(LATEST_SNAPSHOTS_QUERY, (entity_type, since, entity_type)):
+        for row in rows:
+            if row['entity_url'] != current and pages:
+                yield current, pages
+                pages = []
+            current = row['entity_url']
+            pages.append((row['page_url'], row['content_hash']))
+    if pages:
+        yield current, pages
+
+
+class RowSink:
+    def __init__(self, mysql_manager, table_name, batch_size, dry_run):
+        self.mysql_manager = mysql_manager
+        self.table_name = table_name
+        self.batch_size = batch_size
+        self.dry_run = dry_run
+        self.batches = {}
+        self.written = 0
+
+    async def add(self, fields):
+        columns = ('linkedin_url',) + tuple(sorted(column for column in fields if column != 'linkedin_url'))
+        if len(columns) == 1:
+            return
+        batch = self.batches.setdefault(columns, [])
+        batch.append(row_values(fields, columns))
+        if len(batch) >= self.batch_size:
+            await self.flush(columns)
+
+    async def flush(self, columns=None):
+        for key in [columns] if columns else list(self.batches):
+            rows = self.batches.pop(key, [])
+            if not rows:
+                continue
+            if not self.dry_run:
+                async with self.mysql_manager.transaction() as cur:
+                    await cur.executemany(build_upsert(self.table_name, key), rows)
+            self.written += len(rows)
+
+
+async def reparse(entity_type, workers, since, batch_size, dry_run):
+    mysql_manager = MySQLManager()
+    store = SnapshotStore(enabled=True)
+    sink = RowSink(mysql_manager, TABLES[entity_type], batch_size, dry_run)
+    loop = asyncio.get_running_loop()
+    parsed = failed = 0
+    try:
+        await mysql_manager.connect()
+        with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                                 initargs=(store.directory,)) as pool:
+            in_flight = {}
+
+            async def collect(done):
+                nonlocal parsed, failed
+                for future in done:
+                    entity_url = in_flight.pop(future)
+                    try:
+                        await sink.add(future.result())
+                        parsed += 1
+                    except Exception as e:
+                        failed += 1
+                        log(f"Error re-parsing {entity_url}: {str(e)}", "error")
+
+            async for entity_url, pages in iter_entities(mysql_manager, entity_type, since):
+                future = loop.run_in_executor(pool, parse_entity, entity_type, entity_url, pages)
+                in_flight[future] = entity_url
+                # Bounded read-ahead keeps every worker busy without loading
+                # the whole snapshot index into memory
+                if len(in_flight) >= workers * 4:
+                    done, _ = await asyncio.wait(list(in_flight), return_when=asyncio.FIRST_COMPLETED)
+                    await collect(done)
+            if in_flight:
+                done, _ = await asyncio.wait(list(in_flight))
+                await collect(done)
+        await sink.flush()
+        action = "Parsed" if dry_run else "Rebuilt"
+        log(f"{action} {sink.written} {TABLES[entity_type]} rows from {parsed} snapshots ({failed} failed)")
+    finally:
+        await mysql_manager.disconnect()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Rebuild crawled rows from stored page snapshots")
+    parser.add_argument('--type', choices=['person', 'company', 'all'], default='all')
+    parser.add_argument('--workers', type=int, default=os.cpu_count() or 1)
+    parser.add_argument('--since', default='1970-01-01', help="Only entities crawled since this date")
+    parser.add_argument('--batch-size', type=int, default=500)
+    parser.add_argument('--dry-run', action='store_true', help="Parse without writing to MySQL")
+    args = parser.parse_args()
+
+    entity_types = ['company', 'person'] if args.type == 'all' else [args.type]
+    for entity_type in entity_types:
+        asyncio.run(reparse(entity_type, args.workers, args.since, args.batch_size, args.dry_run))
+    flush_logs()
+
+
+if __name__ == '__main__':
+    main()
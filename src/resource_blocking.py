@@ -0,0 +1,110 @@
+import json
+import os
+from dotenv import load_dotenv
+from metrics import BROWSER_BLOCKED_REQUESTS, BROWSER_BYTES_SAVED, BROWSER_TRANSFERRED_BYTES
+from shared_data import log
+
+# Load environment variables from .env file
+load_dotenv()
+
+MEDIA_PATTERNS = [
+    "*.png", "*.jpg", "*.jpeg", "*.gif", "*.webp", "*.avif", "*.svg", "*.ico",
+    "*.woff", "*.woff2", "*.ttf", "*.otf",
+    "*.mp4", "*.webm", "*.m3u8", "*.mp3",
+    "*media.licdn.com/dms/image/*", "*media.licdn.com/dms/video/*"
+]
+
+TRACKER_PATTERNS = [
+    "*px.ads.linkedin.com/*", "*snap.licdn.com/*", "*platform.linkedin.com/litms/*",
+    "*google-analytics.com/*", "*googletagmanager.com/*", "*doubleclick.net/*",
+    "*googlesyndication.com/*", "*bat.bing.com/*", "*connect.facebook.net/*",
+    "*scorecardresearch.com/*", "*demdex.net/*", "*omtrdc.net/*"
+]
+
+# Person and Company only read DOM text, so nothing here is needed to scrape
+BLOCK_PROFILES = {
+    'off': [],
+    'media': MEDIA_PATTERNS,
+    'strict': MEDIA_PATTERNS + TRACKER_PATTERNS
+}
+
+# Rough transfer size of a blocked request by resource type. Blocked requests
+# are never fetched, so bytes saved can only be estimated.
+ESTIMATED_BYTES = {
+    'Image': 40000,
+    'Font': 50000,
+    'Media': 500000,
+    'Script': 60000,
+    'Stylesheet': 30000
+}
+DEFAULT_ESTIMATED_BYTES = 5000
+
+
+def summarize_performance_log(entries):
+    # Reduces Chrome performance log entries to transferred bytes, blocked
+    # request counts per resource type and the HTTP status of each document
+    transferred = 0
+    blocked = {}
+    document_statuses = []
+    for entry in entries:
+        try:
+            message = json.loads(entry['message'])['message']
+        except (KeyError, TypeError, ValueError):
+            continue
+        method = message.get('method')
+        params = message.get('params', {})
+        if method == 'Network.loadingFinished':
+            transferred += int(params.get('encodedDataLength') or 0)
+        elif method == 'Network.loadingFailed' and params.get('blockedReason'):
+            resource_type = params.get('type', 'Other')
+            blocked[resource_type] = blocked.get(resource_type, 0) + 1
+        elif method == 'Network.responseReceived' and params.get('type') == 'Document':
+            document_statuses.append(int(params.get('response', {}).get('status') or 0))
+    return {'transferred_bytes': transferred, 'blocked': blocked, 'document_statuses': document_statuses}
+
+
+# Request blocking applied to every browser through the DevTools protocol.
+# The profile is chosen with BROWSER_BLOCK_PROFILE (off, media, strict) and
+# extended with comma separated BROWSER_BLOCK_PATTERNS.
+class BlockingProfile:
+    def __init__(self, name=None, extra_patterns=None, network_stats=None):
+        self.name = name or os.getenv('BROWSER_BLOCK_PROFILE', 'media')
+        if self.name not in BLOCK_PROFILES:
+            raise ValueError(f"Unknown BROWSER_BLOCK_PROFILE: {self.name}")
+        if extra_patterns is None:
+            extra_patterns = [p.strip() for p in os.getenv('BROWSER_BLOCK_PATTERNS', '').split(',') if p.strip()]
+        self.patterns = BLOCK_PROFILES[self.name] + extra_patterns
+        if network_stats is None:
+            network_stats = os.getenv('BROWSER_NETWORK_STATS', 'true').lower() == 'true'
+        self.network_stats = network_stats
+
+    def configure_options(self, chrome_options):
+        if self.name != 'off':
+            # Skips image decoding as well as the downloads CDP blocks
+            chrome_options.add_argument("--blink-settings=imagesEnabled=false")
+        if self.network_stats:
+            chrome_options.set_capability('goog:loggingPrefs', {'performance': 'ALL'})
+            chrome_options.add_experimental_option('perfLoggingPrefs', {'enableNetwork': True, 'enablePage': False})
+
+    def apply(self, driver):
+        if not self.patterns:
+            return
+        driver.execute_cdp_cmd('Network.enable', {})
+        driver.execute_cdp_cmd('Network.setBlockedURLs', {'urls': self.patterns})
+        log(f"Blocking {len(self.patterns)} URL patterns ({self.name} profile)", "debug")
+
+    def record_usage(self, driver):
+        # Drains the performance log; call after each page so it stays small
+        if not self.network_stats:
+            return None
+        summary = summarize_performance_log(driver.get_log('performance'))
+        saved = 0
+        for resource_type, count in summary['blocked'].items():
+            BROWSER_BLOCKED_REQUESTS.labels(resource_type=resource_type).inc(count)
+            saved += count * ESTIMATED_BYTES.get(resource_type, DEFAULT_ESTIMATED_BYTES)
+        BROWSER_TRANSFERRED_BYTES.inc(summary['transferred_bytes'])
+        BROWSER_BYTES_SAVED.inc(saved)
+        summary['estimated_bytes_saved'] = saved
+        log(f"Page transferred {summary['transferred_bytes'] // 1024} KB, blocked "
+            f"{sum(summary['blocked'].values())} requests (~{saved // 1024} KB saved)", "debug")
+        return summary
@@ -1,72 +1,32 @@
 from flask import (  # noqa: E501
-    render_template, request, redirect, url_for, jsonify, send_file, flash
+    render_template, request, redirect, url_for, jsonify, send_file, flash, Response
 )
-from shared_data import log, activity_queue
-from mysql_manager import MySQLManager
+from shared_data import log
 from nats_manager import NatsManager
-import csv
-import io
+from db_pool import SharedMySQL
+from db_stats import DatabaseStats
+from schema_cache import SchemaCache
+from health import HealthMonitor
+from pagination import (
+    build_page_query, encode_cursor, decode_cursor,
+    build_delta_query, encode_change_cursor, decode_change_cursor
+)
+from export_formats import get_exporter
+import metrics
+import os
+import zlib
 import asyncio
 from crawler_manager import start_crawler, stop_crawler, crawler_state
 import json
-from math import ceil
 
-async def check_nats_health():
-    nats_manager = NatsManager()
-    try:
-        await nats_manager.connect()
-        return "Connected", None
-    except Exception as e:
-        return "Error", str(e)
-    finally:
-        await nats_manager.close()
-
-async def check_mysql_health():
-    mysql_manager = MySQLManager()
-    try:
-        await mysql_manager.connect()
-        return "Connected", None
-    except Exception as e:
-        return "Disconnected", str(e)
-    finally:
-        await mysql_manager.disconnect()
+EXPORT_CHUNK_SIZE = int(os.getenv('EXPORT_CHUNK_SIZE', '1000'))
+# Delta windows end this many seconds in the past so rows from transactions
+# still in flight are picked up by the next window instead of being skipped
+EXPORT_DELTA_LAG = int(os.getenv('EXPORT_DELTA_LAG', '5'))
 
-async def get_mysql_info(mysql_manager):
+async def get_mysql_info(db_stats):
     try:
-        await mysql_manager.connect()
-        # Fetch database size
-        size_query = "SELECT SUM(data_length + index_length) / 1024 / 1024 AS size_mb FROM information_schema.tables WHERE table_schema = %s"
-        size_result = await mysql_manager.execute_query(size_query, (mysql_manager.db_config['db'],))
-        database_size_mb = size_result[0]['size_mb'] if size_result[0]['size_mb'] is not None else 0
-
-        # Fetch total number of rows
-        tables_query = "SHOW TABLES"
-        tables = await mysql_manager.execute_query(tables_query)
-        total_rows = 0
-        table_info = []
-        for table in tables:
-            table_name = list(table.values())[0]
-            count_query = f"SELECT COUNT(*) as count FROM {table_name}"
-            count_result = await mysql_manager.execute_query(count_query)
-            row_count = count_result[0]['count']
-            total_rows += row_count
-            table_info.append({'name': table_name, 'rows': row_count})
-
-        # Fetch profiles and companies scanned
-        profiles_query = "SELECT COUNT(*) as count FROM linkedin_people"
-        companies_query = "SELECT COUNT(*) as count FROM linkedin_companies"
-        profiles_result = await mysql_manager.execute_query(profiles_query)
-        companies_result = await mysql_manager.execute_query(companies_query)
-        profiles_scanned = profiles_result[0]['count']
-        companies_scanned = companies_result[0]['count']
-
-        return {
-            'database_size_mb': round(database_size_mb, 2),
-            'total_rows': total_rows,
-            'tables': table_info,
-            'profiles_scanned': profiles_scanned,
-            'companies_scanned': companies_scanned
-        }
+        return await db_stats.snapshot()
     except Exception as e:
         log(f"Error in get_mysql_info: {str(e)}", "error")
         return {
@@ -80,7 +40,6 @@ async def get_mysql_info(mysql_manager):
 
 async def get_latest_entries(mysql_manager):
     try:
-        await mysql_manager.connect()
         query = """
             (SELECT 'person' as type, name, linkedin_url, created_at
              FROM linkedin_people
@@ -98,35 +57,36 @@ async def get_latest_entries(mysql_manager):
     except Exception as e:
         log(f"Error fetching latest entries: {str(e)}", "error")
         return []
-    finally:
-        await mysql_manager.disconnect()
 
 
-def register_routes(app):
+def register_routes(app, mysql_manager=None):
+    # All routes share one long-lived pool per worker process
+    mysql_manager = mysql_manager or SharedMySQL()
+    app.extensions['mysql'] = mysql_manager
+    db_stats = DatabaseStats(mysql_manager)
+    app.extensions['db_stats'] = db_stats
+    schema_cache = SchemaCache(mysql_manager)
+    app.extensions['schema_cache'] = schema_cache
+    health = HealthMonitor(mysql_manager)
+    app.extensions['health'] = health
+    # Probe from the start, so /healthz can tell a probe loop that never ran
+    health.start()
+
     @app.route('/', methods=['GET'])
     async def index():
-        nats_manager = NatsManager()
-        mysql_manager = MySQLManager()
+        snapshot = health.snapshot()
+        nats_status = snapshot['nats']['status']
+        nats_error = snapshot['nats']['error']
 
         try:
-            await nats_manager.connect()
-            nats_status = "Connected"
-            nats_error = None
-        except Exception as e:
-            log(f"Error connecting to NATS in index route: {str(e)}", "error")
-            nats_status = "Disconnected"
-            nats_error = str(e)
-
-        try:
-            await mysql_manager.connect()
-            mysql_status = "Connected"
-            mysql_error = None
+            mysql_status = snapshot['mysql']['status']
+            mysql_error = snapshot['mysql']['error']
 
             crawler_status = "Running" if crawler_state.is_running() else "Stopped"
 
             # Fetch MySQL info and latest entries concurrently
             mysql_info, latest_entries = await asyncio.gather(
-                get_mysql_info(mysql_manager),
+                get_mysql_info(db_stats),
                 get_latest_entries(mysql_manager)
             )
 
@@ -152,9 +112,6 @@ def register_routes(app):
                                 latest_entries=[],
                                 profiles_scanned=0,
                                 companies_scanned=0)
-        finally:
-            await mysql_manager.disconnect()
-            await nats_manager.close()
 
     @app.route('/start_crawler', methods=['POST'])
     async def start_crawler_route():
@@ -184,37 +141,48 @@ def register_routes(app):
 
     @app.route('/status', methods=['GET'])
     async def status():
-        mysql_manager = MySQLManager()
-        try:
-            await mysql_manager.connect()
-            mysql_info = await get_mysql_info(mysql_manager)
-            nats_status, nats_error = check_nats_health()
-            mysql_status, mysql_error = "Connected", None
-        except Exception as e:
-            mysql_info = {}
-            nats_status, nats_error = check_nats_health()
-            mysql_status, mysql_error = "Disconnected", str(e)
-        finally:
-            await mysql_manager.disconnect()
+        # Everything here comes from cached snapshots refreshed in the background
+        snapshot = health.snapshot()
+        mysql_info = await get_mysql_info(db_stats)
 
         return jsonify({
             'profiles_scanned': mysql_info.get('profiles_scanned', 0),
             'companies_scanned': mysql_info.get('companies_scanned', 0),
-            'active_threads': 0,  # You may want to implement this
-            'queue_size': 0,  # You may want to implement this
-            'nats_status': nats_status,
-            'mysql_status': mysql_status,
+            'active_threads': snapshot['active_threads'],
+            'queue_size': snapshot['queue_size'],
+            'nats_status': snapshot['nats']['status'],
+            'nats_error': snapshot['nats']['error'],
+            'mysql_status': snapshot['mysql']['status'],
+            'mysql_error': snapshot['mysql']['error'],
+            'checked_at': snapshot['checked_at'],
             'crawler_status': 'Running' if crawler_state.is_running() else 'Stopped',
             'mysql_info': mysql_info
         })
 
+    @app.route('/healthz', methods=['GET'])
+    def healthz():
+        # Liveness: the process is up and its probe loop is not stuck
+        if health.is_live():
+            return jsonify({'status': 'ok'})
+        return jsonify({'status': 'stalled'}), 503
+
+    @app.route('/readyz', methods=['GET'])
+    def readyz():
+        # Readiness: the last probe reached both MySQL and NATS
+        snapshot = health.snapshot()
+        body = {
+            'status': 'ready' if health.is_ready() else 'not ready',
+            'mysql': snapshot['mysql']['status'],
+            'nats': snapshot['nats']['status'],
+            'checked_at': snapshot['checked_at']
+        }
+        return jsonify(body), 200 if body['status'] == 'ready' else 503
+
 
     @app.route('/tables')
     async def list_tables():
-        mysql_manager = MySQLManager()
         try:
-            await mysql_manager.connect()
-            mysql_info = await get_mysql_info(mysql_manager)
+            mysql_info = await get_mysql_info(db_stats)
             return render_template('tables.html', 
                                 tables=mysql_info['tables'],
                                 database_size_mb=mysql_info['database_size_mb'],
@@ -223,67 +191,69 @@ def register_routes(app):
             log(f"Error in list_tables: {str(e)}", "error")
             flash(f"Error listing tables: {str(e)}", 'error')
             return redirect(url_for('index'))
-        finally:
-            await mysql_manager.disconnect()
 
     @app.route('/table/<table_name>')
     async def table_view(table_name):
-        page = request.args.get('page', 1, type=int)
         per_page = 20
         sort_by = request.args.get('sort_by', 'id')
         sort_order = request.args.get('sort_order', 'asc')
+        after = request.args.get('after')
+        before = request.args.get('before')
+        exact = request.args.get('exact', type=int) == 1
 
-        mysql_manager = MySQLManager()
         try:
-            await mysql_manager.connect()
-            
-            # Get total number of records
-            count_query = f"SELECT COUNT(*) as count FROM {table_name}"
-            count_result = await mysql_manager.execute_query(count_query)
-            
-            if not count_result or 'count' not in count_result[0]:
-                raise ValueError(f"Unexpected count result: {count_result}")
-            
-            total_records = count_result[0]['count']
+            schema = await schema_cache.describe(table_name)
+            # Only indexed columns can be paged without a filesort
+            if sort_by != 'id' and sort_by not in schema.sortable:
+                sort_by = 'id'
+            if sort_order not in ('asc', 'desc'):
+                sort_order = 'asc'
+
+            if exact:
+                count_result = await mysql_manager.execute_query(f"SELECT COUNT(*) as count FROM {table_name}")
+                total_records = count_result[0]['count']
+            else:
+                total_records, exact = await db_stats.row_count(table_name)
             log(f"Total records in {table_name}: {total_records}")
-            
-            # Calculate pagination
-            total_pages = ceil(total_records / per_page)
-            offset = (page - 1) * per_page
-
-            # Get records with sorting and pagination
-            query = f"SELECT * FROM {table_name} ORDER BY {sort_by} {sort_order} LIMIT {per_page} OFFSET {offset}"
-            records = await mysql_manager.execute_query(query)
-            log(f"Query executed: {query}")
+
+            query, params, reverse = build_page_query(
+                table_name, sort_by, sort_order, per_page,
+                after=decode_cursor(after) if after else None,
+                before=decode_cursor(before) if before else None
+            )
+            records = await mysql_manager.execute_query(query, tuple(params))
+            has_more = len(records) > per_page
+            records = records[:per_page]
+            if reverse:
+                records.reverse()
             log(f"Number of records fetched: {len(records)}")
 
-            # Get column names
-            columns_query = f"SHOW COLUMNS FROM {table_name}"
-            columns = await mysql_manager.execute_query(columns_query)
-            column_names = [column['Field'] for column in columns]
-
-            return render_template('table_view.html', 
-                                table_name=table_name, 
-                                records=records, 
-                                columns=column_names,
-                                page=page, 
-                                total_pages=total_pages,
+            # Going backwards, the extra row means there is an earlier page;
+            # going forwards, any cursor means we came from one
+            has_prev = has_more if before else bool(after)
+            has_next = bool(before) or has_more
+            next_cursor = encode_cursor(records[-1], sort_by) if records and has_next else None
+            prev_cursor = encode_cursor(records[0], sort_by) if records and has_prev else None
+
+            return render_template('table_view.html',
+                                table_name=table_name,
+                                records=records,
+                                columns=schema.columns,
+                                sortable_columns=schema.sortable | {'id'},
+                                next_cursor=next_cursor,
+                                prev_cursor=prev_cursor,
                                 sort_by=sort_by,
                                 sort_order=sort_order,
-                                total_records=total_records)
+                                total_records=total_records,
+                                exact_count=exact)
         except Exception as e:
             log(f"Error in table_view for {table_name}: {str(e)}", "error")
             flash(f"Error viewing table: {str(e)}", 'error')
             return redirect(url_for('list_tables'))
-        finally:
-            await mysql_manager.disconnect()
 
     @app.route('/table/<table_name>/add', methods=['GET', 'POST'])
     async def add_record(table_name):
-        mysql_manager = MySQLManager()
         try:
-            await mysql_manager.connect()
-            
             if request.method == 'POST':
                 columns = ', '.join(request.form.keys())
                 placeholders = ', '.join(['%s'] * len(request.form))
@@ -300,15 +270,10 @@ def register_routes(app):
             log(f"Error in add_record: {str(e)}", "error")
             flash(f"Error adding record: {str(e)}", 'error')
             return redirect(url_for('table_view', table_name=table_name))
-        finally:
-            await mysql_manager.disconnect()
 
     @app.route('/table/<table_name>/edit/<int:id>', methods=['GET', 'POST'])
     async def edit_record(table_name, id):
-        mysql_manager = MySQLManager()
         try:
-            await mysql_manager.connect()
-            
             if request.method == 'POST':
                 set_clause = ', '.join([f"{key} = %s" for key in request.form.keys()])
                 query = f"UPDATE {table_name} SET {set_clause} WHERE id = %s"
@@ -324,14 +289,10 @@ def register_routes(app):
             log(f"Error in edit_record: {str(e)}", "error")
             flash(f"Error editing record: {str(e)}", 'error')
             return redirect(url_for('table_view', table_name=table_name))
-        finally:
-            await mysql_manager.disconnect()
 
     @app.route('/table/<table_name>/delete/<int:id>', methods=['POST'])
     async def delete_record(table_name, id):
-        mysql_manager = MySQLManager()
         try:
-            await mysql_manager.connect()
             query = f"DELETE FROM {table_name} WHERE id = %s"
             await mysql_manager.execute_query(query, (id,))
             flash('Record deleted successfully', 'success')
@@ -340,44 +301,81 @@ def register_routes(app):
             log(f"Error in delete_record: {str(e)}", "error")
             flash(f"Error deleting record: {str(e)}", 'error')
             return redirect(url_for('table_view', table_name=table_name))
-        finally:
-            await mysql_manager.disconnect()
 
     @app.route('/export/<table_name>')
     async def export_csv(table_name):
-        mysql_manager = MySQLManager()
+        export_format = request.args.get('format', 'csv')
+        since = request.args.get('since')
+        delta = since is not None or request.args.get('delta', type=int) == 1
+        headers = {}
         try:
-            await mysql_manager.connect()
+            schema = await schema_cache.describe(table_name)
+            exporter = get_exporter(export_format, table_name, schema)
+            columns = schema.columns
+            if delta:
+                if 'updated_at' not in columns:
+                    raise ValueError(f"Delta export is not supported for {table_name}")
+                # The window's upper bound comes from the database clock so it
+                # matches the updated_at values MySQL wrote
+                result = await mysql_manager.execute_query(
+                    "SELECT NOW() - INTERVAL %s SECOND AS until", (EXPORT_DELTA_LAG,))
+                until = result[0]['until']
+                query, params = build_delta_query(
+                    table_name, columns, decode_change_cursor(since) if since else None, until)
+                headers['X-Next-Cursor'] = encode_change_cursor(until)
+            else:
+                query = f"SELECT {', '.join(f'`{column}`' for column in columns)} FROM `{table_name}`"
+                params = None
+        except Exception as e:
+            log(f"Error exporting {export_format} for {table_name}: {str(e)}", "error")
+            flash(f"Error exporting {export_format}: {str(e)}", 'error')
+            return redirect(url_for('list_tables'))
 
-            query = f"SELECT * FROM {table_name}"
-            records = await mysql_manager.execute_query(query)
+        compress = exporter.compressible and request.args.get('gzip', type=int) == 1
 
-            if not records:
-                flash(f"No data found in table {table_name}", 'warning')
-                return redirect(url_for('table_view', table_name=table_name))
+        def generate():
+            # Each DB chunk is written out and released before the next one
+            # is read, so memory stays flat regardless of table size
+            compressor = zlib.compressobj(wbits=31) if compress else None
 
-            output = io.StringIO()
-            writer = csv.DictWriter(
-                output,
-                fieldnames=records[0].keys()
-            )
-            writer.writeheader()
-            for record in records:
-                writer.writerow(record)
-
-            output.seek(0)
-            return send_file(
-                io.BytesIO(output.getvalue().encode('utf-8')),
-                mimetype='text/csv',
-                as_attachment=True,
-                download_name=f'{table_name}.csv'
-            )
-        except Exception as e:
-            log(f"Error exporting CSV for {table_name}: {str(e)}", "error")
-            flash(f"Error exporting CSV: {str(e)}", 'error')
-            return redirect(url_for('table_view', table_name=table_name))
-        finally:
-            await mysql_manager.disconnect()
+            def encode(data):
+                return compressor.compress(data) if compressor else data
+
+            yield encode(exporter.begin())
+            rows_exported = 0
+            try:
+                for rows in mysql_manager.iter_query(query, params, chunk_size=EXPORT_CHUNK_SIZE):
+                    rows_exported += len(rows)
+                    chunk = encode(exporter.write(rows))
+                    if chunk:
+                        yield chunk
+                chunk = encode(exporter.finish())
+                if chunk:
+                    yield chunk
+            except Exception as e:
+                log(f"Error exporting {export_format} for {table_name}: {str(e)}", "error")
+                raise
+            if compressor:
+                yield compressor.flush()
+            log(f"Exported {rows_exported} rows from {table_name} as {export_format}")
+
+        filename = f'{table_name}.{exporter.extension}'
+        if delta:
+            filename = f'{table_name}_delta.{exporter.extension}'
+        if compress:
+            filename += '.gz'
+        headers['Content-Disposition'] = f'attachment; filename={filename}'
+        return Response(
+            generate(),
+            mimetype='application/gzip' if compress else exporter.content_type,
+            headers=headers
+        )
+
+    @app.route('/metrics')
+    def metrics_endpoint():
+        # Counters and histograms in Prometheus text format. They are kept in
+        # process memory, which is why gunicorn runs a single worker.
+        return Response(metrics.render(), mimetype='text/plain; version=0.0.4')
 
     @app.route('/add_url', methods=['GET', 'POST'])
     async def add_url():
@@ -387,8 +385,7 @@ def register_routes(app):
             is_seed = True  # Always treat manually added URLs as seed profiles
             
             nats_manager = NatsManager()
-            mysql_manager = MySQLManager()
-            
+
             try:
                 # Add to NATS
                 await nats_manager.connect()
@@ -400,9 +397,6 @@ def register_routes(app):
                 log(f"Successfully added seed {url_type} URL to NATS: {url}")
                 
                 # Add to seed_urls table
-                await mysql_manager.connect()
-                log("Successfully connected to MySQL")
-                
                 query = """
                     INSERT INTO seed_urls (url, type)
                     VALUES (%s, %s)
@@ -416,8 +410,7 @@ def register_routes(app):
                 flash(f"Error adding URL: {str(e)}", 'error')
             finally:
                 await nats_manager.close()
-                await mysql_manager.disconnect()
-                log("NATS and MySQL connections closed")
+                log("NATS connection closed")
             
             return redirect(url_for('index'))
         
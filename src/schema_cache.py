@@ -0,0 +1,67 @@
+import os
+import time
+from dotenv import load_dotenv
+from db_pool import SharedMySQL
+
+# Load environment variables from .env file
+load_dotenv()
+
+
+class TableSchema:
+    def __init__(self, name, columns, sortable, types=None):
+        self.name = name
+        self.columns = columns
+        # MySQL DATA_TYPE per column, e.g. 'int', 'varchar', 'timestamp'
+        self.types = types or {}
+        # Columns that lead an index, so ORDER BY col, id LIMIT n can walk
+        # the index instead of sorting the table
+        self.sortable = sortable
+
+
+# Cached description of every table in the database, loaded with two
+# information_schema queries and refreshed on a TTL. Doubles as the whitelist
+# for table and column names that routes interpolate into SQL.
+class SchemaCache:
+    def __init__(self, mysql: SharedMySQL, ttl=None):
+        self.mysql = mysql
+        self.ttl = ttl if ttl is not None else float(os.getenv('SCHEMA_CACHE_TTL', '300'))
+        self._tables = None
+        self._loaded_at = 0.0
+
+    async def describe(self, table_name):
+        if self._tables is None or time.monotonic() - self._loaded_at >= self.ttl:
+            await self.refresh()
+        if table_name not in self._tables:
+            raise ValueError(f"Unknown table: {table_name}")
+        return self._tables[table_name]
+
+    async def refresh(self):
+        schema = self.mysql.db_config['db']
+        columns_query = """
+            SELECT table_name AS table_name, column_name AS column_name, data_type AS data_type
+            FROM information_schema.columns
+            WHERE table_schema = %s
+            ORDER BY table_name, ordinal_position
+        """
+        indexes_query = """
+            SELECT DISTINCT table_name AS table_name, column_name AS column_name
+            FROM information_schema.statistics
+            WHERE table_schema = %s AND seq_in_index = 1
+        """
+        columns = await self.mysql.execute_query(columns_query, (schema,))
+        indexes = await self.mysql.execute_query(indexes_query, (schema,))
+
+        table_columns = {}
+        table_types = {}
+        for row in columns:
+            table_columns.setdefault(row['table_name'], []).append(row['column_name'])
+            table_types.setdefault(row['table_name'], {})[row['column_name']] = row['data_type']
+        table_indexes = {}
+        for row in indexes:
+            table_indexes.setdefault(row['table_name'], set()).add(row['column_name'])
+
+        self._tables = {
+            name: TableSchema(name, cols, table_indexes.get(name, set()) & set(cols), table_types.get(name))
+            for name, cols in table_columns.items()
+        }
+        self._loaded_at = time.monotonic()
@@ -0,0 +1,121 @@
+import asyncio
+import functools
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dotenv import load_dotenv
+from shared_data import log
+
+# Load environment variables from .env file
+load_dotenv()
+
+
+class ScrapeTimeoutError(Exception):
+    pass
+
+
+class ScrapeBlockedError(Exception):
+    pass
+
+
+# Runs blocking Selenium scrapes on worker threads so the event loop keeps
+# serving NATS and MySQL traffic. WebDriver instances are not thread-safe, so
+# every session gets its own single-threaded executor.
+class ScrapeExecutor:
+    def __init__(self, timeout=None):
+        self.timeout = timeout if timeout is not None else float(os.getenv('SCRAPE_TIMEOUT', '120'))
+        self._executors = {}
+
+    def _executor_for(self, session):
+        executor = self._executors.get(session)
+        if executor is None:
+            executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix=f"scrape-{session.debugging_port}")
+            self._executors[session] = executor
+        return executor
+
+    async def scrape(self, session, fn, *args, timeout=None, **kwargs):
+        # Paced by the session's adaptive rate limiter, which is told how each
+        # scrape went: how long it took and where the browser ended up
+        limiter = session.rate_limiter
+        await limiter.acquire()
+        outcome = {}
+
+        # The driver is looked up on the worker thread so a scrape queued
+        # behind a restart picks up the fresh browser
+        def call():
+            try:
+                return fn(*args, driver=session.get_driver(), **kwargs)
+            finally:
+                outcome['page'] = session.page_outcome(session.record_network_usage())
+
+        started = time.perf_counter()
+        try:
+            result = await self.run(session, call, timeout=timeout)
+        except ScrapeTimeoutError:
+            limiter.record('timeout')
+            raise
+        except Exception:
+            # A scraper failing on a normal page leaves the rate unchanged
+            page_outcome = outcome.get('page', 'ok')
+            self._record_failure(session, 'error' if page_outcome == 'ok' else page_outcome)
+            raise
+        page_outcome = outcome.get('page', 'ok')
+        if page_outcome != 'ok':
+            # Whatever was scraped from a login, challenge or error page is
+            # not the entity, so it must not be stored
+            self._record_failure(session, page_outcome)
+            raise ScrapeBlockedError(f"Scrape ended on a {page_outcome} page")
+        limiter.record(page_outcome, time.perf_counter() - started)
+        return result
+
+    def _record_failure(self, session, outcome):
+        session.rate_limiter.record(outcome)
+        if outcome == 'logged_out':
+            # Sign back in on the session's own thread before its next scrape
+            loop = asyncio.get_running_loop()
+            future = loop.run_in_executor(self._executor_for(session), session.authenticate)
+            future.add_done_callback(self._log_reauthentication)
+
+    async def run(self, session, fn, *args, timeout=None, **kwargs):
+        loop = asyncio.get_running_loop()
+        deadline = timeout if timeout is not None else self.timeout
+        future = loop.run_in_executor(self._executor_for(session), functools.partial(fn, *args, **kwargs))
+        try:
+            return await asyncio.wait_for(future, deadline)
+        except asyncio.TimeoutError:
+            log(f"Scrape on browser {session.debugging_port} exceeded {deadline}s deadline, restarting browser", "warning")
+            await self._abort(session)
+            raise ScrapeTimeoutError(f"Scrape exceeded {deadline}s deadline")
+
+    async def _abort(self, session):
+        # A running WebDriver call can't be interrupted from another thread,
+        # but quitting the browser makes it fail fast. The restart is queued on
+        # the session's own thread so the next scrape waits for a fresh driver.
+        loop = asyncio.get_running_loop()
+        try:
+            await loop.run_in_executor(None, session.close)
+        except Exception as e:
+            log(f"Error closing timed out browser: {str(e)}", "error")
+        restart = loop.run_in_executor(self._executor_for(session), session.start)
+        restart.add_done_callback(self._log_restart)
+
+    def _log_restart(self, future):
+        if future.cancelled():
+            return
+        if future.exception():
+            log(f"Error restarting browser: {str(future.exception())}", "error")
+        else:
+            log("Browser restarted after scrape timeout")
+
+    def _log_reauthentication(self, future):
+        if future.cancelled():
+            return
+        if future.exception():
+            log(f"Error signing back in to LinkedIn: {str(future.exception())}", "error")
+        else:
+            log("Signed back in to LinkedIn after a login redirect")
+
+    def close(self):
+        for executor in self._executors.values():
+            executor.shutdown(wait=False, cancel_futures=True)
+        self._executors = {}
@@ -0,0 +1,86 @@
+import asyncio
+import os
+import socket
+from collections import deque
+from dotenv import load_dotenv
+from mysql_manager import MySQLManager
+from shared_data import log
+
+# Load environment variables from .env file
+load_dotenv()
+
+
+# Hands out pending seed URLs from MySQL. Seeds are claimed in batches with
+# FOR UPDATE SKIP LOCKED and leased to this worker, so concurrent workers never
+# pick the same row and seeds held by a crashed worker become claimable again
+# once the lease expires.
+class SeedStore:
+    def __init__(self, mysql_manager: MySQLManager, worker_id=None, batch_size=None, lease_seconds=None):
+        self.mysql_manager = mysql_manager
+        self.worker_id = worker_id or f"{socket.gethostname()}-{os.getpid()}"
+        self.batch_size = batch_size or int(os.getenv('SEED_CLAIM_BATCH_SIZE', '10'))
+        self.lease_seconds = lease_seconds or int(os.getenv('SEED_LEASE_SECONDS', '900'))
+        self._buffers = {}
+        self._locks = {}
+
+    async def next(self, url_type):
+        buffer = self._buffers.setdefault(url_type, deque())
+        if not buffer:
+            lock = self._locks.setdefault(url_type, asyncio.Lock())
+            async with lock:
+                if not buffer:
+                    buffer.extend(await self.claim(url_type, self.batch_size))
+        if buffer:
+            return buffer.popleft()
+        return None
+
+    async def claim(self, url_type, limit):
+        select_query = """
+            SELECT id, url FROM seed_urls
+            WHERE type = %s AND last_crawled IS NULL
+            AND (lease_expires_at IS NULL OR lease_expires_at < NOW())
+            ORDER BY id
+            LIMIT %s
+            FOR UPDATE SKIP LOCKED
+        """
+        async with self.mysql_manager.transaction() as cur:
+            await cur.execute(select_query, (url_type, limit))
+            rows = await cur.fetchall()
+            if not rows:
+                return []
+
+            ids = [row['id'] for row in rows]
+            placeholders = ', '.join(['%s'] * len(ids))
+            lease_query = f"""
+                UPDATE seed_urls
+                SET lease_expires_at = NOW() + INTERVAL %s SECOND, leased_by = %s
+                WHERE id IN ({placeholders})
+            """
+            await cur.execute(lease_query, (self.lease_seconds, self.worker_id, *ids))
+
+        log(f"Claimed {len(rows)} {url_type} seeds for {self.lease_seconds}s")
+        return [row['url'] for row in rows]
+
+    async def mark_crawled(self, url):
+        query = """
+            UPDATE seed_urls
+            SET last_crawled = CURRENT_TIMESTAMP, lease_expires_at = NULL, leased_by = NULL
+            WHERE url = %s
+        """
+        await self.mysql_manager.execute_query(query, (url,))
+
+    async def release(self, urls=()):
+        # Give back seeds we claimed but never started, plus any the caller
+        # took from us and did not start either
+        urls = list(urls) + [url for buffer in self._buffers.values() for url in buffer]
+        self._buffers = {}
+        if not urls:
+            return
+        placeholders = ', '.join(['%s'] * len(urls))
+        query = f"""
+            UPDATE seed_urls
+            SET lease_expires_at = NULL, leased_by = NULL
+            WHERE url IN ({placeholders}) AND leased_by = %s
+        """
+        await self.mysql_manager.execute_query(query, (*urls, self.worker_id))
+        log(f"Released {len(urls)} unclaimed seeds")
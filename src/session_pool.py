@@ -0,0 +1,74 @@
+import asyncio
+import os
+from contextlib import asynccontextmanager
+from dotenv import load_dotenv
+from linkedin_session import LinkedInSession
+from rate_limiter import ConcurrencyWindow, ReadySessions
+from shared_data import log
+
+# Load environment variables from .env file
+load_dotenv()
+
+
+class SessionPool:
+    def __init__(self, email, password, size=None, base_debugging_port=9222):
+        self.email = email
+        self.password = password
+        self.requested_size = size or int(os.getenv('BROWSER_POOL_SIZE', '2'))
+        self.base_debugging_port = base_debugging_port
+        self.sessions = []
+        self._available = None
+        self.window = None
+
+    @property
+    def size(self):
+        return len(self.sessions)
+
+    async def start(self):
+        self._available = ReadySessions()
+        self.window = ConcurrencyWindow(self.requested_size)
+        loop = asyncio.get_running_loop()
+        # Each browser gets its own remote debugging port so they don't collide.
+        # They share one account, so they share one concurrency window.
+        sessions = [
+            LinkedInSession(self.email, self.password, debugging_port=self.base_debugging_port + i,
+                            window=self.window)
+            for i in range(self.requested_size)
+        ]
+        log(f"Starting session pool with {self.requested_size} browsers")
+        results = await asyncio.gather(
+            *(loop.run_in_executor(None, session.start) for session in sessions),
+            return_exceptions=True
+        )
+        for session, result in zip(sessions, results):
+            if isinstance(result, BaseException):
+                log(f"Failed to start browser session on port {session.debugging_port}: {str(result)}", "error")
+                session.close()
+                continue
+            self.sessions.append(session)
+            self._available.put(session)
+
+        if not self.sessions:
+            raise RuntimeError("No browser sessions could be started")
+        self.window.resize(self.size)
+        log(f"Session pool started with {self.size}/{self.requested_size} browsers")
+
+    @asynccontextmanager
+    async def checkout(self):
+        # Hands out a session that can scrape straight away, so a browser
+        # paused by its rate limiter never holds a window slot in the meantime
+        async with self.window:
+            session = await self._available.get()
+            try:
+                yield session
+            finally:
+                self._available.put(session)
+
+    def close(self):
+        for session in self.sessions:
+            try:
+                session.close()
+            except Exception as e:
+                log(f"Error closing browser session: {str(e)}", "error")
+        self.sessions = []
+        log("Session pool closed")
@@ -0,0 +1,82 @@
+import base64
+import hashlib
+import json
+import os
+import time
+from cryptography.fernet import Fernet, InvalidToken
+from cryptography.hazmat.primitives import hashes
+from cryptography.hazmat.primitives.kdf.pbkdf2 import PBKDF2HMAC
+from dotenv import load_dotenv
+from shared_data import log
+
+# Load environment variables from .env file
+load_dotenv()
+
+
+# Encrypted on-disk store for authenticated browser state (cookies and
+# localStorage), one file per account. Files are Fernet tokens, so they are
+# authenticated as well as encrypted and expire after max_age seconds. The key
+# comes from SESSION_STORE_KEY, or is derived from the account credentials
+# when none is configured.
+class SessionStore:
+    def __init__(self, directory=None, key=None, max_age=None, enabled=None):
+        self.directory = directory or os.getenv(
+            'SESSION_STORE_DIR', os.path.expanduser('~/.cache/linkedin-sessions'))
+        self.key = key or os.getenv('SESSION_STORE_KEY')
+        self.max_age = max_age or int(os.getenv('SESSION_STORE_MAX_AGE', str(7 * 24 * 3600)))
+        if enabled is None:
+            enabled = os.getenv('SESSION_STORE_ENABLED', 'true').lower() == 'true'
+        self.enabled = enabled
+        self._fernets = {}
+
+    def _path(self, email):
+        account = hashlib.sha256(email.lower().encode()).hexdigest()[:16]
+        return os.path.join(self.directory, f'{account}.session')
+
+    def _fernet(self, email, password):
+        if self.key:
+            return Fernet(self.key)
+        if email not in self._fernets:
+            kdf = PBKDF2HMAC(
+                algorithm=hashes.SHA256(), length=32,
+                salt=hashlib.sha256(email.lower().encode()).digest(), iterations=200000
+            )
+            key = base64.urlsafe_b64encode(kdf.derive(f"{email}:{password}".encode()))
+            self._fernets[email] = Fernet(key)
+        return self._fernets[email]
+
+    def save(self, email, password, state):
+        if not self.enabled:
+            return
+        os.makedirs(self.directory, mode=0o700, exist_ok=True)
+        state = dict(state, saved_at=time.time())
+        token = self._fernet(email, password).encrypt(json.dumps(state).encode())
+        path = self._path(email)
+        tmp_path = f"{path}.tmp-{os.getpid()}"
+        fd = os.open(tmp_path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+        with os.fdopen(fd, 'wb') as f:
+            f.write(token)
+        # Pool sessions save concurrently; replace keeps the file whole
+        os.replace(tmp_path, path)
+
+    def load(self, email, password):
+        if not self.enabled:
+            return None
+        path = self._path(email)
+        try:
+            with open(path, 'rb') as f:
+                token = f.read()
+        except FileNotFoundError:
+            return None
+        try:
+            return json.loads(self._fernet(email, password).decrypt(token, ttl=self.max_age))
+        except InvalidToken:
+            log("Stored LinkedIn session is expired or unreadable, discarding it", "warning")
+            self.discard(email)
+            return None
+
+    def discard(self, email):
+        try:
+            os.remove(self._path(email))
+        except FileNotFoundError:
+            pass
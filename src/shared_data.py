@@ -1,23 +1,32 @@
-import queue
+import atexit
+import collections
+import os
+import sys
+import time
 from datetime import datetime
 import threading
-from queue import Queue
-import json
+from log_broadcaster import LogBroadcaster
 
 # Global variables for statistics
 profiles_scanned = 0
 companies_scanned = 0
 
-# Queue to store crawler activities
-activity_queue = Queue(maxsize=100)
+LOG_LEVELS = {'DEBUG': 10, 'INFO': 20, 'WARNING': 30, 'ERROR': 40, 'CRITICAL': 50}
+LOG_LEVEL = LOG_LEVELS.get(os.getenv('LOG_LEVEL', 'INFO').upper(), 20)
+# Identical messages beyond LOG_RATE_LIMIT per LOG_RATE_WINDOW seconds are
+# dropped and counted; the count is reported with the next one let through
+LOG_RATE_LIMIT = int(os.getenv('LOG_RATE_LIMIT', '20'))
+LOG_RATE_WINDOW = float(os.getenv('LOG_RATE_WINDOW', '10'))
+LOG_BUFFER_SIZE = int(os.getenv('LOG_BUFFER_SIZE', '1000'))
+
+
+# Replayable history of log lines and crawler updates for the dashboard
+log_broadcaster = LogBroadcaster()
 
 # Status variables for NATS and MySQL connections
 nats_status = "Not connected"
 mysql_status = "Not connected"
 
-# SocketIO instance (to be set by the app)
-socketio = None
-
 class CrawlerState:
     def __init__(self):
         self._running = False
@@ -46,30 +55,140 @@ class CrawlerState:
         with self._lock:
             self._stop_requested = True
 
-# Function to add log entry to queue
-def add_log_entry(message, level="info"):
-    timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-    log_entry = f"[{timestamp}] [{level.upper()}] {message}"
-    print(log_entry)  # Print to console
-    activity_queue.put(log_entry)  # Add to queue for Flask UI
-    if socketio:
-        socketio.emit('log_update', {'log': log_entry}, namespace='/crawler')
-
-# Updated log function
+# Logging pipeline. log() only filters, rate limits and appends the raw
+# record to a bounded pending buffer; a background emitter thread does the
+# formatting, printing and publishing to the dashboard's LogBroadcaster, so
+# hot paths never block on a slow console or a UI that nobody is reading.
+# Messages are rate limited per call site, since most of them embed a URL
+# or a count, and crawler updates go through the same buffer so the
+# dashboard sees them in order with the log lines around them.
+class LogPipeline:
+    def __init__(self, level=LOG_LEVEL, rate_limit=LOG_RATE_LIMIT, rate_window=LOG_RATE_WINDOW,
+                 buffer_size=LOG_BUFFER_SIZE):
+        self.level = level
+        self.rate_limit = rate_limit
+        self.rate_window = rate_window
+        self._pending = collections.deque(maxlen=buffer_size)
+        self._rates = {}
+        self._lock = threading.Lock()
+        self._wakeup = None
+        self._thread = None
+        self._pid = None
+
+    def submit(self, message, level, site=None):
+        # site identifies the log call; without one identical messages are
+        # limited together
+        level = level.upper()
+        if LOG_LEVELS.get(level, 20) < self.level:
+            return
+        now = time.time()
+        suppressed = self._check_rate((level, site or message), now)
+        if suppressed is None:
+            return
+        self._enqueue(('log', now, level, message, suppressed))
+
+    def publish(self, event, data):
+        # Dashboard events are never filtered or rate limited
+        self._enqueue(('event', event, data))
+
+    def _enqueue(self, entry):
+        self._pending.append(entry)
+        self._ensure_emitter()
+        self._wakeup.set()
+
+    def _check_rate(self, key, now):
+        # Returns how many messages were suppressed before this one, or None
+        # if this call site is over its limit
+        if self.rate_limit <= 0:
+            return 0
+        with self._lock:
+            window = self._rates.get(key)
+            if window is None or now - window[0] >= self.rate_window:
+                suppressed = window[2] if window else 0
+                if len(self._rates) >= 10000:
+                    self._prune(now)
+                self._rates[key] = [now, 1, 0]
+                return suppressed
+            if window[1] >= self.rate_limit:
+                window[2] += 1
+                return None
+            window[1] += 1
+            return 0
+
+    def _prune(self, now):
+        expired = [key for key, window in self._rates.items() if now - window[0] >= self.rate_window]
+        for key in expired:
+            del self._rates[key]
+
+    def _ensure_emitter(self):
+        if self._thread is not None and self._pid == os.getpid():
+            return
+        with self._lock:
+            # Threads do not survive a fork, so each process starts its own
+            if self._thread is None or self._pid != os.getpid():
+                self._wakeup = threading.Event()
+                self._thread = threading.Thread(target=self._run, name="log-emitter", daemon=True)
+                self._pid = os.getpid()
+                self._thread.start()
+
+    def _run(self):
+        while True:
+            self._wakeup.wait(0.5)
+            self._wakeup.clear()
+            self._drain()
+
+    def _drain(self):
+        while True:
+            try:
+                entry = self._pending.popleft()
+            except IndexError:
+                return
+            try:
+                if entry[0] == 'event':
+                    log_broadcaster.publish(entry[1], entry[2])
+                    continue
+                _, created, level, message, suppressed = entry
+                if suppressed:
+                    message = f"{message} (suppressed {suppressed} similar messages)"
+                timestamp = datetime.fromtimestamp(created).strftime("%Y-%m-%d %H:%M:%S")
+                print(f"[{timestamp}] [{level}] {message}")  # Print to console
+                log_data = {
+                    'timestamp': timestamp,
+                    'level': level,
+                    'message': message
+                }
+                log_broadcaster.publish('log_update', log_data)
+            except Exception as e:
+                print(f"Error emitting log entry: {str(e)}")
+
+    def flush(self, timeout=5.0):
+        # Waits until everything logged so far has been emitted
+        deadline = time.monotonic() + timeout
+        while self._pending and time.monotonic() < deadline:
+            if self._thread is None or not self._thread.is_alive():
+                self._drain()
+                return
+            self._wakeup.set()
+            time.sleep(0.01)
+
+
+log_pipeline = LogPipeline()
+atexit.register(log_pipeline.flush)
+
+
 def log(message, level="info"):
-    timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-    log_entry = f"[{timestamp}] [{level.upper()}] {message}"
-    print(log_entry)  # Print to console
-    
-    log_data = {
-        'timestamp': timestamp,
-        'level': level.upper(),
-        'message': message
-    }
-    
-    activity_queue.put(json.dumps(log_data))  # Add to queue for Flask UI
-    if socketio:
-        socketio.emit('log_update', log_data, namespace='/crawler')
+    caller = sys._getframe(1)
+    log_pipeline.submit(message, level, (caller.f_code.co_filename, caller.f_lineno))
+
+
+# Kept for older callers; entries now share log()'s JSON format
+def add_log_entry(message, level="info"):
+    caller = sys._getframe(1)
+    log_pipeline.submit(message, level, (caller.f_code.co_filename, caller.f_lineno))
+
+
+def flush_logs(timeout=5.0):
+    log_pipeline.flush(timeout)
 
 def set_nats_status(status):
     global nats_status
@@ -94,10 +213,4 @@ def increment_companies_scanned():
 # Update this function
 def emit_crawler_update(data):
     log(f"Crawler update: {data}")
-    if socketio:
-        socketio.emit('crawler_update', data, namespace='/crawler')
-
-# Add this function to set the SocketIO instance
-def set_socketio(sio):
-    global socketio
-    socketio = sio
+    log_pipeline.publish('crawler_update', data)
@@ -0,0 +1,156 @@
+import asyncio
+import gzip
+import hashlib
+import os
+from urllib.parse import urlsplit, urlunsplit
+from dotenv import load_dotenv
+from batch_writer import BatchWriter
+from shared_data import log
+
+try:
+    import zstandard
+except ImportError:  # Falls back to gzip when zstandard is not installed
+    zstandard = None
+
+# Load environment variables from .env file
+load_dotenv()
+
+SNAPSHOT_INDEX_QUERY = """
+    INSERT INTO page_snapshots (entity_type, entity_url, page_url, content_hash, fetched_at)
+    VALUES (%s, %s, %s, %s, %s)
+"""
+
+
+def canonical_url(url):
+    # One spelling per page: https, lower-case host, no query or fragment and
+    # a single trailing slash. Seeds may say linkedin.com or a country
+    # subdomain, but the browser ends up on www.linkedin.com.
+    parts = urlsplit(url.strip())
+    host = parts.netloc.lower()
+    if host == 'linkedin.com' or host.endswith('.linkedin.com'):
+        host = 'www.linkedin.com'
+    path = parts.path.rstrip('/') + '/'
+    return urlunsplit(('https', host, path, '', ''))
+
+
+# Content-addressed store for raw page HTML. Each page is saved once under
+# the SHA-256 of its content, compressed with zstd (or gzip without the
+# zstandard package); the page_snapshots table maps URLs and fetch times to
+# hashes so pages can be re-parsed later without a browser.
+class SnapshotStore:
+    def __init__(self, directory=None, level=None, enabled=None):
+        self.directory = directory or os.getenv('SNAPSHOT_DIR', os.path.expanduser('~/linkedin-snapshots'))
+        self.level = level or int(os.getenv('SNAPSHOT_ZSTD_LEVEL', '3'))
+        if enabled is None:
+            enabled = os.getenv('SNAPSHOTS_ENABLED', 'true').lower() == 'true'
+        self.enabled = enabled
+        self.extension = '.html.zst' if zstandard else '.html.gz'
+
+    def _path(self, digest, extension):
+        return os.path.join(self.directory, digest[:2], digest[2:4], digest + extension)
+
+    def _compress(self, data):
+        if zstandard:
+            return zstandard.ZstdCompressor(level=self.level).compress(data)
+        return gzip.compress(data, compresslevel=6)
+
+    def put(self, html):
+        data = html.encode('utf-8')
+        digest = hashlib.sha256(data).hexdigest()
+        path = self._path(digest, self.extension)
+        if os.path.exists(path):
+            return digest
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp_path = f"{path}.tmp-{os.getpid()}"
+        with open(tmp_path, 'wb') as f:
+            f.write(self._compress(data))
+        os.replace(tmp_path, path)
+        return digest
+
+    def get(self, digest):
+        zst_path = self._path(digest, '.html.zst')
+        if os.path.exists(zst_path):
+            if zstandard is None:
+                raise RuntimeError("zstandard is required to read .zst snapshots")
+            with open(zst_path, 'rb') as f:
+                return zstandard.ZstdDecompressor().decompress(f.read()).decode('utf-8')
+        with open(self._path(digest, '.html.gz'), 'rb') as f:
+            return gzip.decompress(f.read()).decode('utf-8')
+
+
+# Wraps a WebDriver and keeps the HTML of every page the scraper visits. A
+# page is captured just before the scraper navigates away from it, once it
+# has been scrolled and its lazy sections loaded, and the last page when
+# finish() is called. Browsers are reused across crawls, so whatever page was
+# open before the scraper's first navigation is never captured, and with an
+# entity_url only pages of that entity are kept.
+class RecordingDriver:
+    def __init__(self, driver, entity_url=None):
+        self._driver = driver
+        self._prefix = canonical_url(entity_url) if entity_url else None
+        self._navigated = False
+        self._pages = {}
+
+    def __getattr__(self, name):
+        return getattr(self._driver, name)
+
+    def _capture(self):
+        if not self._navigated:
+            return
+        url = self._driver.current_url
+        if not url or not url.startswith('http'):
+            return
+        page_url = canonical_url(url)
+        if self._prefix and not page_url.startswith(self._prefix):
+            return
+        self._pages[page_url] = self._driver.page_source
+
+    def get(self, url):
+        self._capture()
+        self._navigated = True
+        return self._driver.get(url)
+
+    def finish(self):
+        self._capture()
+        return list(self._pages.items())
+
+
+# What the crawlers use: scrapes through a RecordingDriver on the browser's
+# thread, then stores the captured pages and indexes them in page_snapshots.
+# Snapshot failures are logged and never fail the crawl itself.
+class PageSnapshots:
+    def __init__(self, mysql_manager, store=None, writer=None):
+        self.store = store or SnapshotStore()
+        self._owns_writer = writer is None
+        self.writer = writer or BatchWriter(mysql_manager, SNAPSHOT_INDEX_QUERY, 'page_snapshots')
+
+    def scrape(self, scraper, linkedin_url, driver, **kwargs):
+        # Returns (scraped object, [(page_url, html)])
+        if not self.store.enabled:
+            return scraper(linkedin_url, driver=driver, **kwargs), []
+        if getattr(scraper, 'records_pages', False):
+            # The lxml engine already holds the HTML of every page it loaded
+            result = scraper(linkedin_url, driver=driver, **kwargs)
+            return result, result.pages
+        recorder = RecordingDriver(driver, linkedin_url)
+        result = scraper(linkedin_url, driver=recorder, **kwargs)
+        return result, recorder.finish()
+
+    async def save(self, entity_type, entity_url, pages, fetched_at):
+        if not pages:
+            return
+        try:
+            loop = asyncio.get_running_loop()
+            # Compression and file writes stay off the event loop. entity_url
+            # is kept as crawled so it matches the upserted linkedin_url.
+            digests = await loop.run_in_executor(None, lambda: [self.store.put(page_html) for _, page_html in pages])
+            await asyncio.gather(*(
+                self.writer.write((entity_type, entity_url, page_url, digest, fetched_at))
+                for (page_url, _), digest in zip(pages, digests)
+            ))
+        except Exception as e:
+            log(f"Error saving page snapshots for {entity_url}: {str(e)}", "error")
+
+    async def close(self):
+        if self._owns_writer:
+            await self.writer.close()
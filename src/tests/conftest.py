@@ -1,4 +1,4 @@
-import os, sys, pytest
+import asyncio, os, sys, pytest
 from unittest.mock import patch
 from tests.mocks import MockNatsManager, MockMySQLManager
 # Add the parent directory to the Python path
@@ -0,0 +1,53 @@
+import asyncio
+import pytest
+from nats_manager import BatchPublisher, decode_records
+
+
+class FakeNatsManager:
+    def __init__(self):
+        self.batches = []
+
+    async def publish_batch(self, subject, records):
+        self.batches.append((subject, list(records)))
+
+
+@pytest.mark.asyncio
+async def test_flushes_when_batch_is_full():
+    nats_manager = FakeNatsManager()
+    publisher = BatchPublisher(nats_manager, max_messages=3, flush_interval=60)
+
+    for i in range(7):
+        await publisher.add("linkedin_people_urls", {"url": f"u{i}"})
+
+    assert [len(records) for _, records in nats_manager.batches] == [3, 3]
+    await publisher.close()
+    assert [len(records) for _, records in nats_manager.batches] == [3, 3, 1]
+
+
+@pytest.mark.asyncio
+async def test_flushes_on_size_threshold():
+    nats_manager = FakeNatsManager()
+    publisher = BatchPublisher(nats_manager, max_messages=1000, max_bytes=50, flush_interval=60)
+
+    await publisher.add("linkedin_people_urls", {"url": "https://www.linkedin.com/in/a-long-profile-name"})
+
+    assert len(nats_manager.batches) == 1
+    await publisher.close()
+
+
+@pytest.mark.asyncio
+async def test_flushes_after_interval():
+    nats_manager = FakeNatsManager()
+    publisher = BatchPublisher(nats_manager, max_messages=1000, flush_interval=0.05)
+
+    await publisher.add("linkedin_people_urls", {"url": "u1"})
+    await publisher.add("linkedin_company_urls", {"url": "c1"})
+    await asyncio.sleep(0.2)
+
+    assert sorted(subject for subject, _ in nats_manager.batches) == ["linkedin_company_urls", "linkedin_people_urls"]
+    await publisher.close()
+
+
+def test_decode_records_accepts_single_and_batched_payloads():
+    assert decode_records(b'{"url": "a"}') == [{"url": "a"}]
+    assert decode_records(b'{"url":"a"}\n{"url":"b"}\n') == [{"url": "a"}, {"url": "b"}]
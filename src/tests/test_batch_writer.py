@@ -0,0 +1,85 @@
+import asyncio
+from contextlib import asynccontextmanager
+import pytest
+from batch_writer import BatchWriter
+
+
+class FakeCursor:
+    def __init__(self, manager):
+        self.manager = manager
+
+    async def executemany(self, query, rows):
+        if self.manager.fail:
+            raise RuntimeError("deadlock")
+        if any(row in self.manager.poison for row in rows):
+            raise ValueError("Data too long for column")
+        self.manager.batches.append(list(rows))
+
+
+class FakeMySQLManager:
+    def __init__(self, fail=False, poison=()):
+        self.fail = fail
+        self.poison = poison
+        self.batches = []
+
+    @asynccontextmanager
+    async def transaction(self):
+        yield FakeCursor(self)
+
+
+@pytest.mark.asyncio
+async def test_rows_are_written_in_one_batch_when_full():
+    mysql_manager = FakeMySQLManager()
+    writer = BatchWriter(mysql_manager, "INSERT", "linkedin_people", max_rows=3, flush_interval=60)
+
+    await asyncio.gather(*(writer.write((i,)) for i in range(3)))
+
+    assert mysql_manager.batches == [[(0,), (1,), (2,)]]
+    await writer.close()
+
+
+@pytest.mark.asyncio
+async def test_partial_batch_is_flushed_after_interval():
+    mysql_manager = FakeMySQLManager()
+    writer = BatchWriter(mysql_manager, "INSERT", "linkedin_people", max_rows=100, flush_interval=0.05)
+
+    await asyncio.wait_for(writer.write((1,)), timeout=1)
+
+    assert mysql_manager.batches == [[(1,)]]
+    await writer.close()
+
+
+@pytest.mark.asyncio
+async def test_close_flushes_pending_rows():
+    mysql_manager = FakeMySQLManager()
+    writer = BatchWriter(mysql_manager, "INSERT", "linkedin_people", max_rows=100, flush_interval=60)
+
+    pending = asyncio.create_task(writer.write((1,)))
+    await asyncio.sleep(0)
+    await writer.close()
+
+    await pending
+    assert mysql_manager.batches == [[(1,)]]
+
+
+@pytest.mark.asyncio
+async def test_failed_flush_is_raised_to_every_writer():
+    writer = BatchWriter(FakeMySQLManager(fail=True), "INSERT", "linkedin_people", max_rows=2, flush_interval=60)
+
+    results = await asyncio.gather(writer.write((1,)), writer.write((2,)), return_exceptions=True)
+
+    assert all(isinstance(result, RuntimeError) for result in results)
+    await writer.close()
+
+
+@pytest.mark.asyncio
+async def test_bad_row_only_fails_its_own_writer():
+    mysql_manager = FakeMySQLManager(poison=[(2,)])
+    writer = BatchWriter(mysql_manager, "INSERT", "linkedin_people", max_rows=3, flush_interval=60)
+
+    results = await asyncio.gather(*(writer.write((i,)) for i in range(1, 4)), return_exceptions=True)
+
+    assert results[0] is None and results[2] is None
+    assert isinstance(results[1], ValueError)
+    assert mysql_manager.batches == [[(1,)], [(3,)]]
+    await writer.close()
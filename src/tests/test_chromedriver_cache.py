@@ -0,0 +1,71 @@
+import io
+import os
+import zipfile
+import pytest
+import chromedriver_cache
+from chromedriver_cache import ChromeDriverCache, major_version
+
+
+@pytest.fixture(autouse=True)
+def no_installed_driver(monkeypatch):
+    monkeypatch.delenv('CHROMEDRIVER_PATH', raising=False)
+    monkeypatch.setattr(chromedriver_cache.shutil, 'which', lambda name: None)
+
+
+class FakeResponse:
+    def __init__(self, content):
+        self.content = content
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        pass
+
+    def raise_for_status(self):
+        pass
+
+    def iter_content(self, chunk_size):
+        yield self.content
+
+
+def driver_zip():
+    buffer = io.BytesIO()
+    with zipfile.ZipFile(buffer, 'w') as zip_ref:
+        zip_ref.writestr('chromedriver-linux64/chromedriver', '#!/bin/sh\n')
+    return buffer.getvalue()
+
+
+def test_major_version():
+    assert major_version('126.0.6478.126') == '126'
+    with pytest.raises(RuntimeError):
+        major_version('Error getting Chrome version: not found')
+
+
+def test_offline_without_cached_driver_fails(tmp_path):
+    cache = ChromeDriverCache(cache_dir=str(tmp_path), offline=True)
+    with pytest.raises(RuntimeError, match='CHROMEDRIVER_OFFLINE'):
+        cache.driver_path('126.0.6478.126')
+
+
+def test_downloads_once_per_major_version(tmp_path, monkeypatch):
+    downloads = []
+
+    def fake_get(url, **kwargs):
+        downloads.append(url)
+        return FakeResponse(driver_zip())
+
+    monkeypatch.setattr(chromedriver_cache.requests, 'get', fake_get)
+    monkeypatch.setattr(ChromeDriverCache, 'download_info',
+                        lambda self, major: ('126.0.6478.126', 'https://example.invalid/chromedriver.zip'))
+
+    path = ChromeDriverCache(cache_dir=str(tmp_path), offline=False).driver_path('126.0.6478.55')
+    assert path == os.path.join(str(tmp_path), '126', 'chromedriver-linux64', 'chromedriver')
+    assert os.access(path, os.X_OK)
+    assert len(downloads) == 1
+
+    # A new process (or restart) reuses the cache, even offline
+    restarted = ChromeDriverCache(cache_dir=str(tmp_path), offline=True)
+    assert restarted.driver_path('126.0.6478.126') == path
+    assert len(downloads) == 1
+    assert sorted(os.listdir(str(tmp_path))) == ['126', '126.lock']
@@ -0,0 +1,69 @@
+import datetime
+import io
+import json
+import pytest
+from schema_cache import TableSchema
+from export_formats import NdjsonExporter, ParquetExporter, get_exporter
+
+COLUMNS = ['id', 'name', 'experiences', 'interests', 'accomplishments', 'created_at']
+TYPES = {'id': 'int', 'name': 'varchar', 'experiences': 'text', 'interests': 'text',
+         'accomplishments': 'text', 'created_at': 'timestamp'}
+
+
+def people_rows(count):
+    return [{
+        'id': i,
+        'name': f"person{i}",
+        'experiences': json.dumps([{'position_title': 'Engineer', 'company': 'Acme', 'duration': None}]),
+        'interests': json.dumps(['python', {'title': 'rust'}]),
+        'accomplishments': None if i % 2 else 'not json',
+        'created_at': datetime.datetime(2024, 1, 1, 10, 0, i % 60)
+    } for i in range(1, count + 1)]
+
+
+@pytest.fixture
+def schema():
+    return TableSchema('linkedin_people', COLUMNS, {'id'}, TYPES)
+
+
+def export(exporter, rows, chunk_size):
+    data = exporter.begin()
+    for start in range(0, len(rows), chunk_size):
+        data += exporter.write(rows[start:start + chunk_size])
+    return data + exporter.finish()
+
+
+def test_ndjson_decodes_json_columns(schema):
+    data = export(NdjsonExporter('linkedin_people', schema), people_rows(3), 2)
+    records = [json.loads(line) for line in data.decode().splitlines()]
+    assert len(records) == 3
+    assert records[0]['experiences'][0]['company'] == 'Acme'
+    assert records[0]['interests'] == ['python', '{"title": "rust"}']
+    assert records[1]['accomplishments'] == ['not json']
+    assert records[0]['created_at'] == '2024-01-01T10:00:01'
+
+
+def test_parquet_writes_typed_row_groups(schema):
+    pq = pytest.importorskip('pyarrow.parquet')
+    exporter = ParquetExporter('linkedin_people', schema, row_group_size=4)
+    data = export(exporter, people_rows(10), 3)
+
+    parquet = pq.ParquetFile(io.BytesIO(data))
+    assert parquet.metadata.num_rows == 10
+    assert parquet.metadata.num_row_groups > 1
+    table = parquet.read()
+    assert str(table.schema.field('experiences').type).startswith('list<element: struct<position_title')
+    assert table.column('id').to_pylist() == list(range(1, 11))
+    assert table.column('interests').to_pylist()[0] == ['python', '{"title": "rust"}']
+    assert table.column('experiences').to_pylist()[0][0]['duration'] is None
+
+
+def test_parquet_empty_table(schema):
+    pq = pytest.importorskip('pyarrow.parquet')
+    data = export(ParquetExporter('linkedin_people', schema), [], 10)
+    assert pq.ParquetFile(io.BytesIO(data)).metadata.num_rows == 0
+
+
+def test_unknown_format(schema):
+    with pytest.raises(ValueError):
+        get_exporter('xml', 'linkedin_people', schema)
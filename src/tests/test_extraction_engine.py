@@ -0,0 +1,135 @@
+import os
+import pytest
+from extraction_engine import LxmlScraper, PageExtractor, engine_name
+from snapshot_store import PageSnapshots, SnapshotStore
+from page_parser import extract_person, extract_company
+
+FIXTURES = os.path.join(os.path.dirname(__file__), 'fixtures')
+
+
+def fixture(name):
+    with open(os.path.join(FIXTURES, name), encoding='utf-8') as f:
+        return f.read()
+
+
+class FakeDriver:
+    def __init__(self, pages):
+        self.pages = pages
+        self.current_url = 'data:,'
+        self.visited = []
+
+    @property
+    def page_source(self):
+        return self.pages.get(self.current_url, '<html><main></main></html>')
+
+    def get(self, url):
+        self.visited.append(url)
+        self.current_url = url
+
+    def find_element(self, by, value):
+        return object()
+
+    def execute_script(self, script):
+        return 1000
+
+
+def test_extract_person_from_fixtures():
+    fields, contacts = extract_person('https://www.linkedin.com/in/jane-doe', [
+        ('https://www.linkedin.com/in/jane-doe/', fixture('person_main.html')),
+        ('https://www.linkedin.com/in/jane-doe/details/experience/', fixture('person_experience.html'))
+    ])
+    assert fields['name'] == 'Jane Doe'
+    assert fields['job_title'] == 'Staff Engineer at Acme Corp'
+    assert fields['about'] == 'Building distributed systems for a decade.'
+    assert fields['company'] == 'Acme Corp'
+    assert fields['interests'] == ['Rust Foundation', 'Kubernetes']
+    assert fields['accomplishments'] == [
+        {'category': 'honor', 'title': 'Engineer of the Year'},
+        {'category': 'certification', 'title': 'CKA'}
+    ]
+    assert fields['experiences'][0] == {
+        'position_title': 'Staff Engineer', 'company': 'Acme Corp', 'date_range': 'Jan 2020 - Present',
+        'description': 'Leads the storage team.', 'location': 'Berlin, Germany', 'duration': '4 yrs 2 mos',
+        'linkedin_url': 'https://www.linkedin.com/company/1234/'
+    }
+    assert fields['experiences'][1]['date_range'] == 'Mar 2015 - Dec 2019'
+    # Tracking parameters dropped, duplicates and the profile itself skipped
+    assert contacts == ['https://www.linkedin.com/in/john-roe/', 'https://www.linkedin.com/in/mary-major/']
+
+
+def test_extract_company_from_fixtures():
+    fields, employees = extract_company('https://www.linkedin.com/company/acme', [
+        ('https://www.linkedin.com/company/acme/about/', fixture('company_about.html')),
+        ('https://www.linkedin.com/company/acme/people/', fixture('company_people.html'))
+    ])
+    assert fields == {
+        'linkedin_url': 'https://www.linkedin.com/company/acme', 'name': 'Acme Corp',
+        'about': 'Acme makes everything, from anvils to rockets.', 'website': 'https://acme.example',
+        'industry': 'Manufacturing', 'company_size': '1,001-5,000 employees', 'headquarters': 'Phoenix, Arizona',
+        'founded': '1949', 'specialties': ['Anvils', 'Rockets', 'Traps']
+    }
+    assert employees == ['https://www.linkedin.com/in/jane-doe/', 'https://www.linkedin.com/in/wile-e-coyote/']
+
+
+def test_lxml_scraper_matches_linkedin_scraper_attributes(tmp_path):
+    driver = FakeDriver({
+        'https://www.linkedin.com/in/jane-doe/': fixture('person_main.html'),
+        'https://www.linkedin.com/in/jane-doe/details/experience/': fixture('person_experience.html')
+    })
+    scraper = LxmlScraper('person', extractor=PageExtractor(workers=0), scroll_pause=0)
+    snapshots = PageSnapshots(None, SnapshotStore(directory=str(tmp_path), enabled=True), writer=object())
+    person, pages = snapshots.scrape(scraper, 'https://www.linkedin.com/in/jane-doe', driver, close_on_complete=False)
+
+    assert driver.visited == ['https://www.linkedin.com/in/jane-doe/', 'https://www.linkedin.com/in/jane-doe/details/experience/']
+    assert [page_url for page_url, _ in pages] == driver.visited
+    assert person.linkedin_url == 'https://www.linkedin.com/in/jane-doe'
+    assert person.name == 'Jane Doe'
+    experience = person.experiences[0]
+    assert (experience.position_title, experience.institution_name, experience.from_date, experience.to_date) == (
+        'Staff Engineer', 'Acme Corp', 'Jan 2020', 'Present')
+    assert person.contacts == ['https://www.linkedin.com/in/john-roe/', 'https://www.linkedin.com/in/mary-major/']
+
+
+def test_lxml_company_employees():
+    driver = FakeDriver({
+        'https://www.linkedin.com/company/acme/about/': fixture('company_about.html'),
+        'https://www.linkedin.com/company/acme/people/': fixture('company_people.html')
+    })
+    company = LxmlScraper('company', extractor=PageExtractor(workers=0), scroll_pause=0)(
+        'https://www.linkedin.com/company/acme/', driver=driver)
+    assert company.name == 'Acme Corp'
+    assert company.specialties == ['Anvils', 'Rockets', 'Traps']
+    assert [employee.linkedin_url for employee in company.employees] == [
+        'https://www.linkedin.com/in/jane-doe/', 'https://www.linkedin.com/in/wile-e-coyote/']
+
+
+def test_missing_fields_stay_none():
+    # Nothing on the page means nothing to overwrite the stored row with
+    driver = FakeDriver({
+        'https://www.linkedin.com/company/acme/people/': fixture('company_people.html')
+    })
+    company = LxmlScraper('company', extractor=PageExtractor(workers=0), scroll_pause=0)(
+        'https://www.linkedin.com/company/acme/', driver=driver)
+    assert (company.about, company.industry, company.specialties) == (None, None, None)
+
+    driver = FakeDriver({'https://www.linkedin.com/in/jane-doe/': fixture('person_main.html')})
+    person = LxmlScraper('person', extractor=PageExtractor(workers=0), scroll_pause=0)(
+        'https://www.linkedin.com/in/jane-doe', driver=driver)
+    assert person.name == 'Jane Doe' and person.experiences is None
+
+
+def test_process_pool_extraction():
+    extractor = PageExtractor(workers=1)
+    try:
+        fields, _ = extractor.extract('company', 'https://www.linkedin.com/company/acme', [
+            ('https://www.linkedin.com/company/acme/about/', fixture('company_about.html'))])
+    finally:
+        extractor.close()
+    assert fields['industry'] == 'Manufacturing'
+
+
+def test_engine_name(monkeypatch):
+    monkeypatch.setenv('EXTRACTION_ENGINE', 'lxml')
+    assert engine_name() == 'lxml'
+    with pytest.raises(ValueError):
+        engine_name('regex')
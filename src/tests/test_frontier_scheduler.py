@@ -0,0 +1,198 @@
+import asyncio
+import json
+from frontier_scheduler import FrontierScheduler, ProvenanceLog, discovered_url, priority
+from url_frontier import FrontierItem, Delivery, UrlFrontier
+
+
+class FakeMsg:
+    def __init__(self):
+        self.in_progress_calls = 0
+
+    async def in_progress(self):
+        self.in_progress_calls += 1
+
+
+class FakeFrontier:
+    ack_wait = 600
+
+    def __init__(self, items):
+        self.items = list(items)
+        self.naked = []
+
+    async def next(self):
+        return self.items.pop(0) if self.items else None
+
+    async def nak(self, item):
+        self.naked.append(item.url)
+
+
+class FakeSeedStore:
+    batch_size = 2
+
+    def __init__(self, urls):
+        self.urls = list(urls)
+        self.released = None
+
+    async def next(self, url_type):
+        return self.urls.pop(0) if self.urls else None
+
+    async def release(self, urls=()):
+        self.released = list(urls)
+
+
+class FakeWriter:
+    def __init__(self):
+        self.rows = []
+
+    async def write(self, row):
+        self.rows.append(row)
+
+
+def queued(url, depth, crawled_at, msg=None):
+    msg = msg or FakeMsg()
+    return FrontierItem(url, discovered_url(url, depth, 'seed', 'source', crawled_at), msg, delivery=Delivery(msg, 1))
+
+
+def test_frontier_item_depth_and_provenance():
+    item = FrontierItem('u', {'url': 'u'})
+    assert (item.depth, item.seed, item.source) == (1, None, None)
+    seed = FrontierItem('s', is_seed=True)
+    assert (seed.depth, seed.seed) == (0, 's')
+    found = queued('c', 2, 100.0)
+    assert (found.depth, found.seed, found.source, found.source_crawled_at) == (2, 'seed', 'source', 100.0)
+    assert priority(seed) < priority(queued('a', 1, 0.0)) < priority(queued('b', 2, 999.0))
+
+
+def test_scheduler_orders_by_priority():
+    frontier = FakeFrontier([
+        queued('deep', 3, 500.0),
+        queued('old-source', 1, 100.0),
+        queued('fresh-source', 1, 200.0),
+        queued('second-hop', 2, 300.0)
+    ])
+    seeds = FakeSeedStore(['seed-a', 'seed-b', 'seed-c'])
+    scheduler = FrontierScheduler(frontier, seeds, 'person', prefetch=10)
+
+    async def run():
+        return [(await scheduler.next()).url for _ in range(7)] + [await scheduler.next()]
+
+    # seed-c is claimed by the refill once the first seed batch is handed out
+    assert asyncio.run(run()) == [
+        'seed-a', 'seed-b', 'seed-c', 'fresh-source', 'old-source', 'second-hop', 'deep', None]
+
+
+class SlowFrontier(FakeFrontier):
+    async def next(self):
+        await asyncio.sleep(0.05)
+        return await super().next()
+
+
+def test_refill_does_not_block_other_workers():
+    frontier = SlowFrontier([queued(f"fetched-{i}", 1, 0.5) for i in range(4)])
+    scheduler = FrontierScheduler(frontier, FakeSeedStore([]), 'person', prefetch=4)
+    scheduler.push(queued('waiting-a', 1, 2.0))
+    scheduler.push(queued('waiting-b', 1, 1.0))
+    finished = []
+
+    async def worker(name):
+        item = await scheduler.next()
+        finished.append((name, item.url))
+
+    async def run():
+        refilling = asyncio.ensure_future(worker('first'))
+        await asyncio.sleep(0.01)
+        # The first worker is still fetching; the second takes a waiting item
+        await asyncio.wait_for(worker('second'), 0.03)
+        await refilling
+
+    asyncio.run(run())
+    assert finished == [('second', 'waiting-a'), ('first', 'waiting-b')]
+
+
+def test_close_returns_prefetched_work():
+    msg = FakeMsg()
+    frontier = FakeFrontier([queued('a', 1, 1.0, msg), queued('b', 1, 2.0, msg)])
+    seeds = FakeSeedStore(['seed'])
+    scheduler = FrontierScheduler(frontier, seeds, 'person', prefetch=10)
+
+    async def run():
+        assert (await scheduler.next()).url == 'seed'
+        scheduler.push(FrontierItem('claimed-seed', is_seed=True))
+        assert (await scheduler.next()).url == 'claimed-seed'
+        await scheduler.close()
+
+    asyncio.run(run())
+    assert sorted(frontier.naked) == ['a', 'b']
+    assert seeds.released == []
+
+
+class FakeMetadata:
+    num_delivered = 1
+
+
+class FakeNatsMsg(FakeMsg):
+    subject = 'urls'
+    metadata = FakeMetadata()
+
+    def __init__(self, url):
+        super().__init__()
+        self.data = json.dumps(discovered_url(url, 1, 'seed', 'source', 1.0)).encode()
+        self.finished = None
+
+    async def ack(self):
+        self.finished = 'ack'
+
+    async def nak(self):
+        self.finished = 'nak'
+
+
+class FakeSubscription:
+    def __init__(self, messages):
+        self.messages = messages
+
+    async def fetch(self, batch, timeout=None):
+        fetched, self.messages = self.messages[:batch], self.messages[batch:]
+        return fetched
+
+    async def unsubscribe(self):
+        pass
+
+
+class FakeNatsManager:
+    def __init__(self, messages):
+        self.subscription = FakeSubscription(messages)
+
+    async def ensure_stream(self, stream, subjects):
+        pass
+
+    async def pull_subscribe(self, subject, durable, **kwargs):
+        return self.subscription
+
+
+def test_prefetched_messages_stay_alive_while_workers_are_busy():
+    messages = [FakeNatsMsg(f"u{i}") for i in range(3)]
+    frontier = UrlFrontier(FakeNatsManager(messages), 'urls', 'test', batch_size=10)
+    frontier.ack_wait = 0.3
+    scheduler = FrontierScheduler(frontier, FakeSeedStore([]), 'person', prefetch=10)
+
+    async def run():
+        await frontier.start()
+        started = await scheduler.next()
+        # No worker asks for more work for longer than ack_wait
+        await asyncio.sleep(0.5)
+        await scheduler.close()
+        await frontier.ack(started)
+        await frontier.close()
+        return started
+
+    started = asyncio.run(run())
+    assert started.url == 'u0'
+    assert all(msg.in_progress_calls >= 1 for msg in messages)
+    assert [msg.finished for msg in messages] == ['ack', 'nak', 'nak']
+
+
+def test_provenance_log_records_each_url():
+    writer = FakeWriter()
+    provenance = ProvenanceLog(None, writer)
+    asyncio.run(provenance.record('person', ['a', 'b'], 2, 'seed', 'source'))
+    assert writer.rows == [('a', 'person', 2, 'seed', 'source'), ('b', 'person', 2, 'seed', 'source')]
@@ -0,0 +1,80 @@
+import asyncio
+import os
+import time
+import pytest
+from health import HealthMonitor
+
+
+class StubMonitor(HealthMonitor):
+    def __init__(self, mysql_probe, nats_probe, queue_size=0):
+        super().__init__(mysql=None, interval=1, timeout=0.2)
+        self.mysql_probe = mysql_probe
+        self.nats_probe = nats_probe
+        self.pending = queue_size
+        # Probes are driven by the test instead of the background loop
+        self._pid = os.getpid()
+        self._started_at = time.monotonic()
+
+    async def _probe_mysql(self):
+        await self.mysql_probe()
+
+    async def _probe_nats(self):
+        await self.nats_probe()
+
+    async def _queue_size(self):
+        return self.pending
+
+
+async def ok():
+    pass
+
+
+async def refused():
+    raise ConnectionRefusedError("Connection refused")
+
+
+async def hangs():
+    await asyncio.sleep(10)
+
+
+@pytest.mark.asyncio
+async def test_snapshot_reports_probe_results():
+    monitor = StubMonitor(ok, ok, queue_size=7)
+    assert not monitor.is_ready()
+    await monitor.probe()
+
+    snapshot = monitor.snapshot()
+    assert snapshot['mysql']['status'] == 'Connected'
+    assert snapshot['nats']['status'] == 'Connected'
+    assert snapshot['queue_size'] == 7
+    assert snapshot['active_threads'] == 0
+    assert monitor.is_live() and monitor.is_ready()
+
+
+@pytest.mark.asyncio
+async def test_failed_and_slow_probes_are_not_ready():
+    monitor = StubMonitor(refused, hangs, queue_size=7)
+    await monitor.probe()
+
+    snapshot = monitor.snapshot()
+    assert snapshot['mysql'] == {'status': 'Disconnected', 'error': 'Connection refused', 'latency_ms': None}
+    assert snapshot['nats']['status'] == 'Disconnected'
+    # Queue size is only read while NATS is reachable
+    assert snapshot['queue_size'] == 0
+    assert monitor.is_live() and not monitor.is_ready()
+
+
+def test_snapshot_answers_before_the_first_probe():
+    monitor = StubMonitor(hangs, hangs)
+    started = time.monotonic()
+    snapshot = monitor.snapshot()
+    assert time.monotonic() - started < 0.1
+    assert snapshot['mysql']['status'] == 'Starting' and snapshot['nats']['status'] == 'Starting'
+    assert snapshot['checked_at'] is None
+    assert monitor.is_live() and not monitor.is_ready()
+
+
+def test_not_live_when_no_probe_ever_completes():
+    monitor = StubMonitor(ok, ok)
+    monitor._started_at -= monitor.interval * 3 + monitor.timeout * 2
+    assert not monitor.is_live()
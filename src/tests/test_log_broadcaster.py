@@ -0,0 +1,48 @@
+from log_broadcaster import LogBroadcaster
+
+
+def seqs(frame):
+    return [entry['seq'] for entry in frame['entries']]
+
+
+def test_clients_have_independent_cursors():
+    broadcaster = LogBroadcaster(history_size=10, max_batch=100)
+    broadcaster.connect('a')
+    for i in range(3):
+        broadcaster.publish('log_update', {'message': i})
+
+    frames = dict(broadcaster.pending_frames())
+    assert seqs(frames['a']) == [1, 2, 3]
+    assert broadcaster.pending_frames() == []
+
+    # A later viewer replays the same history without taking it from 'a'
+    broadcaster.connect('b')
+    broadcaster.publish('crawler_update', {'name': 'x'})
+    frames = dict(broadcaster.pending_frames())
+    assert seqs(frames['a']) == [4]
+    assert seqs(frames['b']) == [1, 2, 3, 4]
+
+
+def test_reconnect_resumes_from_cursor():
+    broadcaster = LogBroadcaster(history_size=10, max_batch=100)
+    for i in range(5):
+        broadcaster.publish('log_update', {'message': i})
+    broadcaster.connect('a', since=3, epoch=broadcaster.epoch)
+    assert seqs(dict(broadcaster.pending_frames())['a']) == [4, 5]
+
+    # A cursor from another process's epoch replays everything
+    broadcaster.connect('b', since=3, epoch='old')
+    assert seqs(dict(broadcaster.pending_frames())['b']) == [1, 2, 3, 4, 5]
+
+
+def test_batches_are_bounded_and_report_missed_entries():
+    broadcaster = LogBroadcaster(history_size=5, max_batch=2)
+    broadcaster.connect('a')
+    for i in range(8):
+        broadcaster.publish('log_update', {'message': i})
+
+    frame = dict(broadcaster.pending_frames())['a']
+    assert seqs(frame) == [4, 5]
+    assert frame['missed'] == 3
+    assert seqs(dict(broadcaster.pending_frames())['a']) == [6, 7]
+    assert seqs(dict(broadcaster.pending_frames())['a']) == [8]
@@ -0,0 +1,58 @@
+import pytest
+from metrics import Registry, Counter, Gauge, Histogram
+from mysql_manager import statement_type
+
+
+@pytest.fixture
+def registry():
+    return Registry()
+
+
+def test_counter_and_gauge_exposition(registry):
+    requests = Counter('requests_total', 'Requests', ['status'], registry=registry)
+    requests.labels(status='ok').inc()
+    requests.labels('ok').inc(2)
+    requests.labels(status='error').inc()
+    workers = Gauge('workers', 'Active workers', registry=registry)
+    workers.set(4)
+    workers.dec()
+
+    text = registry.render()
+    assert '# TYPE requests_total counter' in text
+    assert 'requests_total{status="ok"} 3' in text
+    assert 'requests_total{status="error"} 1' in text
+    assert 'workers 3' in text
+
+    with pytest.raises(ValueError):
+        requests.inc(-1)
+
+
+def test_histogram_buckets_are_cumulative(registry):
+    latency = Histogram('latency_seconds', 'Latency', ['stage'], buckets=(0.1, 1.0), registry=registry)
+    for value in (0.05, 0.5, 0.5, 5):
+        latency.labels(stage='scrape').observe(value)
+    with latency.labels(stage='store').time():
+        pass
+
+    lines = registry.render().splitlines()
+    assert 'latency_seconds_bucket{stage="scrape",le="0.1"} 1' in lines
+    assert 'latency_seconds_bucket{stage="scrape",le="1"} 3' in lines
+    assert 'latency_seconds_bucket{stage="scrape",le="+Inf"} 4' in lines
+    assert 'latency_seconds_sum{stage="scrape"} 6.05' in lines
+    assert 'latency_seconds_count{stage="store"} 1' in lines
+
+
+def test_label_values_are_escaped(registry):
+    counter = Counter('escaped_total', 'Escaping', ['subject'], registry=registry)
+    counter.labels(subject='a"b\\c').inc()
+    assert 'escaped_total{subject="a\\"b\\\\c"} 1' in registry.render()
+
+
+@pytest.mark.parametrize('query, expected', [
+    ("SELECT 1", 'select'),
+    ("\n  insert into t values (1)", 'insert'),
+    ("(SELECT a FROM t) UNION (SELECT b FROM u)", 'select'),
+    ("ALTER TABLE t ADD c INT", 'other'),
+])
+def test_statement_type(query, expected):
+    assert statement_type(query) == expected
@@ -0,0 +1,88 @@
+import sqlite3
+import pytest
+from pagination import (
+    build_page_query, encode_cursor, decode_cursor,
+    build_delta_query, encode_change_cursor, decode_change_cursor
+)
+
+# SQLite orders NULLs like MySQL (first ascending, last descending), so it can
+# stand in for the database when walking pages.
+
+
+@pytest.fixture
+def db():
+    conn = sqlite3.connect(':memory:')
+    conn.row_factory = sqlite3.Row
+    conn.execute("CREATE TABLE linkedin_people (id INTEGER PRIMARY KEY, name TEXT, created_at TEXT)")
+    rows = []
+    for i in range(1, 48):
+        # Repeated values and NULLs exercise the id tie-breaker
+        created_at = None if i % 7 == 0 else f"2024-01-{(i % 5) + 1:02d} 10:00:00"
+        rows.append((i, f"person{i}", created_at))
+    conn.executemany("INSERT INTO linkedin_people VALUES (?, ?, ?)", rows)
+    yield conn
+    conn.close()
+
+
+def fetch(db, sort_by, sort_order, after=None, before=None, per_page=10):
+    query, params, reverse = build_page_query('linkedin_people', sort_by, sort_order, per_page, after, before)
+    records = [dict(row) for row in db.execute(query.replace('%s', '?'), params)]
+    has_more = len(records) > per_page
+    records = records[:per_page]
+    if reverse:
+        records.reverse()
+    return records, has_more
+
+
+@pytest.mark.parametrize('sort_by', ['id', 'created_at'])
+@pytest.mark.parametrize('sort_order', ['asc', 'desc'])
+def test_walking_pages_matches_full_ordering(db, sort_by, sort_order):
+    direction = sort_order.upper()
+    expected = [row['id'] for row in db.execute(
+        f"SELECT id FROM linkedin_people ORDER BY {sort_by} {direction}, id {direction}")]
+
+    pages = []
+    cursor = None
+    while True:
+        records, has_more = fetch(db, sort_by, sort_order, after=cursor)
+        pages.append([row['id'] for row in records])
+        if not has_more:
+            break
+        cursor = decode_cursor(encode_cursor(records[-1], sort_by))
+
+    assert [row_id for page in pages for row_id in page] == expected
+
+    # Walking back from the last page visits the same pages in reverse
+    first_ids = pages[-1]
+    for page in reversed(pages[:-1]):
+        boundary = {'id': first_ids[0], sort_by: next(
+            row[sort_by] for row in db.execute(f"SELECT {sort_by} FROM linkedin_people WHERE id = ?", (first_ids[0],)))}
+        records, _ = fetch(db, sort_by, sort_order, before=decode_cursor(encode_cursor(boundary, sort_by)))
+        assert [row['id'] for row in records] == page
+        first_ids = page
+
+
+def test_cursor_round_trips_values():
+    cursor = encode_cursor({'id': 42, 'created_at': '2024-01-01 10:00:00'}, 'created_at')
+    assert decode_cursor(cursor) == ('2024-01-01 10:00:00', 42)
+
+
+def test_delta_windows_cover_each_change_once(db):
+    db.execute("ALTER TABLE linkedin_people ADD COLUMN updated_at TEXT")
+    db.execute("UPDATE linkedin_people SET updated_at = COALESCE(created_at, '2024-01-01 00:00:00')")
+
+    def delta(since, until):
+        query, params = build_delta_query('linkedin_people', ['id', 'name'], since, until)
+        return [row['id'] for row in db.execute(query.replace('%s', '?'), params)]
+
+    first = delta(None, '2024-01-04 00:00:00')
+    cursor = encode_change_cursor('2024-01-04 00:00:00')
+    # Rows touched after the first sync show up in the next window only
+    db.execute("UPDATE linkedin_people SET updated_at = '2024-02-01 00:00:00' WHERE id IN (1, 2)")
+    second = delta(decode_change_cursor(cursor), '2024-03-01 00:00:00')
+
+    untouched = [row['id'] for row in db.execute(
+        "SELECT id FROM linkedin_people WHERE updated_at >= '2024-01-04 00:00:00' AND updated_at < '2024-02-01'")]
+    assert {1, 2} <= set(first)
+    assert sorted(second) == sorted(untouched + [1, 2])
+    assert sorted(set(first) | set(second)) == list(range(1, 48))
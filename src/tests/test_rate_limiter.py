@@ -0,0 +1,135 @@
+import asyncio
+import pytest
+from rate_limiter import AdaptiveRateLimiter, ConcurrencyWindow, ReadySessions
+from scrape_executor import ScrapeExecutor, ScrapeBlockedError
+from metrics import SESSION_REQUEST_RATE
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+def make_limiter(clock, window=None):
+    return AdaptiveRateLimiter('test', rate=6, min_rate=1, max_rate=7, burst=2, increase=0.5,
+                               decrease=0.5, latency_target=10, cooldown=300, window=window, clock=clock)
+
+
+def test_token_bucket_paces_at_rate():
+    clock = FakeClock()
+    limiter = make_limiter(clock)
+    assert limiter.delay() == 0 and limiter.delay() == 0
+    # Burst spent: the next token comes after 60 / 6 seconds
+    assert limiter.delay() == pytest.approx(10)
+    clock.now += 10
+    assert limiter.delay() == 0
+
+
+def test_aimd_adjustments():
+    clock = FakeClock()
+    limiter = make_limiter(clock)
+    limiter.record('ok', latency=1)
+    assert limiter.rate == 6.5
+    limiter.record('ok', latency=1)
+    limiter.record('ok', latency=1)
+    assert limiter.rate == 7
+    assert limiter.record('ok', latency=20) == 'slow'
+    assert limiter.rate == 3.5
+    limiter.record('error')
+    assert limiter.rate == 3.5
+    assert SESSION_REQUEST_RATE.labels(session='test').get() == 3.5
+
+
+def test_blocking_outcome_pauses_session():
+    clock = FakeClock()
+    limiter = make_limiter(clock)
+    limiter.record('challenge')
+    assert limiter.rate == 3
+    assert limiter.delay() == pytest.approx(300)
+    clock.now += 300
+    assert limiter.delay() == pytest.approx(20)
+
+
+def test_concurrency_window():
+    async def run():
+        window = ConcurrencyWindow(2)
+        await window.acquire()
+        await window.acquire()
+        window.record('throttled')
+        assert window.limit == 1
+        window.release()
+        blocked = asyncio.ensure_future(window.acquire())
+        await asyncio.sleep(0)
+        assert not blocked.done()
+        window.release()
+        await asyncio.wait_for(blocked, 1)
+        for _ in range(2):
+            window.record('ok')
+        assert window.limit == 2
+
+    asyncio.run(run())
+
+
+class FakeSession:
+    debugging_port = 9555
+
+    def __init__(self, outcome):
+        self.outcome = outcome
+        self.rate_limiter = make_limiter(FakeClock())
+        self.authenticated = 0
+
+    def get_driver(self):
+        return 'driver'
+
+    def record_network_usage(self):
+        return None
+
+    def page_outcome(self, usage=None):
+        return self.outcome
+
+    def authenticate(self):
+        self.authenticated += 1
+
+
+def test_scrape_reports_outcomes():
+    async def run():
+        executor = ScrapeExecutor(timeout=5)
+        try:
+            session = FakeSession('ok')
+            assert await executor.scrape(session, lambda url, driver=None: (url, driver), 'u') == ('u', 'driver')
+            assert session.rate_limiter.rate == 6.5
+
+            session = FakeSession('logged_out')
+            with pytest.raises(ScrapeBlockedError):
+                await executor.scrape(session, lambda url, driver=None: None, 'u')
+            await executor.run(session, lambda: None)
+            assert session.rate_limiter.rate == 3
+            assert session.authenticated == 1
+        finally:
+            executor.close()
+
+    asyncio.run(run())
+
+
+def test_ready_sessions_skip_paused_browsers():
+    async def run():
+        sessions = ReadySessions()
+        paused, healthy = FakeSession('ok'), FakeSession('ok')
+        paused.rate_limiter.record('throttled')
+        sessions.put(paused)
+        sessions.put(healthy)
+        assert await sessions.get() is healthy
+        assert paused.rate_limiter.wait_time() == pytest.approx(300)
+
+        # Only the paused browser is idle: wait for the next one put back
+        waiting = asyncio.ensure_future(sessions.get())
+        await asyncio.sleep(0)
+        assert not waiting.done()
+        sessions.put(healthy)
+        assert await asyncio.wait_for(waiting, 1) is healthy
+        assert len(sessions) == 1
+
+    asyncio.run(run())
@@ -0,0 +1,93 @@
+import asyncio
+from pymysql.cursors import RE_INSERT_VALUES
+from frontier_scheduler import FrontierScheduler, priority
+from recrawl_scheduler import RecrawlBudget, RecrawlSchedule, content_hash, schedule_upsert_query
+from url_frontier import FrontierItem
+from test_frontier_scheduler import FakeFrontier, FakeSeedStore, FakeWriter, queued
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+class FakeSchedule:
+    def __init__(self, due):
+        self.due = list(due)
+        self.claims = []
+        self.released = None
+
+    async def claim(self, url_type, limit):
+        self.claims.append((url_type, limit))
+        claimed, self.due = self.due[:limit], self.due[limit:]
+        return claimed
+
+    async def release(self, urls):
+        self.released = list(urls)
+
+
+def test_upsert_stays_a_multi_row_insert():
+    query = schedule_upsert_query(86400, 15552000, 2.0, 0.5)
+    assert RE_INSERT_VALUES.match(query)
+    assert 'GREATEST(86400, ROUND(interval_seconds * 0.5))' in query
+    assert 'LEAST(15552000, ROUND(interval_seconds * 2.0))' in query
+    # The old hash is compared before it is replaced
+    assert query.index('content_hash <> VALUES(content_hash)') < query.index('content_hash = VALUES(content_hash)')
+
+
+def test_content_hash_tracks_field_values():
+    values = ('Jane', 'About', '[]', 'https://www.linkedin.com/in/jane')
+    assert content_hash(values) == content_hash(list(values))
+    assert content_hash(values) != content_hash(('Jane', 'About me', '[]', 'https://www.linkedin.com/in/jane'))
+
+
+def test_record_writes_initial_schedule():
+    writer = FakeWriter()
+    schedule = RecrawlSchedule(None, writer=writer)
+    schedule.initial_interval = 3600
+    asyncio.run(schedule.record('person', 'https://www.linkedin.com/in/jane', ('Jane',)))
+    [(url, url_type, digest, crawled, changed, interval, next_crawl_at)] = writer.rows
+    assert (url, url_type, digest, interval) == ('https://www.linkedin.com/in/jane', 'person', content_hash(('Jane',)), 3600)
+    assert crawled == changed and (next_crawl_at - crawled).total_seconds() == 3600
+
+
+def test_budget_refills_per_hour():
+    clock = FakeClock()
+    budget = RecrawlBudget(per_hour=60, clock=clock)
+    assert budget.available() == 1
+    budget.spend(1)
+    assert budget.available() == 0
+    clock.now += 120
+    assert budget.available() == 2
+    clock.now += 7200
+    assert budget.available() == 60
+
+
+def test_scheduler_spends_budget_on_due_recrawls():
+    clock = FakeClock()
+    frontier = FakeFrontier([queued('discovered', 1, 10.0)])
+    seeds = FakeSeedStore(['seed'])
+    schedule = FakeSchedule([('stale-a', 0, 'stale-a'), ('stale-b', 2, 'seed-x'), ('stale-c', 1, 'seed-y')])
+    scheduler = FrontierScheduler(frontier, seeds, 'person', prefetch=10, recrawls=schedule,
+                                  recrawl_budget=RecrawlBudget(per_hour=3600, clock=clock))
+    clock.now = 2
+
+    async def run():
+        first = [(await scheduler.next()) for _ in range(2)]
+        waiting = [entry[-1] for entry in sorted(scheduler._heap)]
+        await scheduler.close()
+        return first, waiting
+
+    (seed, recrawl), waiting = asyncio.run(run())
+    assert (seed.url, recrawl.url) == ('seed', 'stale-a')
+    assert recrawl.recrawl and (recrawl.depth, recrawl.seed) == (0, 'stale-a')
+    # Recrawls go ahead of discovered URLs, closest to a seed first
+    assert [item.url for item in waiting] == ['stale-b', 'discovered']
+    assert priority(seed) < priority(recrawl) < priority(waiting[0]) < priority(waiting[1])
+    # Two tokens had accrued, so only two due entities were claimed
+    assert schedule.claims == [('person', 2)]
+    assert schedule.released == ['stale-b']
+    assert seeds.released == []
@@ -0,0 +1,62 @@
+import json
+import pytest
+from resource_blocking import BlockingProfile, summarize_performance_log, MEDIA_PATTERNS, TRACKER_PATTERNS
+
+
+def entry(method, **params):
+    return {'message': json.dumps({'message': {'method': method, 'params': params}})}
+
+
+class FakeDriver:
+    def __init__(self, entries=()):
+        self.commands = []
+        self.entries = list(entries)
+
+    def execute_cdp_cmd(self, command, params):
+        self.commands.append((command, params))
+
+    def get_log(self, kind):
+        entries, self.entries = self.entries, []
+        return entries
+
+
+def test_summarize_performance_log():
+    entries = [
+        entry('Network.loadingFinished', requestId='1', encodedDataLength=1200),
+        entry('Network.loadingFinished', requestId='2', encodedDataLength=800),
+        entry('Network.loadingFailed', requestId='3', type='Image', blockedReason='inspector'),
+        entry('Network.loadingFailed', requestId='4', type='Image', blockedReason='inspector'),
+        entry('Network.loadingFailed', requestId='5', type='Script', errorText='net::ERR_ABORTED'),
+        entry('Network.responseReceived', requestId='6', type='Document', response={'status': 999}),
+        entry('Network.responseReceived', requestId='7', type='Script', response={'status': 200}),
+        {'message': 'not json'}
+    ]
+    assert summarize_performance_log(entries) == {
+        'transferred_bytes': 2000, 'blocked': {'Image': 2}, 'document_statuses': [999]}
+
+
+def test_profiles_and_cdp_commands():
+    strict = BlockingProfile('strict', extra_patterns=['*example.com/*'], network_stats=False)
+    assert strict.patterns == MEDIA_PATTERNS + TRACKER_PATTERNS + ['*example.com/*']
+    driver = FakeDriver()
+    strict.apply(driver)
+    assert driver.commands == [('Network.enable', {}), ('Network.setBlockedURLs', {'urls': strict.patterns})]
+
+    driver = FakeDriver()
+    BlockingProfile('off', extra_patterns=[], network_stats=False).apply(driver)
+    assert driver.commands == []
+
+    with pytest.raises(ValueError):
+        BlockingProfile('everything', extra_patterns=[])
+
+
+def test_record_usage_estimates_bytes_saved():
+    driver = FakeDriver([
+        entry('Network.loadingFinished', encodedDataLength=4096),
+        entry('Network.loadingFailed', type='Font', blockedReason='inspector')
+    ])
+    profile = BlockingProfile('media', extra_patterns=[], network_stats=True)
+    summary = profile.record_usage(driver)
+    assert summary['estimated_bytes_saved'] == 50000
+    # The log is drained so the next page starts from zero
+    assert profile.record_usage(driver)['transferred_bytes'] == 0
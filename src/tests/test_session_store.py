@@ -0,0 +1,49 @@
+import os
+import stat
+import time
+from cryptography.fernet import Fernet
+from session_store import SessionStore
+
+STATE = {
+    'cookies': [{'name': 'li_at', 'value': 'secret', 'domain': '.linkedin.com'}],
+    'local_storage': {'voyager': '1'}
+}
+
+
+def test_round_trip_is_encrypted(tmp_path):
+    store = SessionStore(directory=str(tmp_path), enabled=True)
+    store.save('user@example.com', 'hunter2', STATE)
+
+    [name] = os.listdir(str(tmp_path))
+    path = os.path.join(str(tmp_path), name)
+    assert b'secret' not in open(path, 'rb').read()
+    assert stat.S_IMODE(os.stat(path).st_mode) == 0o600
+
+    loaded = store.load('user@example.com', 'hunter2')
+    assert loaded['cookies'] == STATE['cookies']
+    assert loaded['local_storage'] == STATE['local_storage']
+
+
+def test_wrong_credentials_or_key_discard_the_session(tmp_path):
+    SessionStore(directory=str(tmp_path), enabled=True).save('user@example.com', 'hunter2', STATE)
+    assert SessionStore(directory=str(tmp_path), enabled=True).load('user@example.com', 'changed') is None
+    # The unreadable file is removed so the next start goes straight to login
+    assert os.listdir(str(tmp_path)) == []
+
+    keyed = SessionStore(directory=str(tmp_path), key=Fernet.generate_key(), enabled=True)
+    keyed.save('user@example.com', 'hunter2', STATE)
+    assert keyed.load('user@example.com', 'any password') is not None
+    assert SessionStore(directory=str(tmp_path), key=Fernet.generate_key(), enabled=True).load(
+        'user@example.com', 'hunter2') is None
+
+
+def test_expired_and_disabled(tmp_path):
+    store = SessionStore(directory=str(tmp_path), max_age=1, enabled=True)
+    store.save('user@example.com', 'hunter2', STATE)
+    time.sleep(2.1)
+    assert store.load('user@example.com', 'hunter2') is None
+
+    disabled = SessionStore(directory=str(tmp_path), enabled=False)
+    disabled.save('user@example.com', 'hunter2', STATE)
+    assert os.listdir(str(tmp_path)) == []
+    assert disabled.load('user@example.com', 'hunter2') is None
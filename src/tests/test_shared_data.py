@@ -0,0 +1,76 @@
+import time
+import pytest
+import shared_data
+from log_broadcaster import LogBroadcaster
+from shared_data import LogPipeline
+
+
+@pytest.fixture
+def buffer(monkeypatch):
+    buffer = LogBroadcaster(history_size=5)
+    monkeypatch.setattr(shared_data, 'log_broadcaster', buffer)
+    return buffer
+
+
+def messages(buffer):
+    buffer.connect('test')
+    [(_, frame)] = buffer.pending_frames()
+    return [entry['data']['message'] for entry in frame['entries'] if entry['event'] == 'log_update']
+
+
+def events(buffer):
+    buffer.connect('test')
+    [(_, frame)] = buffer.pending_frames()
+    return [entry['event'] for entry in frame['entries']]
+
+
+def test_log_never_blocks_without_a_consumer(buffer):
+    pipeline = LogPipeline(level=20, rate_limit=0)
+    started = time.monotonic()
+    for i in range(1000):
+        pipeline.submit(f"message {i}", "info")
+    assert time.monotonic() - started < 1.0
+    pipeline.flush()
+    assert messages(buffer) == [f"message {i}" for i in range(995, 1000)]
+
+
+def test_level_threshold(buffer):
+    pipeline = LogPipeline(level=30, rate_limit=0)
+    pipeline.submit("hidden", "info")
+    pipeline.submit("hidden", "debug")
+    pipeline.submit("shown", "warning")
+    pipeline.submit("shown too", "error")
+    pipeline.flush()
+    assert messages(buffer) == ["shown", "shown too"]
+
+
+def test_repeated_messages_are_rate_limited(buffer):
+    pipeline = LogPipeline(level=20, rate_limit=2, rate_window=0.2)
+    for _ in range(5):
+        pipeline.submit("same error", "error")
+    pipeline.submit("other", "error")
+    time.sleep(0.25)
+    pipeline.submit("same error", "error")
+    pipeline.flush()
+    assert messages(buffer) == [
+        "same error", "same error", "other", "same error (suppressed 3 similar messages)"
+    ]
+
+
+def test_messages_from_one_call_site_share_a_limit(buffer):
+    pipeline = LogPipeline(level=20, rate_limit=2, rate_window=60)
+    for i in range(5):
+        pipeline.submit(f"Error crawling profile {i}", "error", site=('crawler.py', 10))
+    pipeline.submit("Error crawling profile 9", "error", site=('crawler.py', 20))
+    pipeline.flush()
+    assert messages(buffer) == ["Error crawling profile 0", "Error crawling profile 1", "Error crawling profile 9"]
+
+
+def test_crawler_updates_keep_their_place_among_log_lines(buffer, monkeypatch):
+    pipeline = LogPipeline(level=20, rate_limit=0)
+    monkeypatch.setattr(shared_data, 'log_pipeline', pipeline)
+    shared_data.log("before")
+    shared_data.emit_crawler_update({'type': 'person'})
+    shared_data.log("after")
+    pipeline.flush()
+    assert events(buffer) == ['log_update', 'log_update', 'crawler_update', 'log_update']
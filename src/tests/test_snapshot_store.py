@@ -0,0 +1,149 @@
+import asyncio
+import os
+from datetime import datetime
+from snapshot_store import SnapshotStore, RecordingDriver, PageSnapshots, canonical_url
+from page_parser import parse_person, parse_company
+from reparse_snapshots import build_upsert, row_values, RowSink
+
+
+class FakeDriver:
+    def __init__(self, pages, current_url='data:,'):
+        self.pages = pages
+        self.current_url = current_url
+        self.title = 'browser'
+
+    @property
+    def page_source(self):
+        return self.pages[self.current_url]
+
+    def get(self, url):
+        self.current_url = url
+
+
+class FakeWriter:
+    def __init__(self):
+        self.rows = []
+
+    async def write(self, row):
+        self.rows.append(row)
+
+
+def test_store_round_trip_and_dedupe(tmp_path):
+    store = SnapshotStore(directory=str(tmp_path), enabled=True)
+    digest = store.put('<html>héllo</html>')
+    assert store.put('<html>héllo</html>') == digest
+    files = [name for _, _, names in os.walk(tmp_path) for name in names]
+    assert files == [digest + store.extension]
+    assert store.get(digest) == '<html>héllo</html>'
+
+
+def test_canonical_url():
+    assert canonical_url('http://WWW.LinkedIn.com/in/jane?trk=x#top') == 'https://www.linkedin.com/in/jane/'
+    assert canonical_url('https://www.linkedin.com/company/acme/about//') == 'https://www.linkedin.com/company/acme/about/'
+    assert canonical_url('https://linkedin.com/in/jane') == 'https://www.linkedin.com/in/jane/'
+    assert canonical_url('https://uk.linkedin.com/in/jane/') == 'https://www.linkedin.com/in/jane/'
+
+
+def test_recording_driver_captures_each_page():
+    driver = FakeDriver({
+        'https://www.linkedin.com/company/acme/': '<h1>Acme</h1>',
+        'https://www.linkedin.com/company/acme/about/': '<p>About</p>'
+    })
+    recorder = RecordingDriver(driver)
+    recorder.get('https://www.linkedin.com/company/acme/')
+    recorder.get('https://www.linkedin.com/company/acme/about/')
+    assert recorder.title == 'browser'
+    assert recorder.finish() == [
+        ('https://www.linkedin.com/company/acme/', '<h1>Acme</h1>'),
+        ('https://www.linkedin.com/company/acme/about/', '<p>About</p>')
+    ]
+
+
+def test_recording_driver_skips_pages_of_other_entities():
+    # A reused browser still shows the page the previous crawl ended on
+    driver = FakeDriver({
+        'https://www.linkedin.com/company/acme/people/': '<h1>Acme</h1>',
+        'https://www.linkedin.com/feed/': '<h1>Feed</h1>',
+        'https://www.linkedin.com/company/globex/': '<h1>Globex</h1>',
+        'https://www.linkedin.com/company/globex/about/': '<p>About</p>'
+    }, current_url='https://www.linkedin.com/company/acme/people/')
+    recorder = RecordingDriver(driver, 'https://www.linkedin.com/company/globex')
+    recorder.get('https://www.linkedin.com/company/globex/')
+    recorder.get('https://www.linkedin.com/feed/')
+    recorder.get('https://www.linkedin.com/company/globex/about/')
+    pages = recorder.finish()
+    assert [page_url for page_url, _ in pages] == [
+        'https://www.linkedin.com/company/globex/', 'https://www.linkedin.com/company/globex/about/'
+    ]
+    assert parse_company('https://www.linkedin.com/company/globex', pages)['name'] == 'Globex'
+
+
+def test_recording_driver_matches_seeds_without_www():
+    driver = FakeDriver({'https://www.linkedin.com/in/x/': '<h1>X</h1>'})
+    recorder = RecordingDriver(driver, 'https://linkedin.com/in/x/')
+    recorder.get('https://www.linkedin.com/in/x/')
+    assert recorder.finish() == [('https://www.linkedin.com/in/x/', '<h1>X</h1>')]
+
+
+def test_page_snapshots_scrape_and_save(tmp_path):
+    driver = FakeDriver({'https://www.linkedin.com/in/jane': '<h1>Jane</h1>'})
+    writer = FakeWriter()
+    snapshots = PageSnapshots(None, SnapshotStore(directory=str(tmp_path), enabled=True), writer)
+
+    def scraper(url, driver=None, **kwargs):
+        driver.get(url)
+        return 'person'
+
+    result, pages = snapshots.scrape(scraper, 'https://www.linkedin.com/in/jane', driver)
+    assert result == 'person'
+    fetched_at = datetime(2024, 1, 1)
+    asyncio.run(snapshots.save('person', 'https://www.linkedin.com/in/jane', pages, fetched_at))
+    [(entity_type, entity_url, page_url, digest, when)] = writer.rows
+    assert (entity_type, entity_url, page_url, when) == (
+        'person', 'https://www.linkedin.com/in/jane', 'https://www.linkedin.com/in/jane/', fetched_at)
+    assert snapshots.store.get(digest) == '<h1>Jane</h1>'
+
+
+def test_parse_person_and_company():
+    person = parse_person('https://www.linkedin.com/in/jane', [(
+        'https://www.linkedin.com/in/jane/',
+        '<main><h1> Jane  Doe </h1><div class="text-body-medium break-words">Engineer</div></main>'
+    )])
+    assert person == {'linkedin_url': 'https://www.linkedin.com/in/jane', 'name': 'Jane Doe', 'job_title': 'Engineer'}
+
+    company = parse_company('https://www.linkedin.com/company/acme', [
+        ('https://www.linkedin.com/company/acme/', '<main><h1>Acme</h1></main>'),
+        ('https://www.linkedin.com/company/acme/about/',
+         '<main><h2>Overview</h2><p>We make things.</p>'
+         '<dl><dt>Industry</dt><dd>Manufacturing</dd><dt>Specialties</dt><dd>Anvils, rockets and traps</dd></dl></main>')
+    ])
+    assert company == {
+        'linkedin_url': 'https://www.linkedin.com/company/acme', 'name': 'Acme', 'about': 'We make things.',
+        'industry': 'Manufacturing', 'specialties': ['Anvils', 'rockets', 'traps']
+    }
+
+
+def test_upsert_only_writes_parsed_columns():
+    query = build_upsert('linkedin_companies', ('linkedin_url', 'name', 'specialties'))
+    assert 'INSERT INTO linkedin_companies (linkedin_url, name, specialties)' in query
+    assert 'ON DUPLICATE KEY UPDATE name = VALUES(name), specialties = VALUES(specialties)' in query
+    fields = {'linkedin_url': 'u', 'name': 'Acme', 'specialties': ['a']}
+    assert row_values(fields, ('linkedin_url', 'name', 'specialties')) == ('u', 'Acme', '["a"]')
+
+
+def test_row_sink_groups_by_column_set():
+    sink = RowSink(None, 'linkedin_people', batch_size=10, dry_run=True)
+
+    async def run():
+        await sink.add({'linkedin_url': 'a', 'name': 'A'})
+        await sink.add({'linkedin_url': 'b', 'name': 'B', 'about': 'x'})
+        await sink.add({'linkedin_url': 'c', 'name': 'C'})
+        await sink.add({'linkedin_url': 'd'})
+        assert sink.batches == {
+            ('linkedin_url', 'name'): [('a', 'A'), ('c', 'C')],
+            ('linkedin_url', 'about', 'name'): [('b', 'x', 'B')]
+        }
+        await sink.flush()
+
+    asyncio.run(run())
+    assert sink.written == 3 and sink.batches == {}
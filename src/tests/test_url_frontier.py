@@ -0,0 +1,157 @@
+import asyncio
+import json
+import os
+import uuid
+import pytest
+from nats_manager import NatsManager
+from url_frontier import UrlFrontier
+
+# These tests need a local nats-server started with JetStream enabled
+# (nats-server -js); they are skipped when none is reachable.
+TEST_NATS_URL = os.getenv('TEST_NATS_URL', 'nats://localhost:4222')
+
+
+async def make_frontier():
+    nats_manager = NatsManager()
+    nats_manager._nats_url = TEST_NATS_URL
+    try:
+        await asyncio.wait_for(nats_manager.connect(), timeout=2)
+    except Exception:
+        pytest.skip(f"No nats-server reachable at {TEST_NATS_URL}")
+
+    suffix = uuid.uuid4().hex[:8]
+    subject = f"test_urls_{suffix}"
+    frontier = UrlFrontier(
+        nats_manager, subject, f"test_{suffix}", stream=f"TEST_URLS_{suffix}",
+        stream_subjects=[subject], batch_size=5, fetch_timeout=0.5
+    )
+    frontier.ack_wait = 1
+    await frontier.start()
+    return nats_manager, frontier
+
+
+async def teardown(nats_manager, frontier):
+    await frontier.close()
+    await nats_manager._js.delete_stream(frontier.stream)
+    await nats_manager.close()
+
+
+@pytest.mark.asyncio
+async def test_fetches_published_urls_in_batches():
+    nats_manager, frontier = await make_frontier()
+    try:
+        for i in range(3):
+            await nats_manager.publish(frontier.subject, json.dumps({"url": f"https://www.linkedin.com/in/user{i}"}))
+
+        urls = []
+        for _ in range(3):
+            item = await frontier.next()
+            urls.append(item.url)
+            await frontier.ack(item)
+
+        assert urls == [f"https://www.linkedin.com/in/user{i}" for i in range(3)]
+        assert await frontier.next() is None
+    finally:
+        await teardown(nats_manager, frontier)
+
+
+@pytest.mark.asyncio
+async def test_nak_redelivers_url():
+    nats_manager, frontier = await make_frontier()
+    try:
+        await nats_manager.publish(frontier.subject, json.dumps({"url": "https://www.linkedin.com/in/flaky"}))
+
+        item = await frontier.next()
+        await frontier.nak(item)
+
+        redelivered = await frontier.next()
+        assert redelivered.url == "https://www.linkedin.com/in/flaky"
+        assert redelivered.msg.metadata.num_delivered == 2
+        await frontier.ack(redelivered)
+    finally:
+        await teardown(nats_manager, frontier)
+
+
+@pytest.mark.asyncio
+async def test_messages_survive_without_a_consumer():
+    nats_manager, frontier = await make_frontier()
+    try:
+        await frontier.close()
+        await nats_manager.publish(frontier.subject, json.dumps({"url": "https://www.linkedin.com/in/offline"}))
+
+        await frontier.start()
+        item = await frontier.next()
+        assert item.url == "https://www.linkedin.com/in/offline"
+        await frontier.ack(item)
+    finally:
+        await teardown(nats_manager, frontier)
+
+
+@pytest.mark.asyncio
+async def test_batched_message_only_requeues_failed_urls():
+    nats_manager, frontier = await make_frontier()
+    try:
+        urls = [f"https://www.linkedin.com/in/batch{i}" for i in range(3)]
+        await nats_manager.publish_batch(frontier.subject, [{"url": url} for url in urls])
+
+        items = [await frontier.next() for _ in range(3)]
+        assert [item.url for item in items] == urls
+        await frontier.ack(items[0])
+        await frontier.nak(items[1])
+        await frontier.ack(items[2])
+
+        requeued = await frontier.next()
+        assert requeued.url == urls[1]
+        await frontier.ack(requeued)
+        assert await frontier.next() is None
+    finally:
+        await teardown(nats_manager, frontier)
+
+
+@pytest.mark.asyncio
+async def test_unfinished_messages_are_kept_alive():
+    nats_manager, frontier = await make_frontier()
+    try:
+        urls = [f"https://www.linkedin.com/in/slow{i}" for i in range(2)]
+        for url in urls:
+            await nats_manager.publish(frontier.subject, json.dumps({"url": url}))
+
+        # One URL in flight and one still buffered, both for longer than ack_wait
+        started = await frontier.next()
+        await asyncio.sleep(frontier.ack_wait * 2.5)
+        buffered = await frontier.next()
+        assert [started.url, buffered.url] == urls
+
+        assert await frontier.next() is None
+        await frontier.ack(started)
+        await frontier.ack(buffered)
+    finally:
+        await teardown(nats_manager, frontier)
+
+
+@pytest.mark.asyncio
+async def test_requeued_urls_still_respect_max_deliver():
+    nats_manager, frontier = await make_frontier()
+    frontier.max_deliver = 3
+    try:
+        await nats_manager.publish_batch(frontier.subject, [
+            {"url": "https://www.linkedin.com/in/good"}, {"url": "https://www.linkedin.com/in/broken"}
+        ])
+        good, broken = await frontier.next(), await frontier.next()
+        await frontier.ack(good)
+        await frontier.nak(broken)
+
+        # The failed URL comes back alone in a new message until it has
+        # used up max_deliver attempts
+        attempts = 1
+        while True:
+            item = await frontier.next()
+            if item is None:
+                break
+            assert item.url == "https://www.linkedin.com/in/broken"
+            assert item.data['attempts'] == 1
+            await frontier.nak(item)
+            attempts += 1
+        assert attempts == 3
+    finally:
+        await teardown(nats_manager, frontier)
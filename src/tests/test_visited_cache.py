@@ -0,0 +1,81 @@
+import pytest
+from visited_cache import BloomFilter, LRUCache, VisitedSet
+
+
+class FakeMySQLManager:
+    def __init__(self, urls):
+        self.urls = urls
+        self.queries = []
+
+    async def execute_query(self, query, params=None):
+        self.queries.append(query)
+        if query.startswith("SELECT MAX(id)"):
+            return [{'max_id': len(self.urls)}]
+        if "WHERE id > %s" in query:
+            last_id, limit = params
+            rows = [{'id': i + 1, 'linkedin_url': url} for i, url in enumerate(self.urls)]
+            return [row for row in rows if row['id'] > last_id][:limit]
+        if "WHERE linkedin_url IN" in query:
+            return [{'linkedin_url': url} for url in params if url in self.urls]
+        raise AssertionError(f"Unexpected query: {query}")
+
+
+def test_bloom_filter_has_no_false_negatives():
+    bloom = BloomFilter(1000, 0.01)
+    urls = [f"https://www.linkedin.com/in/user{i}" for i in range(1000)]
+    for url in urls:
+        bloom.add(url)
+    assert all(url in bloom for url in urls)
+
+
+def test_bloom_filter_false_positive_rate_is_bounded():
+    bloom = BloomFilter(1000, 0.01)
+    for i in range(1000):
+        bloom.add(f"https://www.linkedin.com/in/user{i}")
+    false_positives = sum(f"https://www.linkedin.com/in/other{i}" in bloom for i in range(10000))
+    assert false_positives < 300
+
+
+def test_lru_cache_evicts_least_recently_used():
+    cache = LRUCache(2)
+    cache.add('a')
+    cache.add('b')
+    assert 'a' in cache
+    cache.add('c')
+    assert 'a' in cache
+    assert 'b' not in cache
+    assert 'c' in cache
+
+
+@pytest.mark.asyncio
+async def test_filter_unseen_only_queries_possible_hits():
+    crawled = [f"https://www.linkedin.com/in/user{i}" for i in range(100)]
+    mysql_manager = FakeMySQLManager(crawled)
+    visited = VisitedSet(mysql_manager, 'linkedin_people', capacity=1000)
+    await visited.warm(chunk_size=30)
+    mysql_manager.queries.clear()
+
+    new_urls = [f"https://www.linkedin.com/in/new{i}" for i in range(50)]
+    discovered = new_urls[:25] + crawled[:10] + new_urls[25:] + new_urls[:5]
+
+    assert await visited.filter_unseen(discovered) == new_urls
+    # All crawled URLs hit the Bloom filter and are confirmed in one query
+    assert len(mysql_manager.queries) == 1
+
+    mysql_manager.queries.clear()
+    assert await visited.contains(crawled[0])
+    assert mysql_manager.queries == []
+
+
+@pytest.mark.asyncio
+async def test_filter_unseen_checks_mysql_until_warmed():
+    mysql_manager = FakeMySQLManager(["https://www.linkedin.com/in/known"])
+    visited = VisitedSet(mysql_manager, 'linkedin_people', capacity=1000)
+
+    unseen = await visited.filter_unseen([
+        "https://www.linkedin.com/in/known",
+        "https://www.linkedin.com/in/unknown",
+    ])
+
+    assert unseen == ["https://www.linkedin.com/in/unknown"]
+    assert len(mysql_manager.queries) == 1
@@ -0,0 +1,185 @@
+import asyncio
+import os
+from collections import deque
+from dotenv import load_dotenv
+from nats.errors import TimeoutError
+from nats_manager import NatsManager, decode_records
+from shared_data import log
+
+# Load environment variables from .env file
+load_dotenv()
+
+FRONTIER_STREAM = "LINKEDIN_URLS"
+FRONTIER_SUBJECTS = ["linkedin_people_urls", "linkedin_company_urls"]
+# Durable consumer the crawl workers pull each subject through
+FRONTIER_DURABLES = {
+    "linkedin_company_urls": "company_crawler",
+    "linkedin_people_urls": "people_crawler"
+}
+
+
+class FrontierItem:
+    def __init__(self, url, data=None, msg=None, is_seed=False, delivery=None):
+        self.url = url
+        self.data = data or {}
+        self.msg = msg
+        self.is_seed = is_seed
+        self.delivery = delivery
+        # Hops from the seed and where the URL was found; messages from
+        # before depth tracking count as one hop away
+        self.depth = self.data.get('depth', 0 if is_seed else 1)
+        self.seed = self.data.get('seed', url if is_seed else None)
+        self.source = self.data.get('source')
+        self.source_crawled_at = self.data.get('source_crawled_at')
+        # Set on entities due for a refresh by the recrawl schedule
+        self.recrawl = self.data.get('recrawl', False)
+
+
+# Tracks the URLs of one NATS message until all of them are finished
+class Delivery:
+    def __init__(self, msg, size):
+        self.msg = msg
+        self.size = size
+        self.remaining = size
+        self.failures = []
+
+
+# Durable JetStream work queue of URLs to crawl. Messages are pulled in
+# batches, handed out one URL at a time and only acked once every URL they
+# carry has been persisted; failed or abandoned URLs are redelivered. Until
+# then a background task resets the ack_wait of every unfinished message,
+# buffered or in flight, so slow crawls are not redelivered to other workers.
+class UrlFrontier:
+    def __init__(self, nats_manager: NatsManager, subject, durable, stream=FRONTIER_STREAM,
+                 stream_subjects=None, batch_size=None, fetch_timeout=None):
+        self.nats_manager = nats_manager
+        self.subject = subject
+        self.durable = durable
+        self.stream = stream
+        self.stream_subjects = stream_subjects or FRONTIER_SUBJECTS
+        self.batch_size = batch_size or int(os.getenv('FRONTIER_BATCH_SIZE', '10'))
+        self.fetch_timeout = fetch_timeout or float(os.getenv('FRONTIER_FETCH_TIMEOUT', '0.5'))
+        self.ack_wait = float(os.getenv('FRONTIER_ACK_WAIT', '600'))
+        self.max_deliver = int(os.getenv('FRONTIER_MAX_DELIVER', '5'))
+        self._subscription = None
+        self._buffer = deque()
+        self._fetch_lock = asyncio.Lock()
+        self._deliveries = set()
+        self._keep_alive_task = None
+
+    async def start(self):
+        await self.nats_manager.ensure_stream(self.stream, self.stream_subjects)
+        self._subscription = await self.nats_manager.pull_subscribe(
+            self.subject, self.durable, stream=self.stream,
+            ack_wait=self.ack_wait, max_deliver=self.max_deliver
+        )
+        if self._keep_alive_task is None:
+            self._keep_alive_task = asyncio.create_task(self._keep_alive())
+
+    async def next(self):
+        if not self._buffer:
+            async with self._fetch_lock:
+                # Another worker may have refilled the buffer while we waited
+                if not self._buffer:
+                    await self._fetch()
+        if self._buffer:
+            return self._buffer.popleft()
+        return None
+
+    async def _keep_alive(self):
+        while True:
+            await asyncio.sleep(self.ack_wait / 3)
+            await self.keep_alive()
+
+    async def keep_alive(self):
+        for delivery in list(self._deliveries):
+            try:
+                await delivery.msg.in_progress()
+            except Exception as e:
+                log(f"Error extending frontier message lease: {str(e)}", "warning")
+
+    async def _fetch(self):
+        try:
+            messages = await self._subscription.fetch(self.batch_size, timeout=self.fetch_timeout)
+        except TimeoutError:
+            return
+        count = 0
+        for msg in messages:
+            try:
+                records = decode_records(msg.data)
+                delivery = Delivery(msg, len(records))
+                items = [FrontierItem(data['url'], data, msg, data.get('is_seed', False), delivery) for data in records]
+            except (ValueError, KeyError, TypeError) as e:
+                log(f"Dropping malformed frontier message on {msg.subject}: {str(e)}", "warning")
+                await msg.term()
+                continue
+            if not items:
+                await msg.ack()
+                continue
+            self._deliveries.add(delivery)
+            self._buffer.extend(items)
+            count += len(items)
+        if messages:
+            log(f"Fetched {count} URLs in {len(messages)} messages from {self.subject}", "debug")
+
+    async def ack(self, item: FrontierItem):
+        await self._finish(item, failed=False)
+
+    async def nak(self, item: FrontierItem):
+        await self._finish(item, failed=True)
+
+    async def _finish(self, item, failed):
+        delivery = item.delivery
+        if delivery is None:
+            return
+        delivery.remaining -= 1
+        if failed:
+            delivery.failures.append(item.data)
+        if delivery.remaining > 0:
+            return
+
+        self._deliveries.discard(delivery)
+        if not delivery.failures:
+            await delivery.msg.ack()
+            return
+
+        # Requeued URLs start a new message, so each record carries the
+        # attempts it used up in earlier messages and FRONTIER_MAX_DELIVER
+        # still applies to it
+        delivered = delivery.msg.metadata.num_delivered
+        retries = []
+        for data in delivery.failures:
+            attempts = data.get('attempts', 0) + delivered
+            if attempts >= self.max_deliver:
+                log(f"Giving up on {data.get('url')} after {attempts} failed attempts", "error")
+            else:
+                retries.append(dict(data, attempts=attempts))
+        if len(retries) == delivery.size:
+            # Nothing in the message succeeded, let JetStream redeliver it
+            await delivery.msg.nak()
+            return
+        if retries:
+            # Only requeue the URLs that failed so the rest are not re-crawled
+            await self.nats_manager.publish_batch(delivery.msg.subject, retries)
+        await delivery.msg.ack()
+
+    async def close(self):
+        if self._keep_alive_task is not None:
+            # Wait for it to stop so no in_progress() races the naks below
+            self._keep_alive_task.cancel()
+            try:
+                await self._keep_alive_task
+            except asyncio.CancelledError:
+                pass
+            self._keep_alive_task = None
+        # Hand back anything we fetched but never started so it is
+        # redelivered straight away instead of after ack_wait
+        while self._buffer:
+            item = self._buffer.popleft()
+            try:
+                await self.nak(item)
+            except Exception as e:
+                log(f"Error returning {item.url} to the frontier: {str(e)}", "error")
+        if self._subscription is not None:
+            await self._subscription.unsubscribe()
+            self._subscription = None
@@ -0,0 +1,123 @@
+import hashlib
+import math
+import os
+from collections import OrderedDict
+from dotenv import load_dotenv
+from mysql_manager import MySQLManager
+from shared_data import log
+
+# Load environment variables from .env file
+load_dotenv()
+
+
+class BloomFilter:
+    def __init__(self, capacity, error_rate=0.01):
+        self.capacity = capacity
+        self.error_rate = error_rate
+        self.num_bits = max(8, int(math.ceil(-capacity * math.log(error_rate) / (math.log(2) ** 2))))
+        self.num_hashes = max(1, int(round(self.num_bits / capacity * math.log(2))))
+        self.bits = bytearray((self.num_bits + 7) // 8)
+        self.count = 0
+
+    def _positions(self, item):
+        # Double hashing: k positions derived from two 64-bit halves of one digest
+        digest = hashlib.blake2b(item.encode(), digest_size=16).digest()
+        h1 = int.from_bytes(digest[:8], 'little')
+        h2 = int.from_bytes(digest[8:], 'little') | 1
+        return [(h1 + i * h2) % self.num_bits for i in range(self.num_hashes)]
+
+    def add(self, item):
+        for position in self._positions(item):
+            self.bits[position >> 3] |= 1 << (position & 7)
+        self.count += 1
+
+    def __contains__(self, item):
+        return all(self.bits[position >> 3] & (1 << (position & 7)) for position in self._positions(item))
+
+
+class LRUCache:
+    def __init__(self, maxsize):
+        self.maxsize = maxsize
+        self._items = OrderedDict()
+
+    def __contains__(self, key):
+        if key in self._items:
+            self._items.move_to_end(key)
+            return True
+        return False
+
+    def add(self, key):
+        self._items[key] = True
+        self._items.move_to_end(key)
+        if len(self._items) > self.maxsize:
+            self._items.popitem(last=False)
+
+    def __len__(self):
+        return len(self._items)
+
+
+# Answers "have we already crawled this URL?" with almost no database traffic.
+# Recently confirmed URLs are served from an LRU, the Bloom filter rules out
+# URLs that were definitely never stored, and only possible Bloom hits are
+# checked against MySQL in a single batched query.
+class VisitedSet:
+    def __init__(self, mysql_manager: MySQLManager, table, capacity=None, error_rate=None, lru_size=None):
+        self.mysql_manager = mysql_manager
+        self.table = table
+        self.capacity = capacity or int(os.getenv('VISITED_BLOOM_CAPACITY', '1000000'))
+        self.error_rate = error_rate or float(os.getenv('VISITED_BLOOM_ERROR_RATE', '0.01'))
+        self.recent = LRUCache(lru_size or int(os.getenv('VISITED_LRU_SIZE', '50000')))
+        self.bloom = BloomFilter(self.capacity, self.error_rate)
+        # Until warmed the Bloom filter knows nothing, so every lookup that
+        # misses the LRU has to go to MySQL
+        self.warmed = False
+
+    async def warm(self, chunk_size=10000):
+        result = await self.mysql_manager.execute_query(f"SELECT MAX(id) AS max_id FROM {self.table}")
+        max_id = result[0]['max_id'] or 0
+        # Leave headroom for URLs crawled after startup
+        self.bloom = BloomFilter(max(self.capacity, max_id * 2), self.error_rate)
+
+        last_id = 0
+        query = f"SELECT id, linkedin_url FROM {self.table} WHERE id > %s ORDER BY id LIMIT %s"
+        while True:
+            rows = await self.mysql_manager.execute_query(query, (last_id, chunk_size))
+            if not rows:
+                break
+            for row in rows:
+                if row['linkedin_url']:
+                    self.bloom.add(row['linkedin_url'])
+            last_id = rows[-1]['id']
+        self.warmed = True
+        log(f"Visited set for {self.table} warmed with {self.bloom.count} URLs")
+
+    def add(self, url):
+        self.bloom.add(url)
+        self.recent.add(url)
+
+    async def contains(self, url):
+        return not await self.filter_unseen([url])
+
+    async def filter_unseen(self, urls):
+        unseen = set()
+        candidates = []
+        for url in dict.fromkeys(urls):
+            if url in self.recent:
+                continue
+            if self.warmed and url not in self.bloom:
+                unseen.add(url)
+            else:
+                candidates.append(url)
+
+        if candidates:
+            placeholders = ', '.join(['%s'] * len(candidates))
+            query = f"SELECT linkedin_url FROM {self.table} WHERE linkedin_url IN ({placeholders})"
+            rows = await self.mysql_manager.execute_query(query, tuple(candidates))
+            found = {row['linkedin_url'] for row in rows}
+            for url in candidates:
+                if url in found:
+                    self.add(url)
+                else:
+                    unseen.add(url)
+
+        return [url for url in dict.fromkeys(urls) if url in unseen]
@@ -1,10 +1,9 @@
 import time, os
-from flask import Flask
+from flask import Flask, request
 from flask_cors import CORS
 from flask_socketio import SocketIO
 from mysql_manager import MySQLManager
-from shared_data import log, activity_queue, set_socketio
-import json
+from shared_data import log, log_broadcaster
 import eventlet
 
 eventlet.monkey_patch()
@@ -33,33 +32,26 @@ def create_app():
 
     CORS(app)
     socketio.init_app(app, async_mode='eventlet', ping_timeout=10, ping_interval=5)
-    set_socketio(socketio)  # Set the socketio instance in shared_data
 
     # Import routes after app is created to avoid circular imports
     from routes import register_routes
     register_routes(app)
 
     @socketio.on('connect', namespace='/crawler')
-    def handle_connect():
-        # Emit all existing log entries when a client connects
-        while not activity_queue.empty():
-            log_entry = activity_queue.get()
-            socketio.emit('log_update', json.loads(log_entry), namespace='/crawler')
+    def handle_connect(auth=None):
+        # Clients send the last sequence they saw; anything newer that is
+        # still in the history is replayed by the next batch
+        auth = auth or {}
+        log_broadcaster.connect(request.sid, auth.get('since'), auth.get('epoch'))
 
-    def background_task():
-        while True:
-            if not activity_queue.empty():
-                log_entry = activity_queue.get()
-                log_data = json.loads(log_entry)
-                if 'crawler_update' in log_data:
-                    # This is a crawler update
-                    socketio.emit('crawler_update', log_data['crawler_update'], namespace='/crawler')
-                else:
-                    # This is a regular log entry
-                    socketio.emit('log_update', log_data, namespace='/crawler')
-            eventlet.sleep(0.1)
+    @socketio.on('disconnect', namespace='/crawler')
+    def handle_disconnect():
+        log_broadcaster.disconnect(request.sid)
 
-    socketio.start_background_task(background_task)
+    def emit_batch(event, data, client_id):
+        socketio.emit(event, data, namespace='/crawler', to=client_id)
+
+    socketio.start_background_task(log_broadcaster.run, emit_batch, socketio.sleep)
 
     return app, socketio
 